@@ -0,0 +1,53 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Notification storm of a bulk load: one 'entities/create' notification per entity, delivered to a handler that
+refreshes a cache on every call, with and without coalescing.
+
+Usage: python benchmarks/bench_coalescer.py [entities] [refresh microseconds]
+
+"""
+
+import sys
+import time
+
+from hkpy.hkbase.observer import LocalObserverClient
+
+
+def run(count, refresh_seconds, coalescing):
+    client = LocalObserverClient()
+    calls = []
+
+    def handler(notification):
+        # stands for a cache refresh downstream, whose cost does not depend on the number of entities
+        deadline = time.perf_counter() + refresh_seconds
+        while time.perf_counter() < deadline:
+            pass
+        calls.append(len(notification['args']['entities']))
+
+    client.add_handler(handler)
+    if coalescing:
+        client.enable_coalescing()
+    client.init()
+
+    start = time.perf_counter()
+    for i in range(count):
+        client.publish('create', 'entities', 'bench', [f'n{i}'])
+    client.deinit()
+    elapsed = time.perf_counter() - start
+
+    print(f'{"coalesced" if coalescing else "direct":>10}: {count} notifications in {elapsed:6.2f} s, '
+          f'{len(calls)} handler calls, {sum(calls)} entities')
+
+
+def main(count=200000, refresh_microseconds=20):
+    for coalescing in (False, True):
+        run(count, refresh_microseconds / 1e6, coalescing)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,47 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Memory held per entity for each HKEntity class.
+
+Usage: python benchmarks/bench_entity_memory.py [count]
+
+"""
+
+import sys
+import tracemalloc
+
+from hkpy.hklib import HKNode, HKContext, HKLink, HKConnector, HKReferenceNode
+
+FACTORIES = {
+    'HKNode': lambda i: HKNode(f'n{i}', parent='ctx'),
+    'HKNode+props': lambda i: HKNode(f'n{i}', parent='ctx', properties={'label': 'x'}),
+    'HKContext': lambda i: HKContext(f'c{i}'),
+    'HKReferenceNode': lambda i: HKReferenceNode(ref=f'n{i}', id_=f'r{i}'),
+    'HKConnector': lambda i: HKConnector(f'k{i}', class_name='f', roles={'s': 's', 'o': 'o'}),
+    'HKLink': lambda i: HKLink(connector='k', id_=f'l{i}', binds={'s': {f'n{i}': ['λ']}, 'o': {'m': ['λ']}}),
+}
+
+
+def measure(factory, count):
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    entities = [factory(i) for i in range(count)]
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in end.compare_to(start, 'filename'))
+    # discount the list holding the entities
+    return (total - sys.getsizeof(entities)) / count
+
+
+def main(count=100000):
+    for name, factory in FACTORIES.items():
+        print(f'{name:>16}: {measure(factory, count):8.1f} bytes/entity')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,51 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Cost of adding and removing entities of an HKGraph at growing scales.
+
+Usage: python benchmarks/bench_graph.py [scale ...]   (default: 10000 100000 1000000)
+
+"""
+
+import sys
+import time
+
+from hkpy.hklib import HKGraph, HKNode, HKLink, HKConnector, HKContext
+
+
+def run(scale):
+    graph = HKGraph()
+
+    nodes = [HKNode(f'n{i}', parent='ctx') for i in range(scale)]
+    links = []
+    for i in range(scale):
+        link = HKLink(connector='rel', id_=f'l{i}', parent='ctx')
+        link.add_bind('subject', f'n{i}')
+        link.add_bind('object', f'n{(i + 1) % scale}')
+        links.append(link)
+
+    start = time.perf_counter()
+    graph.add_entities([HKContext('ctx'), HKConnector('rel', class_name='f')])
+    graph.add_entities(nodes)
+    graph.add_entities(links)
+    added = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.remove_entities([f'l{i}' for i in range(0, scale, 2)])
+    removed_links = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.remove_entities('ctx')
+    removed_context = time.perf_counter() - start
+
+    print(f'{scale:>9} entities: add {added:.3f}s | remove {scale // 2} links {removed_links:.3f}s | '
+          f'remove context {removed_context:.3f}s')
+
+
+if __name__ == '__main__':
+    for scale in [int(arg) for arg in sys.argv[1:]] or [10 ** 4, 10 ** 5, 10 ** 6]:
+        run(scale)
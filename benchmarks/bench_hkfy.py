@@ -0,0 +1,58 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Throughput of hkfy over a result set of mixed entities.
+
+Usage: python benchmarks/bench_hkfy.py [count]
+
+"""
+
+import sys
+import time
+
+from hkpy.hklib import hkfy
+
+try:
+    from hkpy.hklib import hkfy_many
+except ImportError:
+    hkfy_many = None
+
+
+def make_result(count):
+    result = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            result.append({'id': f'n{i}', 'type': 'node', 'parent': 'ctx', 'properties': {'label': f'node {i}'},
+                           'metaProperties': {}, 'interfaces': {}})
+        elif kind == 1:
+            result.append({'id': f'l{i}', 'type': 'link', 'connector': 'rel', 'parent': 'ctx',
+                           'binds': {'s': {f'n{i - 1}': ['λ']}, 'o': {f'n{i + 3}': ['λ']}}, 'properties': {}})
+        elif kind == 2:
+            result.append({'id': f'r{i}', 'type': 'ref', 'ref': f'n{i - 2}', 'parent': 'ctx', 'properties': {}})
+        else:
+            result.append({'id': f'c{i}', 'type': 'context', 'parent': None, 'properties': {'a': 1}})
+    return result
+
+
+def run(label, convert, result):
+    start = time.perf_counter()
+    entities = convert(result)
+    elapsed = time.perf_counter() - start
+    assert len(entities) == len(result)
+    print(f'{label:>10}: {len(result) / elapsed:12,.0f} entities/s')
+
+
+def main(count=100000):
+    result = make_result(count)
+    run('hkfy', lambda r: [hkfy(e) for e in r], result)
+    if hkfy_many is not None:
+        run('hkfy_many', hkfy_many, result)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,45 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Wall time and number of modules loaded by `import hkpy` in a fresh interpreter.
+
+Usage: python benchmarks/bench_import.py [runs]
+
+"""
+
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+_SCRIPT = '''
+import sys, time, json
+before = set(sys.modules)
+start = time.perf_counter()
+import hkpy
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({'elapsed': elapsed, 'modules': len(loaded),
+                  'observers': sorted(name for name in ('flask', 'flask_cors', 'pika', 'werkzeug') if name in loaded)}))
+'''
+
+
+def main(runs=10):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, 'PYTHONPATH': root}
+
+    results = [json.loads(subprocess.run([sys.executable, '-c', _SCRIPT], env=env, check=True,
+                                         stdout=subprocess.PIPE).stdout) for _ in range(runs)]
+
+    print(f'import hkpy: {statistics.median(r["elapsed"] for r in results) * 1000:8.1f} ms (median of {runs})')
+    print(f'    modules: {results[0]["modules"]:8d}')
+    print(f'  observers: {", ".join(results[0]["observers"]) or "none"}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
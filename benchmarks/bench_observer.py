@@ -0,0 +1,86 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Load test of the REST observer receiver: local generator threads post notifications to the callback endpoint while
+a slow handler processes them, calling the handlers within the requests and through the dispatcher.
+
+Usage: python benchmarks/bench_observer.py [notifications] [handler milliseconds]
+
+"""
+
+import sys
+import time
+import logging
+import threading
+import statistics
+
+import requests
+
+from hkpy.hkbase import HKBase
+from hkpy.hkbase.observer import RESTObserverClient
+
+from stub_server import start_stub_server
+
+GENERATORS = 8
+
+
+def run(url, dispatch, count, handler_seconds):
+    client = RESTObserverClient(HKBase(url=url), observer_options={'address': '127.0.0.1', 'dispatch': dispatch,
+                                                                   'workers': 8, 'queueSize': count})
+    done = threading.Semaphore(0)
+
+    def handler(notification):
+        time.sleep(handler_seconds)
+        done.release()
+
+    client.add_handler(handler)
+    client.init()
+
+    latencies = []
+
+    def generate(n):
+        with requests.Session() as session:
+            for i in range(n):
+                start = time.perf_counter()
+                session.post(f'{client._listening_path}/repository/test/entity', json=[f'n{i}']).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=generate, args=(count // GENERATORS,)) for _ in range(GENERATORS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    posted = time.perf_counter() - start
+    for _ in range(len(latencies)):
+        done.acquire()
+    handled = time.perf_counter() - start
+
+    stats = client.stats()
+    client.deinit()
+
+    latencies.sort()
+    print(f'{dispatch:>8}: callback p50 {statistics.median(latencies) * 1000:6.2f} ms, '
+          f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms, '
+          f'posted in {posted:5.2f} s, handled in {handled:5.2f} s')
+    if stats is not None:
+        print(f'          dropped {stats.dropped}, handler avg {stats.latency_avg * 1000:.2f} ms, '
+              f'max {stats.latency_max * 1000:.2f} ms')
+
+
+def main(count=800, handler_milliseconds=50):
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server, url = start_stub_server()
+    try:
+        for dispatch in ('sync', 'threads'):
+            run(url, dispatch, count, handler_milliseconds / 1000)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
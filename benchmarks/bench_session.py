@@ -0,0 +1,62 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Per-call latency of HKRepository requests with and without the pooled session.
+
+Usage: python benchmarks/bench_session.py [calls]
+
+"""
+
+import statistics
+import sys
+import time
+
+import requests
+
+from hkpy.hkbase import HKBase, HKRepository
+from stub_server import start_stub_server
+
+
+class _UnpooledSession(object):
+    """ Mimics the former behaviour: every call goes through a brand new connection. """
+
+    def __getattr__(self, method):
+        return getattr(requests, method)
+
+
+def _measure(repository, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        repository.list_objects()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(label, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f'{label:>10}: mean {statistics.mean(latencies) * 1e3:.3f} ms | '
+          f'p50 {statistics.median(latencies) * 1e3:.3f} ms | p99 {p99 * 1e3:.3f} ms')
+
+
+def main(calls=2000):
+    server, url = start_stub_server()
+
+    try:
+        unpooled = HKBase(url=url, session=_UnpooledSession())
+        pooled = HKBase(url=url, pool_maxsize=4)
+
+        _report('unpooled', _measure(HKRepository(base=unpooled, name='bench'), calls))
+        with pooled:
+            _report('pooled', _measure(HKRepository(base=pooled, name='bench'), calls))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
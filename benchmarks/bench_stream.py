@@ -0,0 +1,71 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Peak memory and time of filter_entities against iter_filter_entities for a growing number of entities.
+
+Usage: python benchmarks/bench_stream.py [count ...]   (default: 10000 100000 1000000)
+
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from hkpy.hkbase import HKBase
+
+from stub_server import start_stub_server
+
+
+def filter_route(count):
+    def route(handler, body):
+        def generate():
+            yield b'{'
+            for i in range(count):
+                entity = (f'"n{i}":{{"id":"n{i}","type":"node","parent":"ctx",'
+                          f'"properties":{{"label":"node {i}","rank":{i}}},"interfaces":{{}}}}')
+                yield (entity if i == 0 else ',' + entity).encode()
+            yield b'}'
+        return 200, _batched(generate())
+    return route
+
+
+def _batched(chunks, size=65536):
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer)
+
+
+def measure(label, consume):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = consume()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'  {label:>20}: {count:>8} entities in {elapsed:6.2f}s, peak {peak / 2 ** 20:8.1f} MiB')
+
+
+def main(counts):
+    for count in counts:
+        server, url = start_stub_server({'/repository/test/entity/filter': filter_route(count),
+                                         '/repository': lambda handler, body: (200, ['test'])})
+        with HKBase(url=url) as hkbase:
+            repository = hkbase.connect_repository('test')
+            print(f'{count} entities')
+            measure('filter_entities', lambda: len(repository.filter_entities('[type="node"]')))
+            measure('iter_filter_entities', lambda: sum(1 for _ in repository.iter_filter_entities('[type="node"]')))
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10 ** 4, 10 ** 5, 10 ** 6])
@@ -0,0 +1,48 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Throughput of add_object with 1 KiB chunks, as it used to read files, and with the default chunks, read or mapped.
+
+Usage: python benchmarks/bench_upload.py [megabytes]
+
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from hkpy.hkbase import HKBase
+
+from stub_server import start_stub_server
+
+
+def main(megabytes=64):
+    server, url = start_stub_server({'/repository/test/storage': lambda handler, body: (200, {'objectId': 'o'}),
+                                     '/repository': lambda handler, body: (200, ['test'])})
+
+    with tempfile.NamedTemporaryFile(delete=False) as file:
+        file.write(os.urandom(megabytes << 20))
+
+    try:
+        with HKBase(url=url) as hkbase:
+            repository = hkbase.connect_repository('test')
+
+            for label, options in (('1 KiB chunks', {'chunk_size': 1024}),
+                                   ('default', {}),
+                                   ('mmap', {'use_mmap': True})):
+                start = time.perf_counter()
+                repository.add_object(file.name, 'application/octet-stream', id_='o', **options)
+                elapsed = time.perf_counter() - start
+                print(f'{label:>12}: {megabytes / elapsed:10,.1f} MiB/s')
+    finally:
+        os.unlink(file.name)
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
@@ -0,0 +1,48 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Time to write entities one or two at a time, directly and through a BufferedRepositoryWriter.
+
+Usage: python benchmarks/bench_writer.py [count]
+
+"""
+
+import sys
+import time
+
+from hkpy.hkbase import HKBase, BufferedRepositoryWriter
+from hkpy.hklib import HKNode
+
+from stub_server import start_stub_server
+
+
+def main(count=5000):
+    server, url = start_stub_server({'/repository/test/entity': lambda handler, body: (200, None),
+                                     '/repository': lambda handler, body: (200, ['test'])})
+    nodes = [HKNode(f'n{i}', properties={'label': f'node {i}'}) for i in range(count)]
+
+    with HKBase(url=url) as hkbase:
+        repository = hkbase.connect_repository('test')
+
+        start = time.perf_counter()
+        for i in range(0, count, 2):
+            repository.add_entities(nodes[i:i + 2])
+        direct = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with BufferedRepositoryWriter(repository) as writer:
+            for i in range(0, count, 2):
+                writer.add_entities(nodes[i:i + 2])
+        buffered = time.perf_counter() - start
+
+    server.shutdown()
+    print(f'add_entities: {count / direct:10,.0f} entities/s')
+    print(f'    buffered: {count / buffered:10,.0f} entities/s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
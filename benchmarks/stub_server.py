@@ -0,0 +1,84 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+"""
+
+Minimal in-process HTTP server used by the benchmarks as a stand-in for a hkbase.
+
+"""
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    # path prefix -> callable(handler, body) returning (status, payload); payload may be an iterator of bytes
+    routes = {}
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            body = self._read_chunked()
+
+        status, payload = 200, []
+        for prefix, route in self.routes.items():
+            if self.path.startswith(prefix):
+                status, payload = route(self, body)
+                break
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+
+        if isinstance(payload, Iterator):
+            # stream generated bodies without holding them in memory
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in payload:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_chunked(self):
+        body = bytearray()
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return bytes(body)
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    do_GET = do_PUT = do_POST = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(routes=None):
+    """ Start a stub server on a free local port.
+
+    Returns
+    -------
+    (Tuple[ThreadingHTTPServer, str]) the running server and its base url
+    """
+
+    handler = type('Handler', (StubHandler,), {'routes': routes or {}})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
@@ -12,3 +12,11 @@ Hyperknowledge Python Framework.
 from .hkbase import *
 from .hklib import *
 from .oops import *
+
+from .hkbase.observer import clients as _observer_clients
+
+def __getattr__(name):
+    # observer clients with heavy dependencies are imported on first use
+    if name in _observer_clients.LAZY_CLIENTS:
+        return getattr(_observer_clients, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -5,8 +5,24 @@
 
 from ..utils import generate_id
 from ..utils import constants
+from .session import *
 from .hktransaction import *
+from .pager import *
+from .repositorycache import *
+from .entitycache import *
+from .querycache import *
 from .hkrepository import *
+from .writer import *
 from .hkbase import *
+from .asynchkrepository import *
+from .asynchkbase import *
 from .observer import *
 from .hkobserverfactory import *
+
+from .observer import clients as _observer_clients
+
+def __getattr__(name):
+    # observer clients with heavy dependencies are imported on first use
+    if name in _observer_clients.LAZY_CLIENTS:
+        return getattr(_observer_clients, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
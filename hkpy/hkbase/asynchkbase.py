@@ -0,0 +1,197 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import List, Optional
+
+from .asynchkrepository import AsyncHKRepository
+from .hkbase import HKInfo
+from ..oops import HKBError, HKpyError
+from ..utils import constants
+from ..utils import async_response_validator
+
+__all__ = ['AsyncHKBase']
+
+
+def _import_aiohttp():
+    # aiohttp is an optional dependency, only loaded when an async client is created
+    try:
+        import aiohttp
+    except ImportError as err:
+        raise HKpyError(message='AsyncHKBase requires aiohttp. Install it with: pip install hkpy[async]', error=err)
+    return aiohttp
+
+
+class AsyncHKBase(object):
+    """ This class establishes a non-blocking communication interface with a hkbase.
+
+    Requires the optional aiohttp dependency (pip install hkpy[async]).
+    """
+
+    def __init__(self, url: str, api_version: str=None, auth: Optional[str]=None,
+                 pool_maxsize: int = 100, pool_maxsize_per_host: int = 0,
+                 keep_alive_timeout: float = 15, timeout: Optional[float] = None):
+        """ Initialize an instance of AsyncHKBase class.
+
+        Parameters
+        ----------
+        url: (str) HKBase url
+        api_version: (str) HKBase api version
+        auth: (Optional[str]) HKBase authentication token
+        pool_maxsize: (int) maximum number of simultaneous connections (0 means unlimited)
+        pool_maxsize_per_host: (int) maximum number of simultaneous connections to the same host (0 means unlimited)
+        keep_alive_timeout: (float) seconds an idle connection is kept open for reuse
+        timeout: (Optional[float]) total timeout of each request in seconds
+        """
+
+        aiohttp = _import_aiohttp()
+
+        self.url = url
+        self.api_version = api_version
+        self._base_uri = f'{self.url}/{self.api_version}' if api_version else self.url
+        self._repository_uri = f'{self._base_uri}/repository'
+        self._observer_uri = f'{self._base_uri}/observer'
+        self._headers = {'Content-Type' : 'application/json'}
+        auth = auth if auth else constants.AUTH_TOKEN
+        self._headers['Authorization'] = f'{auth}'
+
+        self._connector_options = {
+            'limit': pool_maxsize,
+            'limit_per_host': pool_maxsize_per_host,
+            'keepalive_timeout': keep_alive_timeout,
+            'ssl': None if constants.SSL_VERIFY else False
+        }
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+
+    def __repr__(self):
+        return f'{super().__repr__()}: {self.url}'
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        # the session is bound to the running event loop, so it is only created on first use
+        if self._session is None or self._session.closed:
+            aiohttp = _import_aiohttp()
+            connector = aiohttp.TCPConnector(**self._connector_options)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def close(self) -> None:
+        """ Release the pooled connections of this hkbase.
+        """
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def connect_repository(self, name: str) -> AsyncHKRepository:
+        """ Connect to existing hkbase's repository.
+
+        Parameters
+        ----------
+        name : (str) name of the hkbase's respository
+
+        Returns
+        -------
+        (AsyncHKRepository) Communication interface with a repository
+        """
+
+        if(name in await self._view_repositories()):
+            return AsyncHKRepository(base=self, name=name)
+
+        raise HKpyError(message="Could not connect to repository.")
+
+    async def create_repository(self, name: str) -> AsyncHKRepository:
+        """ Create a new repository in hkbase.
+
+        Parameters
+        ----------
+        name : (str) name of the new hkbase's respository
+
+        Returns
+        -------
+        (AsyncHKRepository) Communication interface with a repository
+        """
+
+        url = f'{self._repository_uri}/{name}/'
+
+        try:
+            async with self._get_session().put(url, headers=self._headers) as response:
+                await async_response_validator(response=response)
+            return AsyncHKRepository(base=self, name=name)
+        except HKBError as err:
+            raise err
+        except Exception as err:
+            raise HKpyError(message='Repository not created.', error=err)
+
+    async def delete_repository(self, name: str) -> None:
+        """ Delete a existing hkbase's repository.
+
+        Parameters
+        ----------
+        name : (str) name of the new hkbase's respository
+        """
+
+        url = f'{self._repository_uri}/{name}/'
+
+        try:
+            async with self._get_session().delete(url, headers=self._headers) as response:
+                await async_response_validator(response=response)
+        except HKBError as err:
+            raise err
+        except Exception as err:
+            raise HKpyError(message='Repository not deleted.', error=err)
+
+    async def delete_create_repository(self, name: str) -> AsyncHKRepository:
+        """ Delete an existing hkbase's repository and, then, recreate it.
+
+        Parameters
+        ----------
+        name : (str) name of the new hkbase's respository
+
+        Returns
+        -------
+        (AsyncHKRepository) Communication interface with a repository
+        """
+
+        try:
+            return await self.create_repository(name)
+        except HKBError as err:
+            await self.delete_repository(name)
+            return await self.create_repository(name)
+        except Exception as err:
+            raise HKpyError(message='Repository not deleted or created.', error=err)
+
+    async def _view_repositories(self) -> List[str]:
+        try:
+            async with self._get_session().get(self._repository_uri, headers=self._headers) as response:
+                _, repositories = await async_response_validator(response=response)
+            return repositories
+        except HKBError as err:
+            raise err
+        except Exception as err:
+            raise HKpyError(message='Could not retrieve existing repositories.', error=err)
+
+    async def get_repositories(self) -> List[AsyncHKRepository]:
+        """ Retrieve avaiable repositories in the hkbase.
+
+        Returns
+        -------
+        (List[AsyncHKRepository]) list of available repositories in the hkbase
+        """
+
+        return [AsyncHKRepository(base=self, name=name) for name in await self._view_repositories()]
+
+    async def info(self) -> HKInfo:
+        url = f'{self._base_uri}/info'
+
+        async with self._get_session().get(url, headers=self._headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return HKInfo.from_dict(data)
@@ -0,0 +1,533 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import TypeVar, List, Dict, Union, Optional, Any, Tuple
+
+import asyncio
+import os
+import copy
+import json
+import urllib.parse
+from urllib.parse import quote
+
+from .hkrepository import HKRepository, HKEntityResultSet, _report_raw_data_failures
+from .query import SPARQLResultSet
+from .query_management import HKStoredQuery
+from ..hklib import hkfy, hkfy_many, HKEntity
+from ..hklib.fi.fi import FI
+from ..hklib.node import HKDataNode
+from ..oops import HKBError, HKpyError
+from ..utils import async_response_validator, FileSource
+
+__all__ = ['AsyncHKRepository']
+
+AsyncHKBase = TypeVar('AsyncHKBase')
+
+
+class AsyncHKRepository(object):
+    """ This class establishes a non-blocking communication interface with a repository within a hkbase.
+
+    It mirrors HKRepository, with every request method being a coroutine.
+    """
+
+    def __init__(self, base: AsyncHKBase, name: str):
+        """ Initialize an instance of AsyncHKRepository class.
+
+        Parameters
+        ----------
+        base: (AsyncHKBase) AsyncHKBase object in which the repository is located
+        name: (str) Repository name
+        """
+
+        self.base = base
+        self.name = name
+        self._headers = base._headers
+
+    def __repr__(self):
+        return f'{super().__repr__()}: {self.name}'
+
+    @property
+    def _session(self):
+        return self.base._get_session()
+
+    async def add_entities(self, entities: Union[HKEntity, List[HKEntity]], force_add: Optional[bool] = False) -> None:
+        """ Add entities to repository.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, List[HKEntity]]) entity or list of entities
+        force_add: (Optional[bool] flag to bypass verification of preexisting entities and add all assuming they are new
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/entity/'
+
+        parameters = {}
+
+        if force_add:
+            parameters['forceAdd'] = 'true'
+
+        if not isinstance(entities, (list,tuple)):
+            entities = [entities]
+
+        if isinstance(entities[0], HKEntity):
+            entities = [x.to_dict() for x in entities]
+        elif isinstance(entities[0], dict):
+            pass
+        else:
+            raise ValueError
+
+        data_entities, entities = HKRepository.filter_data_entities(entities)
+        if data_entities:
+            await self.add_data_entities(data_entities)
+
+        headers = copy.deepcopy(self._headers)
+        headers['Content-Type'] = 'application/json'
+
+        async with self._session.put(url, data=json.dumps(entities), headers=headers, params=parameters) as response:
+            await async_response_validator(response=response)
+
+    async def add_entities_bulk(self, entities: Union[HKEntity, List[HKEntity]], force_add: Optional[bool] = False) -> None:
+        """ Add entities to repository through the bulk endpoint.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, List[HKEntity]]) entity or list of entities
+        force_add: (Optional[bool] flag to bypass verification of preexisting entities and add all assuming they are new
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/entity/bulk'
+
+        parameters = {}
+        if force_add:
+            parameters['forceAdd'] = 'true'
+
+        if not isinstance(entities, (list,tuple)):
+            entities = [entities]
+
+        if isinstance(entities[0], HKEntity):
+            entities = [x.to_dict() for x in entities]
+        elif isinstance(entities[0], dict):
+            pass
+        else:
+            raise ValueError
+
+        headers = copy.deepcopy(self._headers)
+        headers['Content-Type'] = 'application/octet-stream'
+
+        async with self._session.put(url, data=json.dumps(entities).encode(), headers=headers, params=parameters) as response:
+            await async_response_validator(response=response)
+
+    async def add_data_entities(self, dataentities: Union[HKDataNode, List[HKDataNode]]) -> None:
+        """ Add entities with raw data to repository.
+
+        Parameters
+        ----------
+        dataentities : (Union[HKDataNode, List[HKDataNode]]) data node or list of data nodes
+        """
+
+        # imported here, asynchkbase imports this module
+        from .asynchkbase import _import_aiohttp
+        aiohttp = _import_aiohttp()
+
+        url = f'{self.base._repository_uri}/{self.name}/entity/'
+
+        if not dataentities:
+            return
+
+        if not isinstance(dataentities, (list,tuple)):
+            dataentities = [dataentities]
+
+        if isinstance(dataentities[0], HKEntity):
+            dataentities = [x.to_dict() for x in dataentities]
+        elif isinstance(dataentities[0], dict):
+            pass
+        else:
+            raise ValueError
+
+        form = aiohttp.FormData()
+        opened = []
+        try:
+            for entity in dataentities:
+                entity = dict(entity)
+                file = entity.pop('raw_data')
+                # data nodes keep their files, or their paths, which are streamed by aiohttp
+                if isinstance(file, FileSource):
+                    file = file.open()
+                elif isinstance(file, os.PathLike):
+                    file = open(file, 'rb')
+                    opened.append(file)
+                form.add_field(entity['id'], json.dumps(entity))
+                form.add_field(entity['id'], file, filename=entity['id'], content_type=entity['properties']['mimeType'])
+
+            async with self._session.put(url, data=form) as response:
+                await async_response_validator(response=response)
+        finally:
+            for file in opened:
+                file.close()
+
+    async def filter_entities(self, filter_: Union[str, Dict], bring_raw_data: Optional[bool]=False,
+                              errors: Optional[Dict[str, Exception]] = None) -> List[HKEntity]:
+        """ Get entities filtered by a css filter or json filter.
+
+        Parameters
+        ----------
+        filter_ : (Union[str, Dict]) retrieval filter
+        bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
+
+        Returns
+        -------
+        (List[HKEntity]) list of retrieved entities
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/entity/filter'
+
+        headers = self._headers
+        if isinstance(filter_, str):
+            headers = copy.deepcopy(self._headers)
+            headers['Content-Type'] = 'text/plain'
+            body = filter_
+        elif isinstance(filter_, (dict, list)):
+            body = json.dumps(filter_)
+        else:
+            raise HKpyError(message='Invalid filter type.')
+
+        try:
+            async with self._session.post(url, data=body, headers=headers) as response:
+                _, data = await async_response_validator(response=response)
+        except (HKBError, HKpyError) as err:
+            raise err
+        except Exception as err:
+            raise HKBError(message='Could not retrieve the entities.', error=err)
+
+        entities = hkfy_many(data.values(), copy=False)
+        if bring_raw_data:
+            entities = await self.retrieve_raw_data_from_data_entities(entities, errors=errors)
+
+        return entities
+
+    async def get_entities(self, ids: List[Union[str, Dict]], bring_raw_data: Optional[bool]=False,
+                           errors: Optional[Dict[str, Exception]] = None) -> List[HKEntity]:
+        """ Get entities by an array of ids.
+
+        Parameters
+        ----------
+        ids : List[Union[str, Dict]] entities identifiers
+        bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
+
+        Returns
+        -------
+        (List[HKEntity]) list of retrieved entities
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/entity'
+
+        if not isinstance(ids, list):
+            raise HKpyError(message='Invalid id type .')
+
+        try:
+            async with self._session.post(url, data=json.dumps(ids), headers=self._headers) as response:
+                _, data = await async_response_validator(response=response)
+        except (HKBError, HKpyError) as err:
+            raise err
+        except Exception as err:
+            raise HKBError(message='Could not retrieve the entities.', error=err)
+
+        entities = hkfy_many(data.values(), copy=False)
+        if bring_raw_data:
+            entities = await self.retrieve_raw_data_from_data_entities(entities, errors=errors)
+
+        return entities
+
+    async def retrieve_raw_data_from_data_entities(self, entities: List[HKEntity], max_concurrency: Optional[int] = 32,
+                                                   errors: Optional[Dict[str, Exception]] = None) -> List[HKEntity]:
+        """ Retrive data from storage from data entities, fetching the objects concurrently.
+
+        An object that cannot be fetched does not abort the batch: once every object is fetched, the failures are
+        raised together, or reported in errors.
+
+        Parameters
+        ----------
+        entities : List[HKEntity] entities
+        max_concurrency: (Optional[int]) maximum number of simultaneous object requests, None for unbounded
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object that could not be
+            fetched; if given, such entities are kept without raw data instead of raising the errors
+
+        Returns
+        -------
+        (List[HKEntity]) list of data entities filled with their raw data
+        """
+
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        failures = {}
+
+        async def get_object(id_):
+            if semaphore is None:
+                return await self.get_object(id_)
+            async with semaphore:
+                return await self.get_object(id_)
+
+        async def fetch(i):
+            entity = entities[i]
+            try:
+                raw_data = await get_object(entity.id_)
+            except Exception as err:
+                failures[entity.id_] = err
+                return
+            entities[i] = HKDataNode(raw_data, id_=entity.id_, parent=entity.parent,
+                                     properties=entity.properties, metaproperties=entity.metaproperties)
+
+        await asyncio.gather(*[fetch(i) for i, entity in enumerate(entities) if 'mimeType' in entity.properties])
+        _report_raw_data_failures(failures, errors)
+
+        return entities
+
+    async def delete_entities(self, ids: Union[str, List[str], HKEntity, List[HKEntity]]) -> None:
+        """ Delete entities from the repository using their ids.
+
+        Parameters
+        ----------
+        ids : (Union[str, List[str], HKEntity, List[HKEntity]]) list of entities' ids or entities
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/entity/'
+
+        if not isinstance(ids, (list,tuple)):
+            ids = [ids]
+
+        if isinstance(ids[0], HKEntity):
+            ids = [x.id_ for x in ids]
+
+        async with self._session.delete(url, data=json.dumps(ids), headers=self._headers) as response:
+            await async_response_validator(response=response)
+
+    async def update_entities(self, entities: Union[HKEntity, List[HKEntity]]) -> None:
+        """ Update entities in the repository.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, List[HKEntity]]) entity or list of entities
+        """
+
+        await self.add_entities(entities)
+
+    async def clear(self) -> None:
+        """ Delete all entities in the repository.
+        """
+
+        headers = copy.copy(self._headers)
+        headers['Content-Type'] = 'text/plain'
+
+        url = f'{self.base._repository_uri}/{self.name}/entity'
+
+        async with self._session.delete(url, data='*', headers=headers) as response:
+            await async_response_validator(response)
+
+    async def hyql(self, query: str, transitivity: Optional[bool] = False) -> HKEntityResultSet:
+        """ Performs a HyQL query on the repository and retrive its results.
+
+        Parameters
+        ----------
+        query : (str) the HyQL query
+        transitivity: (Optional[bool]): Hierarchical links will be evaluated as transitive
+
+        Returns
+        -------
+        HKEntityResultSet: A result set containing HKEntity objects
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/query/'
+
+        headers = copy.deepcopy(self._headers)
+        headers['Content-Type'] = 'text/plain'
+
+        params = {}
+
+        if transitivity:
+            params['transitivity'] = 'true'
+
+        async with self._session.post(url, data=query, params=params, headers=headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return HKRepository._build_hyql_result(data)
+
+    async def sparql(self, query: str, reasoning: Optional[bool] = None, by_pass: Optional[bool] = None) -> SPARQLResultSet:
+        url = f'{self.base._repository_uri}/{self.name}/sparql/'
+
+        headers = copy.deepcopy(self._headers)
+        headers['Content-Type'] = 'text/plain'
+
+        params = {}
+
+        if reasoning is not None:
+            params['reasoning'] = 'true' if reasoning else 'false'
+
+        if by_pass is not None:
+            params['bypass'] = 'true' if by_pass else 'false'
+
+        async with self._session.post(url, data=query, params=params, headers=headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return HKRepository._build_sparql_result(data)
+
+    async def list_objects(self) -> List[str]:
+        """
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/storage'
+
+        async with self._session.get(url, headers=self._headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return data
+
+    async def add_object(self, object_: Union[str, bytes], mimetype: str, id_: Optional[str] = None) -> str:
+        """
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/storage/object'
+
+        if id_ is not None:
+            url = f'{url}/{urllib.parse.quote_plus(id_)}'
+
+        if not isinstance(object_, (str, bytes)):
+            raise HKpyError(message='Object not valid.')
+
+        headers = copy.deepcopy(self._headers)
+        headers['Content-Type'] = mimetype
+
+        async with self._session.put(url, data=object_, headers=headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return data['objectId'] if 'objectId' in data else data
+
+    async def delete_object(self, id_: str) -> None:
+        """
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/storage/object/{urllib.parse.quote_plus(id_)}'
+
+        async with self._session.delete(url, headers=self._headers) as response:
+            await async_response_validator(response=response)
+
+    async def get_object(self, id_: str) -> bytes:
+        """
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/storage/object/{urllib.parse.quote_plus(id_)}'
+
+        async with self._session.get(url, headers=self._headers) as response:
+            _, data = await async_response_validator(response=response, content='.')
+
+        return data
+
+    async def get_all_stored_queries(self, transaction_id: Optional[str] = None) -> List[HKStoredQuery]:
+        url = f'{self.base._repository_uri}/{self.name}/stored-query'
+
+        headers = {**self._headers,
+                   "Content-type": "application/json"}
+
+        if transaction_id is not None:
+            headers['transactionId'] = transaction_id
+
+        async with self._session.get(url, headers=headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return [HKStoredQuery.from_dict(q) for q in data]
+
+    async def get_stored_query(self, query_id: str, transaction_id: Optional[str] = None) -> HKStoredQuery:
+        url = f'{self.base._repository_uri}/{self.name}/stored-query/{query_id}'
+
+        headers = {**self._headers,
+                   "Content-type": "application/json"}
+
+        if transaction_id is not None:
+            headers['transactionId'] = transaction_id
+
+        async with self._session.get(url, headers=headers) as response:
+            _, data = await async_response_validator(response=response)
+
+        return HKStoredQuery.from_dict(data)
+
+    async def store_query(self, stored_query: Union[Dict, HKStoredQuery],
+                          transaction_id: Optional[str] = None) -> HKStoredQuery:
+        url = f'{self.base._repository_uri}/{self.name}/stored-query'
+
+        if isinstance(stored_query, HKStoredQuery):
+            stored_query = stored_query.to_dict()
+        elif not isinstance(stored_query, dict):
+            raise HKpyError(f"Trying to store query object of unknown type {type(stored_query)}")
+
+        headers = {**self._headers,
+                   "Content-type": "application/json"}
+
+        if transaction_id is not None:
+            headers['transactionId'] = transaction_id
+
+        async with self._session.post(url, headers=headers, data=json.dumps(stored_query)) as response:
+            _, data = await async_response_validator(response=response)
+
+        return HKStoredQuery.from_dict(data)
+
+    async def run_stored_query(self, query_id: str, parameters: Optional[Dict[str, Union[str, float, int]]] = None,
+                               run_options: Optional[Dict] = None, transaction_id: Optional[str] = None,
+                               mime_type: Optional[str] = None, proxy: Optional[bool] = False) -> Union[HKEntityResultSet,
+                                                                                                        SPARQLResultSet]:
+        run_configuration = dict()
+        if parameters is not None:
+            run_configuration['parameters'] = parameters
+        if run_options is not None:
+            run_configuration['options'] = run_options
+
+        if mime_type is not None:
+            options = run_configuration.get('options', {})
+            options['mimeType'] = mime_type
+
+        headers = {**self._headers, "Content-type": "application/json"}
+
+        if transaction_id is not None:
+            headers['transactionId'] = transaction_id
+
+        url = f'{self.base._repository_uri}/{self.name}/stored-query/{query_id}/run'
+
+        async with self._session.post(url, data=json.dumps(run_configuration), headers=headers) as response:
+            _, data = await async_response_validator(response=response)
+        if proxy:
+            return data
+        try:
+            return HKRepository._build_hyql_result(data)
+        except HKpyError as e:
+            return HKRepository._build_sparql_result(data)
+
+    async def resolve_fi(self, fi: FI, output_mimetype: bool = False) -> Union[HKEntity, Tuple[Any, str], Any]:
+        """
+        Resolve a full FI. The response is interpreted according to its content type (i.e. into hk objects)
+        """
+        quoted_fi = quote(fi.__str__(), safe="")
+        url = f'{self.base._repository_uri}/{self.name}/fi/{quoted_fi}'
+
+        async with self._session.get(url, headers=self._headers) as response:
+            _, data = await async_response_validator(response=response, content='.')
+            content_type = response.headers['Content-Type']
+
+        if content_type.startswith('hyperknowledge/graph') or content_type.startswith('hyperknowledge/node'):
+            data = hkfy(json.loads(data))
+        elif content_type.startswith('text'):
+            data = data.decode()
+
+        if output_mimetype:
+            return data, content_type
+        return data
+
+    async def persist_fi(self, fi):
+
+        quoted_fi = quote(fi.__str__(), safe="")
+        url = f'{self.base._repository_uri}/{self.name}/fi/{quoted_fi}'
+
+        async with self._session.put(url, headers=self._headers) as response:
+            await async_response_validator(response=response)
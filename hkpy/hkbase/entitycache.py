@@ -0,0 +1,134 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import json
+
+from ..hklib import hkfy, HKEntity
+from .repositorycache import HKRepositoryCache
+
+__all__ = ['HKEntityCache']
+
+class HKEntityCache(HKRepositoryCache):
+    """ A client-side cache of the entities of a repository, kept coherent by evicting the entities changed by local
+    writes and by the notifications of an observer client.
+
+    Entities are cached serialized, so that each hit returns a new HKEntity object that can be modified without
+    affecting the cache, and so that the cache can be bounded by bytes.
+    """
+
+    def __init__(self,
+                 repository: str,
+                 maxsize: Optional[int] = 10000,
+                 maxbytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """ Initialize an instance of HKEntityCache class.
+
+        Parameters
+        ----------
+        repository: (str) name of the repository whose entities are cached
+        maxsize: (Optional[int]) maximum number of cached entities, None for unbounded
+        maxbytes: (Optional[int]) maximum total size of the serialized entities, in bytes
+        ttl: (Optional[float]) seconds after which a cached entity expires
+        """
+
+        super().__init__(repository, maxsize=maxsize, maxbytes=maxbytes, ttl=ttl)
+        # entities dropped because they changed, unlike the evictions reported by info
+        self.invalidations = 0
+
+    def get(self, id_: str) -> Optional[HKEntity]:
+        """ Retrieve a cached entity.
+
+        Parameters
+        ----------
+        id_: (str) the entity's id
+
+        Returns
+        -------
+        (Optional[HKEntity]) a new copy of the cached entity, or None if it is not cached
+        """
+
+        data = self._data.get(id_)
+        return hkfy(json.loads(data)) if data is not None else None
+
+    def get_many(self, ids: Iterable[str]) -> Tuple[Dict[str, HKEntity], List[str]]:
+        """ Retrieve many cached entities.
+
+        Parameters
+        ----------
+        ids: (Iterable[str]) the entities' ids
+
+        Returns
+        -------
+        (Tuple[Dict[str, HKEntity], List[str]]) the cached entities by id and the ids that are not cached
+        """
+
+        found = {}
+        missing = []
+        for id_ in ids:
+            entity = self.get(id_)
+            if entity is None:
+                missing.append(id_)
+            else:
+                found[id_] = entity
+
+        return found, missing
+
+    def put(self, entities: Iterable[Union[HKEntity, Dict]], generation: Optional[int] = None) -> None:
+        """ Cache entities.
+
+        Parameters
+        ----------
+        entities: (Iterable[Union[HKEntity, Dict]]) the entities to be cached
+        generation: (Optional[int]) the generation read before the entities were requested; if anything was evicted
+            since then, the entities may be stale and are not cached
+        """
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            for entity in entities:
+                if isinstance(entity, HKEntity):
+                    entity = entity.to_dict()
+                self._data.put(entity['id'], json.dumps(entity).encode())
+
+    def evict(self, ids: Iterable[Union[str, HKEntity, Dict]]) -> None:
+        """ Remove entities from the cache.
+
+        Parameters
+        ----------
+        ids: (Iterable[Union[str, HKEntity, Dict]]) the entities or their ids
+        """
+
+        with self._lock:
+            self._generation += 1
+            for id_ in ids:
+                if isinstance(id_, HKEntity):
+                    id_ = id_.id_
+                elif isinstance(id_, dict):
+                    id_ = id_.get('id')
+                if self._data.pop(id_) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """ Remove every entity from the cache.
+        """
+
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def _invalidate(self, notification: Dict, args: Dict) -> None:
+        if notification.get('object') == 'entities':
+            entities = args.get('entities')
+            if entities is None:
+                self.clear()
+            else:
+                self.evict(entities)
+        elif notification.get('object') == 'repository':
+            self.clear()
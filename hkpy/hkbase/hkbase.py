@@ -5,12 +5,15 @@
 
 from typing import List, Optional, Dict
 
+import time
+import threading
 import requests
 from abc import abstractmethod
 import jwt
 import datetime
 
 from . import HKRepository
+from .session import HKSession
 from ..hklib import hkfy
 from ..oops import HKBError, HKpyError
 from ..utils import constants
@@ -33,7 +36,8 @@ class HKBase(object):
     """ This class establishes a communication interface with a hkbase.
     """
 
-    def __init__(self, url: str, api_version: str=None, auth: Optional[str]=None):
+    def __init__(self, url: str, api_version: str=None, auth: Optional[str]=None,
+                 session: Optional[requests.Session]=None, repositories_ttl: Optional[float]=30, **session_options):
         """ Initialize an instance of HKBase class.
     
         Parameters
@@ -41,6 +45,11 @@ class HKBase(object):
         url: (str) HKBase url
         api_version: (str) HKBase api version
         auth: (Optional[str]) HKBase authentication token
+        session: (Optional[requests.Session]) session shared by every request to the hkbase
+        repositories_ttl: (Optional[float]) seconds for which the list of repositories is reused before being
+        requested again, None to keep it until a repository is missing from it
+        session_options: keyword arguments used to create a HKSession when no session is given
+        (pool_connections, pool_maxsize, pool_block, max_retries, timeout, keep_alive)
         """
 
         self.url = url
@@ -51,10 +60,28 @@ class HKBase(object):
         self._headers = {'Content-Type' : 'application/json'}
         auth = auth if auth else constants.AUTH_TOKEN
         self._headers['Authorization'] = f'{auth}'
+        self._session = session if session is not None else HKSession(**session_options)
+
+        self._repositories_ttl = repositories_ttl
+        self._repositories = None
+        self._repositories_expiry = None
+        self._repositories_lock = threading.Lock()
 
     def __repr__(self):
         return f'{super().__repr__()}: {self.url}'
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """ Release the pooled connections of this hkbase.
+        """
+
+        self._session.close()
+
     def connect_repository(self, name: str) -> HKRepository:
         """ Connect to existing hkbase's repository.
 
@@ -67,7 +94,8 @@ class HKBase(object):
         (HKRepository) Communication interface with a repository
         """
 
-        if(name in self._view_repositories()):
+        # a repository created by another client since the last listing is only found by listing again
+        if name in self._view_repositories() or name in self._view_repositories(refresh=True):
             return HKRepository(base=self, name=name)
 
         raise HKpyError(message="Could not connect to repository.")
@@ -87,8 +115,9 @@ class HKBase(object):
         url = f'{self._repository_uri}/{name}/'
 
         try:
-            response = requests.put(url=url, verify=constants.SSL_VERIFY, headers=self._headers)
+            response = self._session.put(url=url, verify=constants.SSL_VERIFY, headers=self._headers)
             response_validator(response=response)
+            self._update_repositories(added=name)
             return HKRepository(base=self, name=name)
         except HKBError as err:
             raise err
@@ -106,8 +135,9 @@ class HKBase(object):
         url = f'{self._repository_uri}/{name}/'
 
         try:
-            response = requests.delete(url=url, verify=constants.SSL_VERIFY, headers=self._headers)
+            response = self._session.delete(url=url, verify=constants.SSL_VERIFY, headers=self._headers)
             response_validator(response=response)
+            self._update_repositories(removed=name)
         except HKBError as err:
             raise err
         except Exception as err:
@@ -133,9 +163,19 @@ class HKBase(object):
         except Exception as err:
             raise HKpyError(message='Repository not deleted or created.', error=err)
 
-    def _view_repositories(self) -> List[str]:
+    def _view_repositories(self, refresh: bool = False) -> Dict[str, None]:
+        # the listing is shared by every thread, and only one of them requests it when it expires
+        with self._repositories_lock:
+            expired = self._repositories_expiry is not None and self._repositories_expiry <= time.monotonic()
+            if refresh or expired or self._repositories is None:
+                self._repositories = dict.fromkeys(self._request_repositories())
+                self._repositories_expiry = time.monotonic() + self._repositories_ttl \
+                    if self._repositories_ttl is not None else None
+            return self._repositories
+
+    def _request_repositories(self) -> List[str]:
         try:
-            response = requests.get(url=self._repository_uri, verify=constants.SSL_VERIFY, headers=self._headers)
+            response = self._session.get(url=self._repository_uri, verify=constants.SSL_VERIFY, headers=self._headers)
             _, repositories = response_validator(response=response)
             return repositories
         except HKBError as err:
@@ -143,6 +183,46 @@ class HKBase(object):
         except Exception as err:
             raise HKpyError(message='Could not retrieve existing repositories.', error=err)
 
+    def _update_repositories(self, added: Optional[str] = None, removed: Optional[str] = None) -> None:
+        with self._repositories_lock:
+            if self._repositories is not None:
+                # copied on write, so that listings already returned are never changed under their readers
+                repositories = dict(self._repositories)
+                if added is not None:
+                    repositories[added] = None
+                if removed is not None:
+                    repositories.pop(removed, None)
+                self._repositories = repositories
+
+    def refresh_repositories(self) -> None:
+        """ Discard the known list of repositories, so that it is requested again when needed.
+        """
+
+        with self._repositories_lock:
+            self._repositories = None
+
+    def observe_repositories(self, observer) -> None:
+        """ Keep the known list of repositories up to date with the notifications received by an observer client.
+
+        Parameters
+        ----------
+        observer: (ObserverClient) an initialized observer client of this hkbase
+        """
+
+        from .observer.notification import NotificationActions, NotificationObjects
+
+        def handle_notification(notification):
+            if notification.get('object') != NotificationObjects.REPOSITORY.value:
+                return
+            name = (notification.get('args') or {}).get('repository')
+            if notification.get('action') == NotificationActions.CREATE.value:
+                self._update_repositories(added=name)
+            # the REST observer client spells deletions 'delete'
+            elif notification.get('action') in (NotificationActions.DELETE.value, 'delete'):
+                self._update_repositories(removed=name)
+
+        observer.add_handler(handle_notification)
+
     def get_repositories(self) -> List[HKRepository]:
         """ Retrieve avaiable repositories in the hkbase.
 
@@ -151,15 +231,7 @@ class HKBase(object):
         (List[HKRepository]) list of available repositories in the hkbase
         """
 
-        try:
-            response = requests.get(url=self._repository_uri, verify=constants.SSL_VERIFY, headers=self._headers)
-            _, repositories = response_validator(response=response)
-
-            return [self.connect_repository(name=repo) for repo in repositories]
-        except HKBError as err:
-            raise err
-        except Exception as err:
-            raise HKpyError(message='Could not retrieve existing repositories.', error=err)
+        return [HKRepository(base=self, name=repo) for repo in self._view_repositories(refresh=True)]
 
 
     @staticmethod
@@ -193,7 +265,7 @@ class HKBase(object):
     def info(self) -> HKInfo:
         url = f'{self._base_uri}/info'
 
-        response = requests.get(url=url, headers=self._headers, verify=constants.SSL_VERIFY)
+        response = self._session.get(url=url, headers=self._headers, verify=constants.SSL_VERIFY)
         _, data = response_validator(response=response)
 
         return HKInfo.from_dict(data)
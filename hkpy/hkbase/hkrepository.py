@@ -3,22 +3,29 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 import urllib
-from typing import TypeVar, List, Dict, Union, Optional, Any, cast, Tuple
+from typing import TypeVar, List, Dict, Union, Optional, Any, cast, Tuple, Iterable, Iterator, Callable, BinaryIO, \
+    MutableMapping
 
 import os
 import copy
+import pathlib
 import json
+import time
+import hashlib
+import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import quote
 from io import TextIOWrapper, BufferedReader, BufferedIOBase, BytesIO
 from urllib3.response import HTTPResponse
 
-from . import HKTransaction, generate_id, constants
-from ..hklib import hkfy, HKEntity, HKContext
+from . import HKTransaction, HKPager, HKEntityCache, HKQueryCache, generate_id, constants
+from ..hklib import hkfy, hkfy_many, HKEntity, HKContext
 from ..hklib.fi.fi import FI
 from ..hklib.node import HKDataNode
-from ..oops import HKBError, HKpyError
-from ..utils import response_validator
+from ..oops import HKBError, HKpyError, HKBulkLoadError
+from ..utils import response_validator, iter_json_members, LRUCache, ByteSink, UploadStream, \
+    MultipartStream, parse_content_range, OBJECT_CHUNK_SIZE
 from ..common.result_set import ResultSet
 from .query import SPARQLResultSet
 from .query_management import HKStoredQuery
@@ -26,8 +33,82 @@ from .query_management import HKStoredQuery
 __all__  = ['HKRepository']
 
 HKBase = TypeVar('HKBase')
+ObserverClient = TypeVar('ObserverClient')
 HKEntityResultSet = ResultSet[HKEntity]
 
+_RAW_DATA_BATCH_SIZE = 64
+
+_BULK_RETRY_DELAY = 0.5
+
+FI_RESULTS_CACHE_SIZE = 1024
+
+_MISSING = object()
+
+
+def _fingerprint(entity: Dict) -> str:
+    """ Digest of an entity without its raw data, which is represented by its contentDigest property.
+    """
+
+    data = {key: value for key, value in entity.items() if key != 'raw_data'}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _iter_bulk_chunks(entities: Iterable[Union[HKEntity, Dict]], chunk_size: Optional[int] = None,
+                      chunk_bytes: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """ Serialize entities one at a time into JSON array payloads bounded by count and by size.
+
+    Yields (number of entities, payload) tuples. A single entity larger than chunk_bytes is sent alone.
+    """
+
+    parts = []
+    size = 2
+    for entity in entities:
+        if isinstance(entity, HKEntity):
+            entity = entity.to_dict()
+        elif not isinstance(entity, dict):
+            raise ValueError
+        part = json.dumps(entity).encode()
+
+        if parts and chunk_bytes is not None and size + len(part) + 1 > chunk_bytes:
+            yield len(parts), b'[' + b','.join(parts) + b']'
+            parts = []
+            size = 2
+
+        parts.append(part)
+        size += len(part) + 1
+
+        if chunk_size is not None and len(parts) >= chunk_size:
+            yield len(parts), b'[' + b','.join(parts) + b']'
+            parts = []
+            size = 2
+
+    if parts:
+        yield len(parts), b'[' + b','.join(parts) + b']'
+
+
+def _iter_response_members(response: requests.Response, chunk_size: int) -> Iterator[Tuple[Optional[str], Any]]:
+    """ Decode the members of a streamed JSON response one by one, closing the response when done.
+    """
+
+    try:
+        if not 200 <= response.status_code < 300:
+            response_validator(response=response)
+        yield from iter_json_members(response.iter_content(chunk_size=chunk_size), encoding=response.encoding or 'utf-8')
+    finally:
+        response.close()
+
+def _report_raw_data_failures(failures: Dict[str, Exception], errors: Optional[Dict[str, Exception]]) -> None:
+    """ Raise the raw data fetches that failed together, or report them in errors if it is given.
+    """
+
+    if not failures:
+        return
+    if errors is not None:
+        errors.update(failures)
+        return
+    ids = ', '.join(sorted(failures))
+    raise HKpyError(message=f'Could not retrieve the raw data of {len(failures)} entities: {ids}',
+                    error=next(iter(failures.values())))
 
 class HKRepository(object):
     """ This class establishes a communication interface with a repository within a hkbase.
@@ -45,10 +126,112 @@ class HKRepository(object):
         self.base = base
         self.name = name
         self._headers = base._headers
+        self._session = base._session
+        self._cache = None
+        self._query_cache = None
+        self._fi_cache = None
+        self._fi_generation = 0
 
     def __repr__(self):
         return f'{super().__repr__()}: {self.name}'
 
+    @property
+    def cache(self) -> Optional[HKEntityCache]:
+        return self._cache
+
+    def enable_cache(self, maxsize: Optional[int] = 10000, maxbytes: Optional[int] = None, ttl: Optional[float] = None,
+                     observer: Optional[ObserverClient] = None) -> HKEntityCache:
+        """ Cache the entities retrieved from the repository, so that get_entities only requests the ones not cached.
+
+        The entities changed through this object are evicted from the cache. Changes made by other clients are only
+        seen through the notifications of an observer, or once the entities expire.
+
+        Parameters
+        ----------
+        maxsize: (Optional[int]) maximum number of cached entities, None for unbounded
+        maxbytes: (Optional[int]) maximum total size of the cached entities, in bytes of JSON
+        ttl: (Optional[float]) seconds after which a cached entity expires
+        observer: (Optional[ObserverClient]) observer client whose notifications evict the changed entities
+
+        Returns
+        -------
+        (HKEntityCache) the repository's entity cache
+        """
+
+        self._cache = HKEntityCache(self.name, maxsize=maxsize, maxbytes=maxbytes, ttl=ttl)
+        if observer is not None:
+            self._cache.attach(observer)
+
+        return self._cache
+
+    def disable_cache(self) -> None:
+        """ Stop caching the entities retrieved from the repository.
+        """
+
+        self._cache = None
+
+    @property
+    def query_cache(self) -> Optional[HKQueryCache]:
+        return self._query_cache
+
+    def enable_query_cache(self, maxsize: Optional[int] = 256, maxbytes: Optional[int] = None,
+                           ttl: Optional[float] = None, observer: Optional[ObserverClient] = None) -> HKQueryCache:
+        """ Cache the results of hyql, sparql and run_stored_query, so that repeated queries are answered locally.
+
+        Queries are matched by their text with normalized whitespace and by their parameters. The results are dropped
+        whenever the repository changes through this object or, if an observer is given, through its notifications.
+        Stored queries run within a transaction are never cached.
+
+        Parameters
+        ----------
+        maxsize: (Optional[int]) maximum number of cached results, None for unbounded
+        maxbytes: (Optional[int]) maximum total size of the cached results, in bytes of JSON
+        ttl: (Optional[float]) seconds after which a cached result expires
+        observer: (Optional[ObserverClient]) observer client whose notifications invalidate the results
+
+        Returns
+        -------
+        (HKQueryCache) the repository's query cache
+        """
+
+        self._query_cache = HKQueryCache(self.name, maxsize=maxsize, maxbytes=maxbytes, ttl=ttl)
+        if observer is not None:
+            self._query_cache.attach(observer)
+
+        return self._query_cache
+
+    def disable_query_cache(self) -> None:
+        """ Stop caching the results of queries.
+        """
+
+        self._query_cache = None
+
+    def _invalidate(self, entities: Optional[Iterable[Union[str, HKEntity, Dict]]] = None) -> None:
+        if self._cache is not None:
+            if entities is None:
+                self._cache.clear()
+            else:
+                self._cache.evict(entities)
+        if self._query_cache is not None:
+            self._query_cache.clear()
+        if self._fi_cache is not None:
+            self._fi_generation += 1
+            self._fi_cache.clear()
+
+    def _run_query(self, kind: str, query: str, params: Optional[Dict], request: Callable[[], Any]) -> Any:
+        cache = self._query_cache
+        if cache is None:
+            return request()
+
+        key = cache.key(kind, query, params)
+        data = cache.get(key, _MISSING)
+        if data is _MISSING:
+            generation = cache.generation
+            data = request()
+            cache.put(key, data, generation)
+
+        return data
+
     def create_transaction(self, id_: Optional[str]=None) -> HKTransaction:
         """ Create a communication transaction with the repository.
 
@@ -61,10 +244,13 @@ class HKRepository(object):
         (HKTransaction) A HKTransaction object
         """
 
-        if id_ is not None:
-            return HKTransaction(id_, self)
+        return HKTransaction(id_=id_ if id_ is not None else generate_id(self), repository=self)
 
-        return HKTransaction(id_=generate_id(self))
+    def _check_transaction(self, transaction: HKTransaction) -> HKTransaction:
+        if transaction.repository is not self and (transaction.repository.name != self.name or
+                                                   transaction.repository.base.url != self.base.url):
+            raise HKpyError(message='The transaction belongs to another repository.')
+        return transaction
 
     def add_entities(self, entities: Union[HKEntity, List[HKEntity]], transaction: Optional[HKTransaction] = None, force_add: Optional[bool] = False) -> None:
         """ Add entities to repository.
@@ -76,13 +262,6 @@ class HKRepository(object):
         force_add: (Optional[bool] flag to bypass verification of preexisting entities and add all assuming they are new
         """
 
-        url = f'{self.base._repository_uri}/{self.name}/entity/'
-
-        parameters = {}
-
-        if force_add:
-            parameters['forceAdd'] = 'true'
-
         filtered_data_objects = []
 
         if not isinstance(entities, (list,tuple)):
@@ -95,24 +274,61 @@ class HKRepository(object):
         else:
             raise ValueError
 
+        if transaction is not None:
+            self._check_transaction(transaction).add_entities(entities)
+            return
+
         data_entities, entities = self.filter_data_entities(entities)
+
         if data_entities:
-            self.add_data_entities(data_entities)
+            try:
+                self.add_data_entities(data_entities)
+            finally:
+                self._invalidate(data_entities)
 
-        headers = copy.deepcopy(self._headers)
-        headers['Content-Type'] = 'application/json'
+        self._put_entities(json.dumps(entities), [entity['id'] for entity in entities], force_add=force_add)
 
-        response = requests.put(url=url, data=json.dumps(entities), headers=headers, params=parameters)
-        response_validator(response=response)
+    def _put_entities(self, payload: Union[str, bytes], ids: List[str], force_add: Optional[bool] = False,
+                      headers: Optional[Dict] = None) -> None:
+        url = f'{self.base._repository_uri}/{self.name}/entity/'
 
-    def add_entities_bulk(self, entities: Union[HKEntity, List[HKEntity]], transaction: Optional[HKTransaction] = None, force_add: Optional[bool] = False) -> None:
-        """ Add entities to repository.
+        parameters = {}
+
+        if force_add:
+            parameters['forceAdd'] = 'true'
+
+        tmp_headers = copy.deepcopy(self._headers)
+        tmp_headers['Content-Type'] = 'application/json'
+        tmp_headers.update(headers or {})
+
+        try:
+            response = self._session.put(url=url, data=payload, headers=tmp_headers, params=parameters)
+            response_validator(response=response)
+        finally:
+            self._invalidate(ids)
+
+    def add_entities_bulk(self, entities: Union[HKEntity, Dict, Iterable[Union[HKEntity, Dict]]], transaction: Optional[HKTransaction] = None,
+                          force_add: Optional[bool] = False, chunk_size: Optional[int] = None, chunk_bytes: Optional[int] = None,
+                          max_in_flight: int = 1, retries: int = 0,
+                          progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """ Add entities to repository through the bulk endpoint.
+
+        The entities are consumed lazily, so any iterable or generator can be given. They are serialized one at a
+        time into chunks bounded by chunk_size entities and chunk_bytes bytes, and each chunk is sent as its own
+        request. Without bounds, all entities are sent in a single request. When a chunk still fails after its retries,
+        no more chunks are sent; if others were already added, a HKBulkLoadError tells which entity offsets were, as
+        chunks complete out of order.
 
         Parameters
         ----------
-        entities : (Union[HKEntity, List[HKEntity]]) entity or list of entities
+        entities : (Union[HKEntity, Dict, Iterable[Union[HKEntity, Dict]]]) entity or iterable of entities
         transaction : (Optional[HKTransaction]) connection transaction
         force_add: (Optional[bool] flag to bypass verification of preexisting entities and add all assuming they are new
+        chunk_size: (Optional[int]) maximum number of entities per request
+        chunk_bytes: (Optional[int]) maximum payload size in bytes per request
+        max_in_flight: (int) number of chunks sent concurrently
+        retries: (int) number of times a failed chunk is resent before the load is aborted
+        progress: (Optional[Callable[[int, int], None]]) called with the number of entities and chunks sent so far
         """
 
         url = f'{self.base._repository_uri}/{self.name}/entity/bulk'
@@ -121,24 +337,76 @@ class HKRepository(object):
         if force_add:
             parameters['forceAdd'] = 'true'
 
-        if not isinstance(entities, (list,tuple)):
+        if isinstance(entities, (HKEntity, dict)):
             entities = [entities]
 
-        if isinstance(entities[0], HKEntity):
-            entities = [x.to_dict() for x in entities]
-        elif isinstance(entities[0], dict):
-            pass
-            # entities = list(map(hkfy, entities))
-        else:
-            raise ValueError
+        if transaction is not None:
+            self._check_transaction(transaction).add_entities(list(entities))
+            return
 
         headers = copy.deepcopy(self._headers)
         headers['Content-Type'] = 'application/octet-stream'
 
-        response = requests.put(url=url, data=BufferedReader(BytesIO(json.dumps(entities).encode())), headers=headers, params=parameters)
-        response_validator(response=response)
-
-    def filter_data_entities(self, entities: Union[HKEntity, List[HKEntity]]):
+        def send(payload):
+            for attempt in range(retries + 1):
+                try:
+                    response = self._session.put(url=url, data=payload, headers=headers, params=parameters)
+                    response_validator(response=response)
+                    return
+                except Exception as err:
+                    if attempt == retries:
+                        raise err
+                    logging.warning(f'Bulk chunk failed ({err}), retrying')
+                    time.sleep(_BULK_RETRY_DELAY * 2 ** attempt)
+
+        sent_entities = 0
+        sent_chunks = 0
+        failure = None
+        # (offset, count) of the chunks
+        succeeded = []
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as executor:
+            in_flight = {}
+
+            def collect(done):
+                nonlocal sent_entities, sent_chunks, failure
+                for future in done:
+                    offset, count = in_flight.pop(future)
+                    if future.exception() is not None:
+                        failure = failure or future.exception()
+                        failed.append((offset, count))
+                        continue
+                    succeeded.append((offset, count))
+                    sent_entities += count
+                    sent_chunks += 1
+                    if progress is not None:
+                        progress(sent_entities, sent_chunks)
+
+            try:
+                offset = 0
+                for count, payload in _iter_bulk_chunks(entities, chunk_size, chunk_bytes):
+                    while len(in_flight) >= max(1, max_in_flight):
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    if failure is not None:
+                        break
+                    in_flight[executor.submit(send, payload)] = (offset, count)
+                    offset += count
+
+                collect(wait(in_flight).done)
+            finally:
+                # the ids of a streamed load are not kept, so the whole cache is dropped
+                self._invalidate()
+
+        if failure is not None:
+            if sent_chunks == 0:
+                raise failure
+            raise HKBulkLoadError(message=f'Bulk load aborted after {sent_entities} entities in {sent_chunks} chunks.',
+                                  error=failure, succeeded=succeeded, failed=failed)
+
+    @staticmethod
+    def filter_data_entities(entities: Union[HKEntity, List[HKEntity]]):
         """ filter the entities with raw data.
         Return two lists:
             dataentities: entities with raw data.
@@ -164,94 +432,277 @@ class HKRepository(object):
                 nondataentites.append(entity)
         return dataentities, nondataentites
 
-    def add_data_entities(self, dataentities: Union[HKDataNode, List[HKDataNode]], transaction: Optional[HKTransaction]=None) -> None:
+    def add_data_entities(self, dataentities: Union[HKDataNode, List[HKDataNode]], transaction: Optional[HKTransaction]=None,
+                          skip_unchanged: bool = False, manifest: Optional[MutableMapping[str, str]] = None) -> None:
         """ Add entities with raw data to repository.
 
+        With skip_unchanged, the digest of the raw data of each entity is computed, without loading it in memory, and
+        kept in the contentDigest property of data nodes, or of copies of the dicts given, and the entities whose raw
+        data and properties did not change are not sent again. They are compared with the manifest, when given, and
+        otherwise with the entities stored in the repository, which are requested at once; only the properties sent
+        are compared, so that properties set by hkbase or by other clients are ignored.
+
         Parameters
         ----------
         entities : (Union[HKDataNode, List[HKDataNode]]) data node or list of data nodes
         transaction : (Optional[HKTransaction]) connection transaction
+        skip_unchanged: (bool) do not send the entities that are unchanged
+        manifest: (Optional[MutableMapping[str, str]]) mapping from id to the fingerprint of the entity last sent,
+            e.g. a dict saved between runs or a shelve, updated with every entity sent outside a transaction
         """
 
-        url = f'{self.base._repository_uri}/{self.name}/entity/'
-
         if not dataentities:
             return
 
         if not isinstance(dataentities, (list,tuple)):
             dataentities = [dataentities]
 
+        if skip_unchanged:
+            digested = []
+            for entity in dataentities:
+                if isinstance(entity, HKDataNode):
+                    entity.compute_digest()
+                elif isinstance(entity, dict):
+                    # the dicts belong to the caller, the digest is added to copies
+                    digest = UploadStream(entity['raw_data'], use_mmap=True).digest()
+                    entity = {**entity, 'properties': {**(entity.get('properties') or {}),
+                                                       constants.CONTENT_DIGEST: digest}}
+                digested.append(entity)
+            dataentities = digested
+
         if isinstance(dataentities[0], HKEntity):
-            dataentities = [x.to_dict() for x in entities]
+            dataentities = [x.to_dict() for x in dataentities]
         elif isinstance(dataentities[0], dict):
             pass
         else:
             raise ValueError
 
-        files = {}
-        data = {}
+        if skip_unchanged:
+            dataentities = self._changed_data_entities(dataentities, manifest)
+            if not dataentities:
+                return
+
+        if transaction is not None:
+            self._check_transaction(transaction).add_entities(dataentities)
+            return
+
+        self._put_data_entities(dataentities)
+
+        if manifest is not None:
+            for entity in dataentities:
+                manifest[entity['id']] = _fingerprint(entity)
+
+    def _changed_data_entities(self, dataentities: List[Dict], manifest: Optional[MutableMapping[str, str]]) -> List[Dict]:
+        if manifest is not None:
+            return [entity for entity in dataentities if manifest.get(entity['id']) != _fingerprint(entity)]
+
+        stored = {entity.id_: entity.to_dict() for entity in self.get_entities([entity['id'] for entity in dataentities])}
+
+        def differs(sent, other):
+            # properties and metaproperties are compared on the keys sent only
+            if isinstance(sent, dict):
+                other = other if isinstance(other, dict) else {}
+                return any(other.get(key) != value for key, value in sent.items())
+            return sent != other
+
+        def changed(entity):
+            other = stored.get(entity['id'])
+            return other is None or any(differs(value, other.get(key)) for key, value in entity.items()
+                                        if key != 'raw_data')
+
+        return [entity for entity in dataentities if changed(entity)]
+
+    def _put_data_entities(self, dataentities: List[Dict], headers: Optional[Dict] = None) -> None:
+        url = f'{self.base._repository_uri}/{self.name}/entity/'
+
+        files = []
+        data = []
         for entity in dataentities:
+            entity = dict(entity)
             file = entity.pop('raw_data')
-            files[entity['id']] = (entity['id'], file, entity['properties']['mimeType'])
-            data[entity['id']] = json.dumps(entity)
+            files.append((entity['id'], entity['id'], file, entity['properties'].get('mimeType')))
+            data.append((entity['id'], json.dumps(entity)))
 
-        response = requests.put(url=url, data=data, files=files)
-        response_validator(response=response)
+        # the files are only opened and read while the body is sent
+        body = MultipartStream(data, files)
+        tmp_headers = {**self._headers, 'Content-Type': body.content_type}
+        tmp_headers.update(headers or {})
 
+        try:
+            response = self._session.put(url=url, data=body, headers=tmp_headers)
+            response_validator(response=response)
+        finally:
+            self._invalidate([id_ for id_, _ in data])
 
-    def filter_entities(self, filter_: Union[str, Dict], bring_raw_data: Optional[bool]=False) -> List[HKEntity]:
+    def _post_filter(self, filter_: Union[str, Dict, List], stream: bool = False,
+                     params: Optional[Dict] = None) -> requests.Response:
+        url = f'{self.base._repository_uri}/{self.name}/entity/filter'
+        params = params or {}
+
+        if isinstance(filter_, str):
+            tmp_headers = copy.deepcopy(self._headers)
+            tmp_headers['Content-Type'] = 'text/plain'
+            return self._session.post(url=url, data=filter_, headers=tmp_headers, params=params, stream=stream)
+        elif isinstance(filter_, dict):
+            return self._session.post(url=url, data=json.dumps(filter_), headers=self._headers, params=params, stream=stream)
+        elif isinstance(filter_, list):
+            def check_list(the_filter, depth=0):
+                max_depth = 2
+                if depth <= max_depth:
+                    if isinstance(the_filter, str):
+                        return True
+                    elif isinstance(the_filter, dict):
+                        return True
+                    elif isinstance(the_filter, list):
+                        if all([check_list(i, depth+1) for i in the_filter]):
+                            return True
+                raise HKpyError(message='Invalid filter type.')
+
+            check_list(filter_)
+            return self._session.post(url=url, data=json.dumps(filter_), headers=self._headers, params=params, stream=stream)
+        else:
+            raise HKpyError(message='Invalid filter type.')
+
+    def filter_entities(self, filter_: Union[str, Dict], bring_raw_data: Optional[bool]=False,
+                        limit: Optional[int] = None, offset: Optional[int] = None,
+                        errors: Optional[Dict[str, Exception]] = None) -> List[HKEntity]:
         """ Get entities filtered by a css filter or json filter.
 
         Parameters
         ----------
         filter_ : (Union[str, Dict]) retrieval filter
         bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        limit: (Optional[int]) maximum number of entities to be retrieved
+        offset: (Optional[int]) number of matching entities to be skipped
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
 
         Returns
         -------
         (List[HKEntity]) list of retrieved entities
         """
 
-        url = f'{self.base._repository_uri}/{self.name}/entity/filter'
-
-        try:
-            if isinstance(filter_, str):
-                tmp_headers = copy.deepcopy(self._headers)
-                tmp_headers['Content-Type'] = 'text/plain'
-                response = requests.post(url=url, data=filter_, headers=tmp_headers, params={})
-            elif isinstance(filter_, dict):
-                response = requests.post(url=url, data=json.dumps(filter_), headers=self._headers)
-            elif isinstance(filter_, list):
-                def check_list(the_filter, depth=0):
-                    max_depth = 2
-                    if depth <= max_depth:
-                        if isinstance(the_filter, str):
-                            return True
-                        elif isinstance(the_filter, dict):
-                            return True
-                        elif isinstance(the_filter, list):
-                            if all([check_list(i, depth+1) for i in the_filter]):
-                                return True
-                    raise HKpyError(message='Invalid filter type.')
+        params = {}
+        if limit is not None:
+            params['limit'] = limit
+        if offset:
+            params['offset'] = offset
 
-                check_list(filter_)
-                response = requests.post(url=url, data=json.dumps(filter_), headers=self._headers)
-            else:
-                raise HKpyError(message='Invalid filter type.')
+        generation = self._cache.generation if self._cache is not None else None
 
+        try:
+            response = self._post_filter(filter_, params=params)
             _, data = response_validator(response=response)
         except (HKBError, HKpyError) as err:
             raise err
         except Exception as err:
             raise HKBError(message='Could not retrieve the entities.', error=err)
 
-        entities = [hkfy(entity) for entity in data.values()]
+        if self._cache is not None:
+            self._cache.put(data.values(), generation)
+
+        entities = hkfy_many(data.values(), copy=False)
         if bring_raw_data:
-            entities = self.retrieve_raw_data_from_data_entities(entities)
+            entities = self.retrieve_raw_data_from_data_entities(entities, errors=errors)
 
         return entities
 
-    def get_entities(self, ids: List[Union[str, Dict]], bring_raw_data: Optional[bool]=False) -> List[HKEntity]:
+    def iter_filter_entities(self, filter_: Union[str, Dict], bring_raw_data: Optional[bool]=False,
+                             chunk_size: int = 65536,
+                             errors: Optional[Dict[str, Exception]] = None) -> Iterator[HKEntity]:
+        """ Get entities filtered by a css filter or json filter, decoding the response as it arrives.
+
+        Unlike filter_entities, the response is never held in memory as a whole: each entity is yielded as soon
+        as it is received, so the memory use does not grow with the number of entities retrieved.
+
+        Parameters
+        ----------
+        filter_ : (Union[str, Dict]) retrieval filter
+        bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        chunk_size: (int) number of bytes read from the connection at a time
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
+
+        Returns
+        -------
+        (Iterator[HKEntity]) the retrieved entities
+        """
+
+        try:
+            response = self._post_filter(filter_, stream=True)
+        except (HKBError, HKpyError) as err:
+            raise err
+        except Exception as err:
+            raise HKBError(message='Could not retrieve the entities.', error=err)
+
+        entities = (hkfy(entity) for _, entity in _iter_response_members(response, chunk_size))
+        if not bring_raw_data:
+            yield from entities
+            return
+
+        # raw data is fetched for a batch of entities at a time so that the requests still run concurrently
+        batch = []
+        for entity in entities:
+            batch.append(entity)
+            if len(batch) == _RAW_DATA_BATCH_SIZE:
+                yield from self.retrieve_raw_data_from_data_entities(batch, errors=errors)
+                batch = []
+        if batch:
+            yield from self.retrieve_raw_data_from_data_entities(batch, errors=errors)
+
+    def paginate_filter(self, filter_: Union[str, Dict], page_size: int = 1000, offset: int = 0,
+                        prefetch: bool = True, bring_raw_data: Optional[bool] = False,
+                        errors: Optional[Dict[str, Exception]] = None) -> HKPager:
+        """ Get entities filtered by a css filter or json filter, one page at a time.
+
+        Parameters
+        ----------
+        filter_ : (Union[str, Dict]) retrieval filter
+        page_size: (int) maximum number of entities per page
+        offset: (int) number of matching entities to be skipped, e.g. the offset of an interrupted pager
+        prefetch: (bool) fetch the next page in background while the current one is consumed
+        bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
+
+        Returns
+        -------
+        (HKPager) iterable over the entities, whose pages() method iterates over the pages
+        """
+
+        def fetch(page_offset, limit):
+            return self.filter_entities(filter_, bring_raw_data=bring_raw_data, limit=limit, offset=page_offset,
+                                        errors=errors)
+
+        return HKPager(fetch, page_size=page_size, offset=offset, prefetch=prefetch)
+
+    def paginate_entities(self, ids: List[Union[str, Dict]], page_size: int = 1000, prefetch: bool = True,
+                          bring_raw_data: Optional[bool] = False,
+                          errors: Optional[Dict[str, Exception]] = None) -> HKPager:
+        """ Get entities by an array of ids, one page at a time.
+
+        Parameters
+        ----------
+        ids : List[Union[str, Dict]] entities identifiers
+        page_size: (int) maximum number of ids requested per page
+        prefetch: (bool) fetch the next page in background while the current one is consumed
+        bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
+
+        Returns
+        -------
+        (HKPager) iterable over the entities, whose pages() method iterates over the pages
+        """
+
+        def fetch(page_offset, limit):
+            return self.get_entities(ids[page_offset:page_offset + limit], bring_raw_data=bring_raw_data,
+                                     errors=errors)
+
+        return HKPager(fetch, page_size=page_size, prefetch=prefetch, total=len(ids))
+
+    def get_entities(self, ids: List[Union[str, Dict]], bring_raw_data: Optional[bool]=False,
+                     errors: Optional[Dict[str, Exception]] = None) -> List[HKEntity]:
         """ Get entities by an array of ids, where the id can be a string or an object containing remote information of
          virtual entities.
 
@@ -259,16 +710,37 @@ class HKRepository(object):
         ----------
         ids : List[Union[str, Dict]] entities identifiers
         bring_raw_data: Optional[bool] flag to define whether raw data should be fetched or not
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object whose raw data could
+            not be fetched; if given, such entities are returned without raw data instead of raising the errors
 
         Returns
         -------
         (List[HKEntity]) list of retrieved entities
         """
+
+        cache = self._cache
+        if cache is not None and isinstance(ids, list) and all(isinstance(id_, str) for id_ in ids):
+            found, missing = cache.get_many(dict.fromkeys(ids))
+            if missing:
+                generation = cache.generation
+                data = self._request_entities(missing)
+                cache.put(data.values(), generation)
+                found.update((entity.id_, entity) for entity in hkfy_many(data.values(), copy=False))
+            entities = [found[id_] for id_ in dict.fromkeys(ids) if id_ in found]
+        else:
+            entities = hkfy_many(self._request_entities(ids).values(), copy=False)
+
+        if bring_raw_data:
+            entities = self.retrieve_raw_data_from_data_entities(entities, errors=errors)
+
+        return entities
+
+    def _request_entities(self, ids: List[Union[str, Dict]]) -> Dict[str, Dict]:
         url = f'{self.base._repository_uri}/{self.name}/entity'
 
         try:
             if isinstance(ids, list):
-                response = requests.post(url=url, data=json.dumps(ids), headers=self._headers)
+                response = self._session.post(url=url, data=json.dumps(ids), headers=self._headers)
             else:
                 raise HKpyError(message='Invalid id type .')
 
@@ -278,30 +750,55 @@ class HKRepository(object):
         except Exception as err:
             raise HKBError(message='Could not retrieve the entities.', error=err)
 
-        entities = [hkfy(entity) for entity in data.values()]
-        if bring_raw_data:
-            entities = self.retrieve_raw_data_from_data_entities(entities)
-
-        return entities
+        return data
 
-    def retrieve_raw_data_from_data_entities(self, entities: List[HKEntity]) -> List[HKEntity]:
+    def retrieve_raw_data_from_data_entities(self, entities: List[HKEntity], max_concurrency: Optional[int] = None,
+                                             errors: Optional[Dict[str, Exception]] = None) -> List[HKEntity]:
         """ Retrive data from storage from data entities
 
         Obs.: This is probably temporary. Probably the data will come from hkbase directly
 
+        The objects are fetched concurrently over the pooled session. An object that cannot be fetched does not
+        abort the batch: once every object is fetched, the failures are raised together, or reported in errors.
+
         Parameters
         ----------
-        ids : List[HKEntity] entities
+        entities : List[HKEntity] entities
+        max_concurrency: (Optional[int]) maximum number of simultaneous object requests (defaults to the session pool size)
+        errors: (Optional[Dict[str, Exception]]) dict filled with the id and error of every object that could not be
+            fetched; if given, such entities are kept without raw data instead of raising the errors
 
         Returns
         -------
         (List[HKEntity]) list of data entities filled with their raw data
         """
 
-        for i in range(len(entities)):
-            if 'mimeType' in entities[i].properties:
-                raw_data = self.get_object(entities[i].id_)
-                entities[i] = HKDataNode(raw_data, id_=entities[i].id_, parent=entities[i].parent, properties=entities[i].properties, metaproperties=entities[i].metaproperties)
+        indexes = [i for i in range(len(entities)) if 'mimeType' in entities[i].properties]
+        if not indexes:
+            return entities
+
+        if max_concurrency is None:
+            max_concurrency = getattr(self._session, 'pool_maxsize', 8)
+
+        failures = {}
+
+        def fetch(i):
+            entity = entities[i]
+            try:
+                raw_data = self.get_object(entity.id_)
+            except Exception as err:
+                failures[entity.id_] = err
+                return
+            entities[i] = HKDataNode(raw_data, id_=entity.id_, parent=entity.parent, properties=entity.properties, metaproperties=entity.metaproperties)
+
+        if max_concurrency <= 1 or len(indexes) == 1:
+            for i in indexes:
+                fetch(i)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(indexes))) as executor:
+                list(executor.map(fetch, indexes))
+
+        _report_raw_data_failures(failures, errors)
 
         return entities
 
@@ -313,16 +810,28 @@ class HKRepository(object):
         ids : (Union[str, List[str], HKEntity, List[HKEntity]]) list of entities' ids or entities
         """
 
-        url = f'{self.base._repository_uri}/{self.name}/entity/'
-
         if not isinstance(ids, (list,tuple)):
             ids = [ids]
 
         if isinstance(ids[0], HKEntity):
             ids = [x.id_ for x in ids]
 
-        response = requests.delete(url=url, data=json.dumps(ids), headers=self._headers)
-        response_validator(response=response)
+        if transaction is not None:
+            self._check_transaction(transaction).delete_entities(ids)
+            return
+
+        self._delete_entities(ids)
+
+    def _delete_entities(self, ids: List[str], headers: Optional[Dict] = None) -> None:
+        url = f'{self.base._repository_uri}/{self.name}/entity/'
+
+        tmp_headers = {**self._headers, **(headers or {})}
+
+        try:
+            response = self._session.delete(url=url, data=json.dumps(ids), headers=tmp_headers)
+            response_validator(response=response)
+        finally:
+            self._invalidate(ids)
 
     def update_entities(self, entities: Union[HKEntity, List[HKEntity]], transaction: Optional[HKTransaction]=None) -> None:
         """ Update entities in the repository.
@@ -354,7 +863,7 @@ class HKRepository(object):
 
         if 'as_hk' in options and options['as_hk'] == True:
             entities = json.loads(fd)
-            entities = list(map(hkfy, entities.values()))
+            entities = hkfy_many(entities.values(), copy=False)
             self.add_entities(list(entities))
 
         else:
@@ -372,8 +881,11 @@ class HKRepository(object):
 
                 tmp_headers['context-parent'] = options['context']
 
-            response = requests.put(url=url, data=fd, params=options, headers=tmp_headers)
-            response_validator(response)
+            try:
+                response = self._session.put(url=url, data=fd, params=options, headers=tmp_headers)
+                response_validator(response)
+            finally:
+                self._invalidate()
 
     def clear(self) -> None:
         """ Delete all entities in the repository.
@@ -386,8 +898,11 @@ class HKRepository(object):
 
         url = f'{self.base._repository_uri}/{self.name}/entity'
 
-        response = requests.delete(url=url, data='*', headers=tmp_headers)
-        response_validator(response)
+        try:
+            response = self._session.delete(url=url, data='*', headers=tmp_headers)
+            response_validator(response)
+        finally:
+            self._invalidate()
 
     def hyql(self, query: str, transitivity: Optional[bool] = False) -> HKEntityResultSet:
         """ Performs a HyQL query on the repository and retrive its results.
@@ -412,11 +927,45 @@ class HKRepository(object):
         if transitivity:
             params['transitivity'] = 'true'
 
-        response = requests.post(url=url, data=query, params=params, headers=headers)
-        _, data = response_validator(response=response)
+        def request():
+            response = self._session.post(url=url, data=query, params=params, headers=headers)
+            return response_validator(response=response)[1]
+
+        data = self._run_query('hyql', query, params, request)
 
         return self._build_hyql_result(data)
 
+    def iter_hyql(self, query: str, transitivity: Optional[bool] = False, chunk_size: int = 65536) -> Iterator[List[Any]]:
+        """ Performs a HyQL query on the repository and yields its result rows as they arrive.
+
+        Parameters
+        ----------
+        query : (str) the HyQL query
+        transitivity: (Optional[bool]): Hierarchical links will be evaluated as transitive
+        chunk_size: (int) number of bytes read from the connection at a time
+
+        Returns
+        -------
+        (Iterator[List[Any]]) the result rows, each a list of HKEntity objects or values
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/query/'
+
+        headers = copy.deepcopy(self._headers)
+        headers['Content-Type'] = 'text/plain'
+
+        params = {}
+
+        if transitivity:
+            params['transitivity'] = 'true'
+
+        response = self._session.post(url=url, data=query, params=params, headers=headers, stream=True)
+
+        for key, entry in _iter_response_members(response, chunk_size):
+            if key is not None:
+                raise HKpyError(f'The given data is not of the expected format')
+            yield self._build_hyql_row(entry)
+
     def sparql(self, query: str, reasoning: Optional[bool] = None, by_pass: Optional[bool] = None) -> SPARQLResultSet:
         url = f'{self.base._repository_uri}/{self.name}/sparql/'
 
@@ -431,8 +980,11 @@ class HKRepository(object):
         if by_pass is not None:
             params['bypass'] = 'true' if by_pass else 'false'
 
-        response = requests.post(url=url, data=query, params=params, headers=headers)
-        _, data = response_validator(response=response)
+        def request():
+            response = self._session.post(url=url, data=query, params=params, headers=headers)
+            return response_validator(response=response)[1]
+
+        data = self._run_query('sparql', query, params, request)
 
         return self._build_sparql_result(data)
 
@@ -442,14 +994,36 @@ class HKRepository(object):
 
         url = f'{self.base._repository_uri}/{self.name}/storage'
 
-        response = requests.get(url=url, headers=self._headers)
+        response = self._session.get(url=url, headers=self._headers)
         _, data = response_validator(response=response)
 
         return data
 
-    def add_object(self, object_: [str, TextIOWrapper, BufferedReader, BufferedIOBase], mimetype: str,
-                   id_: Optional[str] = None) -> str:
-        """
+    def add_object(self, object_: Union[str, bytes, os.PathLike, TextIOWrapper, BufferedReader, BufferedIOBase],
+                   mimetype: str, id_: Optional[str] = None, chunk_size: int = OBJECT_CHUNK_SIZE, use_mmap: bool = False,
+                   progress: Optional[Callable[[int, Optional[int]], None]] = None, checksum: bool = False) -> str:
+        """ Store an object, streaming its content.
+
+        Files are sent in chunks of chunk_size bytes as they are read, with their size as Content-Length, so that
+        they are never held in memory as a whole.
+
+        Parameters
+        ----------
+        object_: (Union[str, bytes, os.PathLike, TextIOWrapper, BufferedReader, BufferedIOBase]) content, the path of
+            a file, or a file read from its current position; as for HKDataNode, a string that names an existing file
+            is its path
+        mimetype: (str) the object's mimetype
+        id_: (Optional[str]) the object's id, generated by hkbase if not given
+        chunk_size: (int) maximum number of bytes read and sent at once
+        use_mmap: (bool) map files in memory and send slices of the map instead of reading them
+        progress: (Optional[Callable[[int, Optional[int]], None]]) function called after each chunk with the number
+            of bytes sent so far and the total, None if unknown
+        checksum: (bool) send the SHA-256 digest of the content in a Digest header, so that hkbase can verify it;
+            the content is read twice, so non-seekable streams are not supported
+
+        Returns
+        -------
+        (str) the object's id
         """
 
         url = f'{self.base._repository_uri}/{self.name}/storage/object'
@@ -457,34 +1031,17 @@ class HKRepository(object):
         if id_ is not None:
             url = f'{url}/{urllib.parse.quote_plus(id_)}'
 
-        if isinstance(object_, (TextIOWrapper, BufferedReader, BufferedIOBase)):
-            def generator_from_reader(o, chunk_size=1024):
-                while True:
-                    chunk = o.read(chunk_size)
-                    if not chunk:
-                        break
-                    yield chunk
-            object_ = generator_from_reader(object_)
-        elif isinstance(object_, str) and os.path.isfile(object_):
-            def generator_from_file(o, chunk_size=1024):
-                with open(object_, 'rb') as f:
-                    chunk = f.read(chunk_size)
-                    while True:
-                        if not chunk:
-                            break
-                        yield chunk
-            object_ = generator_from_file(object_)
-        elif isinstance(object_, str):
-            pass # do nothing
-        elif isinstance(object_, bytes):
-            pass # do nothing
-        else:
-            raise HKpyError(message='Object not valid.')
+        if isinstance(object_, str) and os.path.isfile(object_):
+            object_ = pathlib.Path(object_)
+
+        body = UploadStream(object_, chunk_size=chunk_size, use_mmap=use_mmap, progress=progress)
 
         headers = copy.deepcopy(self._headers)
         headers['Content-Type'] = mimetype
+        if checksum:
+            headers['Digest'] = body.digest()
 
-        response = requests.put(url=url, data=object_, headers=headers)
+        response = self._session.put(url=url, data=body, headers=headers)
         _, data = response_validator(response=response)
 
         return data['objectId'] if 'objectId' in data else data
@@ -495,7 +1052,7 @@ class HKRepository(object):
 
         url = f'{self.base._repository_uri}/{self.name}/storage/object/{urllib.parse.quote_plus(id_)}'
 
-        response = requests.delete(url=url, headers=self._headers)
+        response = self._session.delete(url=url, headers=self._headers)
         response_validator(response=response)
 
     def get_object(self, id_: str, raw: Optional[bool] = False) -> Union[bytes, HTTPResponse]:
@@ -503,7 +1060,7 @@ class HKRepository(object):
         """
         url = f'{self.base._repository_uri}/{self.name}/storage/object/{urllib.parse.quote_plus(id_)}'
 
-        response = requests.get(url=url, headers=self._headers, stream=raw)
+        response = self._session.get(url=url, headers=self._headers, stream=raw)
         if raw:
             _, data = response_validator(response=response, content='raw')
         else:
@@ -511,6 +1068,104 @@ class HKRepository(object):
 
         return data
 
+    def download_object(self, id_: str, dest: Union[str, BinaryIO, bytearray, memoryview],
+                        chunk_size: int = OBJECT_CHUNK_SIZE, byte_range: Optional[Tuple[int, Optional[int]]] = None,
+                        parts: int = 1) -> int:
+        """ Stream a stored object, or a range of its bytes, into a file or a pre-allocated buffer.
+
+        The object is read in chunks of chunk_size bytes, straight into dest when it is a buffer, so that it is never
+        held in memory as a whole. With parts > 1, and if hkbase honours range requests, the object is split in that
+        many ranges, downloaded concurrently over the pooled session.
+
+        Parameters
+        ----------
+        id_: (str) the object's id
+        dest: (Union[str, BinaryIO, bytearray, memoryview]) path of the file to be written, a binary file open for
+            writing, from its current position, or a writable buffer large enough for the bytes downloaded
+        chunk_size: (int) maximum number of bytes read at once
+        byte_range: (Optional[Tuple[int, Optional[int]]]) the start and stop positions of the bytes to be downloaded,
+            as in a slice; a stop of None reads to the end of the object
+        parts: (int) maximum number of ranges downloaded concurrently; parts are written out of order, so that
+            non-seekable files are always written sequentially
+
+        Returns
+        -------
+        (int) the number of bytes written
+        """
+
+        url = f'{self.base._repository_uri}/{self.name}/storage/object/{urllib.parse.quote_plus(id_)}'
+        start, stop = byte_range if byte_range is not None else (0, None)
+        if start < 0 or (stop is not None and stop < start):
+            raise HKpyError(message='Byte range not valid.')
+
+        with ByteSink(dest) as sink:
+            # an empty range still creates or truncates the destination file
+            if stop == start:
+                return 0
+
+            partial = start > 0 or stop is not None or parts > 1
+            response = self._request_object(url, start, stop if partial else None, ranged=partial)
+            try:
+                if response.status_code == 206:
+                    first, last, total = parse_content_range(response.headers.get('Content-Range')) or (start, None, None)
+                    if first != start:
+                        raise HKpyError(message='Unexpected range received.')
+                    size = last + 1 - start if last is not None else None
+                else:
+                    # the whole object was sent, the bytes before the range are skipped
+                    self._skip(response.raw, start, chunk_size)
+                    size = stop - start if stop is not None else None
+
+                if parts <= 1 or response.status_code != 206 or size is None or not sink.seekable or \
+                        size < 2 * chunk_size:
+                    return sink.readinto(response.raw, 0, size, chunk_size)
+
+                part_size = max(chunk_size, -(-size // parts))
+                bounds = [(pos, min(pos + part_size, size)) for pos in range(0, size, part_size)]
+                sink.truncate(size)
+
+                def download(bounds):
+                    part_start, part_stop = bounds
+                    part = self._request_object(url, start + part_start, start + part_stop, ranged=True)
+                    try:
+                        if part.status_code != 206:
+                            raise HKpyError(message='Range requests are not honoured.')
+                        return sink.readinto(part.raw, part_start, part_stop - part_start, chunk_size)
+                    finally:
+                        part.close()
+
+                workers = min(len(bounds) - 1, getattr(self._session, 'pool_maxsize', 8))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(download, b) for b in bounds[1:]]
+                    # the first part is read from the response already open
+                    written = sink.readinto(response.raw, 0, bounds[0][1], chunk_size)
+                    return written + sum(future.result() for future in futures)
+            finally:
+                response.close()
+
+    def _request_object(self, url: str, start: int, stop: Optional[int], ranged: bool) -> requests.Response:
+        # compressed responses would not match the byte ranges
+        headers = {**self._headers, 'Accept-Encoding': 'identity'}
+        if ranged:
+            headers['Range'] = f'bytes={start}-{stop - 1 if stop is not None else ""}'
+
+        response = self._session.get(url=url, headers=headers, stream=True)
+        try:
+            response_validator(response=response, content='raw')
+        except Exception:
+            response.close()
+            raise
+
+        return response
+
+    @staticmethod
+    def _skip(source: BinaryIO, count: int, chunk_size: int) -> None:
+        while count > 0:
+            data = source.read(min(count, chunk_size))
+            if not data:
+                raise HKpyError(message='Byte range not valid.')
+            count -= len(data)
+
     def get_all_stored_queries(self, transaction_id: Optional[str] = None) -> List[HKStoredQuery]:
         url = f'{self.base._repository_uri}/{self.name}/stored-query'
 
@@ -520,7 +1175,7 @@ class HKRepository(object):
         if transaction_id is not None:
             headers['transactionId'] = transaction_id
 
-        response = requests.get(url=url, headers=headers)
+        response = self._session.get(url=url, headers=headers)
         _, data = response_validator(response=response)
 
         return [HKStoredQuery.from_dict(q) for q in data]
@@ -534,7 +1189,7 @@ class HKRepository(object):
         if transaction_id is not None:
             headers['transactionId'] = transaction_id
 
-        response = requests.get(url=url, headers=headers)
+        response = self._session.get(url=url, headers=headers)
         _, data = response_validator(response=response)
 
         return HKStoredQuery.from_dict(data)
@@ -548,8 +1203,12 @@ class HKRepository(object):
         if transaction_id is not None:
             headers['transactionId'] = transaction_id
 
-        response = requests.delete(url=url, headers=headers)
-        _, data = response_validator(response=response)
+        try:
+            response = self._session.delete(url=url, headers=headers)
+            _, data = response_validator(response=response)
+        finally:
+            if self._query_cache is not None:
+                self._query_cache.clear()
 
         return HKStoredQuery.from_dict(data)
 
@@ -568,8 +1227,12 @@ class HKRepository(object):
         if transaction_id is not None:
             headers['transactionId'] = transaction_id
 
-        response = requests.post(url=url, headers=headers, json=stored_query)
-        _, data = response_validator(response=response)
+        try:
+            response = self._session.post(url=url, headers=headers, json=stored_query)
+            _, data = response_validator(response=response)
+        finally:
+            if self._query_cache is not None:
+                self._query_cache.clear()
 
         return HKStoredQuery.from_dict(data)
 
@@ -594,8 +1257,15 @@ class HKRepository(object):
 
         url = f'{self.base._repository_uri}/{self.name}/stored-query/{query_id}/run'
 
-        response = requests.post(url=url, json=run_configuration, headers=headers)
-        _, data = response_validator(response=response)
+        def request():
+            response = self._session.post(url=url, json=run_configuration, headers=headers)
+            return response_validator(response=response)[1]
+
+        if transaction_id is not None:
+            data = request()
+        else:
+            data = self._run_query('stored', query_id, run_configuration, request)
+
         if proxy:
             return data
         try:
@@ -603,29 +1273,26 @@ class HKRepository(object):
         except HKpyError as e:
             return self._build_sparql_result(data)
 
-    def _build_hyql_result(self, data: Union[List[dict], List[List[dict]], List[Any]]) -> HKEntityResultSet:
+    @staticmethod
+    def _build_hyql_result(data: Union[List[dict], List[List[dict]], List[Any]]) -> HKEntityResultSet:
         # validate if data is of the correct type
         if not isinstance(data, list):
             raise HKpyError(f'The given data is not of the expected format')
 
-        row_matrix = list()
-        for entry in data:
-            if isinstance(entry, dict):
-                entry = [entry]
-            if isinstance(entry, list):
-                row = []
-                for e in entry:
-                    if isinstance(e, dict):
-                        row.append(hkfy(e))
-                    else:
-                        row.append(e)
-            else:
-                row = entry
-            row_matrix.append(row)
+        row_matrix = [HKRepository._build_hyql_row(entry) for entry in data]
 
         return HKEntityResultSet.build(row_matrix=row_matrix)
 
-    def _build_sparql_result(self, data) -> Union[SPARQLResultSet, bool]:
+    @staticmethod
+    def _build_hyql_row(entry: Union[dict, List[dict], Any]) -> Union[List[Any], Any]:
+        if isinstance(entry, dict):
+            entry = [entry]
+        if isinstance(entry, list):
+            return [hkfy(e) if isinstance(e, dict) else e for e in entry]
+        return entry
+
+    @staticmethod
+    def _build_sparql_result(data) -> Union[SPARQLResultSet, bool]:
         if 'head' in data and 'boolean' in data:
             return data['boolean']
         # validate if data is of the correct format
@@ -641,7 +1308,7 @@ class HKRepository(object):
         quoted_fi = quote(fi.__str__(), safe="");
         url = f'{self.base._repository_uri}/{self.name}/fi/{quoted_fi}'
 
-        response = requests.get(url=url, headers=self._headers, stream=raw)
+        response = self._session.get(url=url, headers=self._headers, stream=raw)
         if raw:
             _, data = response_validator(response=response, content='raw')
         else:
@@ -664,10 +1331,79 @@ class HKRepository(object):
         else:
             return data
 
+    @property
+    def fi_cache(self) -> Optional[LRUCache]:
+        return self._fi_cache
+
+    def resolve_fis(self, fis: Iterable[Union[FI, str]], max_concurrency: Optional[int] = None, memoize: bool = False,
+                    errors: Optional[Dict[str, Exception]] = None,
+                    cache_size: Optional[int] = FI_RESULTS_CACHE_SIZE) -> List[Any]:
+        """ Resolve many FIs, as resolve_fi does.
+
+        Identical FIs are resolved once and the distinct ones are resolved concurrently over the pooled session.
+        Memoized results are kept in the repository's fi_cache, bounded to cache_size entries, and dropped whenever
+        the repository changes through this object.
+
+        Parameters
+        ----------
+        fis: (Iterable[Union[FI, str]]) the FIs, or their string representations
+        max_concurrency: (Optional[int]) maximum number of simultaneous requests (defaults to the session pool size)
+        memoize: (bool) reuse and keep the results of previous resolutions
+        errors: (Optional[Dict[str, Exception]]) dict filled with every FI that could not be resolved and its error;
+            if given, such FIs resolve to None instead of raising the error
+        cache_size: (Optional[int]) maximum number of memoized results, None for unbounded; an existing fi_cache is
+            resized to it
+
+        Returns
+        -------
+        (List[Any]) the resolved FIs, in the order they were given; identical FIs share their result unless memoized
+        """
+
+        keys = [str(fi) for fi in fis]
+        results = dict.fromkeys(keys, _MISSING)
+
+        cache = None
+        if memoize:
+            if self._fi_cache is None:
+                self._fi_cache = LRUCache(maxsize=cache_size)
+            elif self._fi_cache.maxsize != cache_size:
+                self._fi_cache.resize(cache_size)
+            cache = self._fi_cache
+            for key in results:
+                results[key] = cache.get(key, _MISSING)
+
+        pending = [key for key, result in results.items() if result is _MISSING]
+        generation = self._fi_generation
+
+        def resolve(key):
+            try:
+                results[key] = self.resolve_fi(key)
+            except Exception as err:
+                if errors is None:
+                    raise
+                errors[key] = err
+                results[key] = None
+                return
+            if cache is not None and generation == self._fi_generation:
+                cache.put(key, results[key])
+
+        if max_concurrency is None:
+            max_concurrency = getattr(self._session, 'pool_maxsize', 8)
+
+        if max_concurrency <= 1 or len(pending) <= 1:
+            for key in pending:
+                resolve(key)
+        elif pending:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending))) as executor:
+                list(executor.map(resolve, pending))
+
+        # memoized results are copied, so that changing a returned entity does not change the cached one
+        return [copy.deepcopy(results[key]) if cache is not None else results[key] for key in keys]
+
     def persist_fi(self, fi):
 
         quoted_fi = quote(fi.__str__(), safe="");
         url = f'{self.base._repository_uri}/{self.name}/fi/{quoted_fi}'
 
-        response = requests.put(url=url, headers=self._headers)
+        response = self._session.put(url=url, headers=self._headers)
         response_validator(response=response)
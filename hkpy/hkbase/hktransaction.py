@@ -3,34 +3,143 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-import requests
-from abc import abstractmethod
+from typing import Dict, List, Optional, TypeVar, Union
 
+import logging
+
+from .writer import HKWriteBuffer
+from ..hklib import HKEntity
 from ..oops import HKBError, HKpyError
 from ..utils import response_validator
 
 __all__ = ['HKTransaction']
 
+HKRepository = TypeVar('HKRepository')
+
 class HKTransaction(object):
     """ This class establishes a communication interface with a transaction within a hkbase.
+
+    The writes made within a transaction are recorded locally, where repeated writes to the same entity are
+    coalesced, and only sent on commit, in the order they were made, with one request per run of writes of the
+    same kind, all bound to the transaction id.
     """
 
-    def __init__(self, id_, repository):
-        raise(NotImplementedError)
+    def __init__(self, id_: str, repository: HKRepository):
+        """ Initialize an instance of HKTransaction class.
+
+        Parameters
+        ----------
+        id_: (str) the transaction's id
+        repository: (HKRepository) the repository written to
+        """
+
         self.id_ = id_
         self.repository = repository
-    
+        self._buffer = HKWriteBuffer()
+        self._sent = False
+
     def __repr__(self):
         return f'{super().__repr__()}: {self.id_}'
-    
-    def commit(self) -> None:
-        url = f'{self.repository.base.repository_url}/{self.repository.name}/transaction/commit/{self.id_}'
-        
-        response = requests.post(url=url, headers=self.repository.base.headers)
-        response_validator(response=response)
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def add_entities(self, entities: Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) -> None:
+        """ Record the addition of entities.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) entity or list of entities
+        """
+
+        if isinstance(entities, (HKEntity, dict)):
+            entities = [entities]
+
+        for entity in entities:
+            self._buffer.put(entity)
+
+    def update_entities(self, entities: Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) -> None:
+        """ Record the update of entities.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) entity or list of entities
+        """
+
+        self.add_entities(entities)
+
+    def delete_entities(self, ids: Union[str, HKEntity, List[Union[str, HKEntity]]]) -> None:
+        """ Record the deletion of entities.
+
+        Parameters
+        ----------
+        ids : (Union[str, HKEntity, List[Union[str, HKEntity]]]) entities or their ids
+        """
+
+        if not isinstance(ids, (list, tuple)):
+            ids = [ids]
+
+        for id_ in ids:
+            self._buffer.delete(id_)
+
+    def commit(self, force_add: Optional[bool] = False) -> None:
+        """ Send the recorded writes and commit them.
+
+        If any request fails, the writes already sent are rolled back in the hkbase and the recorded ones are kept,
+        so that the commit can be retried.
+
+        Parameters
+        ----------
+        force_add: (Optional[bool]) flag to bypass verification of preexisting entities and add all assuming they
+            are new
+        """
+
+        if not len(self._buffer):
+            return
+
+        # the recorded writes are sent from a copy, so that they are all kept if the commit fails midway
+        batch = HKWriteBuffer()
+        batch.extend(self._buffer)
+
+        try:
+            self._sent = True
+            batch.send(self.repository, headers={'transactionId': self.id_}, force_add=force_add)
+            self._request('commit')
+            self._sent = False
+            self._buffer.clear()
+        except (HKBError, HKpyError) as err:
+            self._abort()
+            raise err
+        except Exception as err:
+            self._abort()
+            raise HKpyError(message='Transaction not committed.', error=err)
 
     def rollback(self) -> None:
-        url = f'{self.repository.base.repository_url}/{self.repository.name}/transaction/rollback/{self.id_}'
-        
-        response = requests.post(url=url, headers=self.repository.base.headers)
-        response_validator(response=response)
\ No newline at end of file
+        """ Discard the recorded writes.
+        """
+
+        self._buffer.clear()
+        if self._sent:
+            self._abort()
+
+    def _abort(self):
+        try:
+            self._request('rollback')
+            self._sent = False
+        except Exception as err:
+            logging.warning(f'Could not roll back transaction {self.id_}: {err}')
+
+    def _request(self, action):
+        url = f'{self.repository.base._repository_uri}/{self.repository.name}/transaction/{action}/{self.id_}'
+
+        response = self.repository._session.post(url=url, headers=self.repository._headers)
+        response_validator(response=response)
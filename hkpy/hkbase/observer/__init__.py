@@ -3,5 +3,14 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
+from . import clients as _clients
 from .clients import *
 from .notification import *
+from .dispatcher import *
+from .coalescer import *
+from .heartbeat import *
+
+def __getattr__(name):
+    if name in _clients.LAZY_CLIENTS:
+        return getattr(_clients, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -3,7 +3,67 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
+import sys
+import importlib
+
 from .observerclient import ObserverClient
 from .configurableobserverclient import ConfigurableObserverClient
-from .rabbitmqobserverclient import RabbitMQObserverClient
-from .restobserverclient import RESTObserverClient
+from .localobserverclient import LocalObserverClient
+
+__all__ = ['ObserverClient', 'ConfigurableObserverClient', 'LocalObserverClient', 'register_observer_client',
+           'get_client_class']
+
+# observer type -> (module, class) of its client; clients that depend on Flask or pika are only imported when used
+CLIENTS_BY_KEY = {
+    ObserverClient.TYPE_KEY: ('observerclient', 'ObserverClient'),
+    ConfigurableObserverClient.TYPE_KEY: ('configurableobserverclient', 'ConfigurableObserverClient'),
+    LocalObserverClient.TYPE_KEY: ('localobserverclient', 'LocalObserverClient'),
+    'rest': ('restobserverclient', 'RESTObserverClient'),
+    'rabbitmq': ('rabbitmqobserverclient', 'RabbitMQObserverClient'),
+}
+
+# clients resolved by the modules' __getattr__; they are left out of __all__, since the packages above star-import
+# this one, so 'from hkpy import *' does not bind them from Python 3.7 on and they have to be imported by name
+LAZY_CLIENTS = {'RESTObserverClient': 'restobserverclient', 'RabbitMQObserverClient': 'rabbitmqobserverclient'}
+
+def register_observer_client(type_key: str, module: str, class_name: str) -> None:
+    """ Register the client of an observer type, to be imported when the first client of that type is created.
+
+    Parameters
+    ----------
+    type_key: (str) the observer type, as informed by hkbase
+    module: (str) absolute name of the module that defines the client
+    class_name: (str) name of the client's class
+    """
+
+    CLIENTS_BY_KEY[type_key] = (module, class_name)
+
+def get_client_class(type_key: str) -> type:
+    """ Import the client of an observer type.
+
+    Parameters
+    ----------
+    type_key: (str) the observer type, as informed by hkbase
+
+    Returns
+    -------
+    (type) the client's class, or None if no client is registered for the type
+    """
+
+    entry = CLIENTS_BY_KEY.get(type_key)
+    if entry is None:
+        return None
+
+    module, class_name = entry
+    return getattr(importlib.import_module(module if '.' in module else f'{__name__}.{module}'), class_name)
+
+if sys.version_info < (3, 7):
+    # modules cannot define __getattr__ before Python 3.7
+    from .restobserverclient import RESTObserverClient
+    from .rabbitmqobserverclient import RabbitMQObserverClient
+    __all__ += list(LAZY_CLIENTS)
+
+def __getattr__(name):
+    if name in LAZY_CLIENTS:
+        return getattr(importlib.import_module(f'{__name__}.{LAZY_CLIENTS[name]}'), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
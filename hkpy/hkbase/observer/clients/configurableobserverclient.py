@@ -3,13 +3,12 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-import traceback
 import logging
 import requests
-import signal
 from abc import ABC
 
 from hkpy.hkbase.observer.clients.observerclient import ObserverClient, HKBase
+from hkpy.hkbase.observer.heartbeat import get_heartbeat_scheduler
 
 
 class ConfigurableObserverClient(ObserverClient):
@@ -40,6 +39,8 @@ class ConfigurableObserverClient(ObserverClient):
         is initialized. This function makes a request to the heartbeat endpoint of the hkbase observer service to
         reset the configuration timeout if the server stops receiving the heartbeat for this observer configuration
         it will be erased after it times out and the notifications will stop being emmited for its clients
+        observer_service_params['heartbeatScheduler']: (HeartbeatScheduler) scheduler that sends the heartbeats,
+        the one shared by the process if not given
         """
         super().__init__(hkbase)
 
@@ -53,6 +54,7 @@ class ConfigurableObserverClient(ObserverClient):
         self._observer_service_url = observer_service_options.get('url', None)
         self._observer_configuration = observer_service_options.get('observerConfiguration', None)
         self._observer_service_heartbeat_interval = observer_service_options.get('heartbeatInterval', -1)
+        self._heartbeat_scheduler = observer_service_options.get('heartbeatScheduler', None)
 
         self._heartbeat_timeout = None
         self._observer_id = None
@@ -86,7 +88,8 @@ class ConfigurableObserverClient(ObserverClient):
         response = requests.delete(f"{self._observer_service_url}/observer/{self._observer_id}", headers=headers)
         if not response.ok:
             raise Exception(f'[{response.status_code}] {response.content}')
-        signal.alarm(0)
+        if self._heartbeat_scheduler is not None:
+            self._heartbeat_scheduler.cancel(self._observer_id)
         logging.info(f'unregistered observer {self._observer_id}')
         self._observer_id = None
 
@@ -94,23 +97,15 @@ class ConfigurableObserverClient(ObserverClient):
         if self._observer_service_heartbeat_interval <= 0:
             return
 
-        heartbeat_interval = int(self._observer_service_heartbeat_interval / 1000)  # ms to s
+        heartbeat_interval = self._observer_service_heartbeat_interval / 1000  # ms to s
 
         headers = {}
         self.set_hkkbase_options(headers)
 
-        def heartbeat(signum, frame):
-            try:
-                response = requests.post(f"{self._observer_service_url}/observer/{observer_id}/heartbeat",
-                                         headers=headers)
-                response.raise_for_status()
-            except Exception as e:
-                traceback.print_exc()
-                logging.error(e)
-            signal.alarm(heartbeat_interval)
-
-        signal.signal(signal.SIGALRM, heartbeat)
-        signal.alarm(heartbeat_interval)
+        if self._heartbeat_scheduler is None:
+            self._heartbeat_scheduler = get_heartbeat_scheduler()
+        url = f"{self._observer_service_url}/observer/{observer_id}/heartbeat"
+        self._heartbeat_scheduler.schedule(observer_id, url, heartbeat_interval, headers)
 
     def set_hkkbase_options(self, params):
         params.update(self._hkbase_options)
@@ -0,0 +1,64 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import logging
+from typing import List, Optional
+
+from hkpy.hkbase.observer.clients.observerclient import ObserverClient, HKBase
+
+
+class LocalObserverClient(ObserverClient):
+    """
+    Observer client whose notifications are published in-process, e.g. to simulate a hkbase in tests
+    """
+    TYPE_KEY = 'local'
+
+    def __init__(self,
+                 hkbase: Optional[HKBase] = None,
+                 info=None,
+                 observer_options=None,
+                 hkbase_options=None,
+                 observer_service_params=None
+                 ):
+        """
+        Parameters
+        ----------
+        hkbase: (Optional[HKBase]) HKBase object that the client will observe
+        info: (Dict) info observer info from hkbase (unused)
+        observer_options: (Dict) observer initialization options (unused)
+        hkbase_options: (Dict) options to be used when communicating with hkbase (unused)
+        observer_service_params: (Dict) observer service parameters (unused)
+        """
+        super().__init__(hkbase)
+        self._initialized = False
+
+    def init(self):
+        logging.info("initializing local observer client")
+        self._initialized = True
+
+    def deinit(self):
+        self._initialized = False
+        self._stop_dispatcher()
+
+    def publish(self, action: str, object_: str, repository: str, entities: Optional[List[str]] = None):
+        """
+        Deliver a notification to the handlers, in the format of the notifications received from hkbase
+        Notifications published while the client is not initialized are discarded
+
+        Parameters
+        ----------
+        action: (str) a NotificationActions value, e.g. NotificationActions.DELETE.value
+        object_: (str) 'repository' or 'entities'
+        repository: (str) name of the affected repository
+        entities: (Optional[List[str]]) ids of the affected entities
+        """
+        if not self._initialized:
+            return
+
+        args = {'repository': repository}
+        if entities is not None:
+            args['entities'] = entities
+
+        self.notify({'action': action, 'object': object_, 'args': args})
@@ -3,8 +3,12 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-from typing import TypeVar
+from typing import TypeVar, Optional
 from abc import ABC, abstractmethod
+import inspect
+
+from hkpy.hkbase.observer.dispatcher import NotificationDispatcher, DispatcherStats
+from hkpy.hkbase.observer.coalescer import NotificationCoalescer
 HKBase = TypeVar('HKBase')
 
 
@@ -17,6 +21,8 @@ class ObserverClient(ABC):
     def __init__(self, hkbase: HKBase):
         self._hkbase = hkbase
         self._handlers = []
+        self._dispatcher = None
+        self._coalescer = None
 
     def get_type(self):
         """
@@ -58,10 +64,123 @@ class ObserverClient(ABC):
     def notify(self, notification):
         """
         Calls every handler passing a notification as single parameter
+        With coalescing enabled, the notification is gathered instead, and the handlers are called later
+
+        Parameters
+        ----------
+        notification: (Dict) notification received from HKBase or HKBase Observer Service
+        """
+        if self._coalescer is not None:
+            self._coalescer.add(notification)
+        else:
+            self._call_handlers(notification)
+
+    async def notify_async(self, notification):
+        """
+        Calls every handler passing a notification as single parameter, awaiting the handlers that are coroutines
 
         Parameters
         ----------
         notification: (Dict) notification received from HKBase or HKBase Observer Service
         """
+        if self._coalescer is not None:
+            self._coalescer.add(notification)
+            return
+        for handler in self._handlers:
+            result = handler(notification)
+            if inspect.isawaitable(result):
+                await result
+
+    def enable_dispatcher(self, max_queue_size=10000, workers=4, overflow='drop_oldest', block_timeout=None,
+                          loop=None):
+        """
+        Deliver the notifications received from a bounded queue, by worker threads or by tasks of an event loop,
+        so that receiving notifications does not wait for the handlers
+        The dispatcher runs while the client is initialized
+
+        Parameters
+        ----------
+        max_queue_size: (int) maximum number of notifications waiting to be delivered
+        workers: (int) number of notifications delivered concurrently
+        overflow: (str) policy when the queue is full: 'block', 'drop_newest' or 'drop_oldest'
+        block_timeout: (Optional[float]) seconds a notification waits for room with the 'block' policy
+        loop: (Optional[asyncio.AbstractEventLoop]) running event loop where the handlers are called, and coroutine
+        handlers awaited; if None, the handlers are called by threads
+
+        Returns
+        -------
+        (NotificationDispatcher) the client's dispatcher
+        """
+        deliver = self.notify if loop is None else self.notify_async
+        self._dispatcher = NotificationDispatcher(deliver, max_queue_size=max_queue_size, workers=workers,
+                                                  overflow=overflow, block_timeout=block_timeout, loop=loop)
+        return self._dispatcher
+
+    def enable_coalescing(self, max_batch_size=1000, max_delay=0.1):
+        """
+        Gather entity notifications over a time or count window and call the handlers once per repository and action,
+        with the entities merged: an entity created then updated is notified as created, and an entity created then
+        deleted is not notified
+        Handlers are called by the thread that completes the window, and coroutine handlers are not awaited
+        Receiving a notification therefore returns before the handlers are called, and their failures are only logged
+        and counted in the coalescer stats: coalescing cannot be combined with acknowledgements that must wait for
+        the handlers, and a dispatcher's latency then only measures the gathering
+
+        Parameters
+        ----------
+        max_batch_size: (int) number of entities gathered before the handlers are called
+        max_delay: (float) seconds an entity notification waits for others before the handlers are called
+
+        Returns
+        -------
+        (NotificationCoalescer) the client's coalescer
+        """
+        self._coalescer = NotificationCoalescer(self._call_handlers, max_batch_size=max_batch_size,
+                                                max_delay=max_delay)
+        return self._coalescer
+
+    @property
+    def coalescer(self) -> Optional[NotificationCoalescer]:
+        return self._coalescer
+
+    @property
+    def dispatcher(self) -> Optional[NotificationDispatcher]:
+        return self._dispatcher
+
+    def stats(self) -> Optional[DispatcherStats]:
+        """
+        Retrieves the statistics of the dispatcher: queue depth, notifications dropped and handler latency
+
+        Returns
+        -------
+        (Optional[DispatcherStats]) the statistics, or None if notifications are delivered as they are received
+        """
+        return self._dispatcher.stats() if self._dispatcher is not None else None
+
+    def dispatch(self, notification):
+        """
+        Deliver a received notification, through the dispatcher if there is one
+
+        Parameters
+        ----------
+        notification: (Dict) notification received from HKBase or HKBase Observer Service
+        """
+        if self._dispatcher is not None and self._dispatcher.running:
+            self._dispatcher.submit(notification)
+        else:
+            self.notify(notification)
+
+    def _start_dispatcher(self):
+        if self._dispatcher is not None:
+            self._dispatcher.start()
+
+    def _stop_dispatcher(self):
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
+        # the notifications still gathered are delivered before the client stops
+        if self._coalescer is not None:
+            self._coalescer.flush()
+
+    def _call_handlers(self, notification):
         for handler in self._handlers:
             handler(notification)
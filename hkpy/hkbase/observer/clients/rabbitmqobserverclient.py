@@ -9,12 +9,64 @@ import traceback
 import os
 import pika
 import pika.exceptions
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Event
 
 from hkpy.hkbase.observer.clients.configurableobserverclient import ConfigurableObserverClient
 from hkpy.hkbase.observer.clients.configurableobserverclient import HKBase
 
 
+class _AckTracker(object):
+    """
+    Acknowledges the messages of a channel once they are handled, several at a time when acks are batched
+    Only used from the thread of the channel's connection
+    """
+
+    def __init__(self, channel, batch_size=1, prefetch_count=0, requeue=False):
+        self.channel = channel
+        self.batch_size = batch_size
+        self.prefetch_count = prefetch_count
+        self.requeue = requeue
+        self._received = 0
+        self._received_at_check = 0
+        self._settled = {}
+        # every message up to the watermark is handled, and every message up to acked is acknowledged
+        self._watermark = 0
+        self._acked = 0
+        self._last_ok = 0
+
+    def received(self, delivery_tag):
+        self._received = max(self._received, delivery_tag)
+
+    def settle(self, delivery_tag, ok):
+        if not ok:
+            # a failed message is rejected on its own, so that the batched ack does not include it
+            self.channel.basic_nack(delivery_tag=delivery_tag, requeue=self.requeue)
+        self._settled[delivery_tag] = ok
+
+        while self._watermark + 1 in self._settled:
+            self._watermark += 1
+            if self._settled.pop(self._watermark):
+                self._last_ok = self._watermark
+
+        # the broker sends no more messages once the prefetch window is full, so a partial batch would never fill
+        stalled = (self.prefetch_count and self._received - self._acked >= self.prefetch_count and
+                   self._watermark == self._received)
+        if self._watermark - self._acked >= self.batch_size or stalled:
+            self.flush()
+
+    def flush_idle(self):
+        # a partial batch is acknowledged when no message was received since the previous check
+        if self._received == self._received_at_check:
+            self.flush()
+        self._received_at_check = self._received
+
+    def flush(self):
+        if self._last_ok > self._acked:
+            self.channel.basic_ack(delivery_tag=self._last_ok, multiple=self._last_ok - self._acked > 1)
+        self._acked = self._watermark
+
+
 class RabbitMQObserverClient(ConfigurableObserverClient):
     TYPE_KEY = 'rabbitmq'
 
@@ -37,6 +89,15 @@ class RabbitMQObserverClient(ConfigurableObserverClient):
         info['certificate']: (str) RabbitMQ connection certificate (if needed)
         observer_options: (Dict) observer initialization options
         observer_options['certificate']: (str) RabbitMQ connection certificate (if needed)
+        observer_options['prefetchCount']: (int) maximum number of unacknowledged messages of each channel (100)
+        observer_options['channels']: (int) number of channels consuming the queue (1)
+        observer_options['workers']: (int) number of messages handled concurrently (1); with more than one worker,
+        notifications may be handled out of order
+        observer_options['ackBatchSize']: (int) number of handled messages acknowledged at once (1)
+        observer_options['requeueOnFailure']: (bool) whether messages whose handling fails are requeued, instead of
+        rejected (False)
+        observer_options['connectionFactory']: (callable) function that receives the pika.ConnectionParameters and
+        returns a blocking connection (pika.BlockingConnection)
         hkbase_options: (Dict) options to be used when communicating with hkbase
         observer_service_params: (Dict) observer service parameters (if using specialized observer)
         """
@@ -54,12 +115,21 @@ class RabbitMQObserverClient(ConfigurableObserverClient):
             'defaultExchangeName': info.get('exchangeName', None),
             'exchangeOptions': info.get('exchangeOptions', {}),
             'certificate': info.get('certificate', observer_options.get('certificate', None)),
+            'prefetchCount': observer_options.get('prefetchCount', 100),
+            'channels': observer_options.get('channels', 1),
+            'workers': observer_options.get('workers', 1),
+            'ackBatchSize': observer_options.get('ackBatchSize', 1),
+            'requeueOnFailure': observer_options.get('requeueOnFailure', False),
         }
-        self._channel = None
+        self._connection_factory = observer_options.get('connectionFactory', pika.BlockingConnection)
+        self._channels = []
+        self._trackers = []
         self._connection = None
-        self._consumer_id = None
+        self._consumer_ids = []
         self._queue_name = None
         self._consumer_thread = None
+        self._executor = None
+        self._stopping = False
 
     def init(self):
         try:
@@ -78,37 +148,40 @@ class RabbitMQObserverClient(ConfigurableObserverClient):
             if self._config.get('certificate', False):
                 connection_params['credentials'] = self._config['certificate']
 
-            connection = pika.BlockingConnection(pika.ConnectionParameters(**connection_params))
-            channel = connection.channel()
-            result = channel.queue_declare(queue='', **self._config['exchangeOptions'])
+            connection = self._connection_factory(pika.ConnectionParameters(**connection_params))
+            channels = [connection.channel() for _ in range(self._config['channels'])]
+            result = channels[0].queue_declare(queue='', **self._config['exchangeOptions'])
             queue_name = result.method.queue
-            channel.queue_bind(queue_name, exchange=exchange_name)
+            channels[0].queue_bind(queue_name, exchange=exchange_name)
             logging.info(f"Bound to exchange {exchange_name}")
 
-            observer_id = self._observer_id
-
-            def callback(ch, method, properties, body):
-                try:
-                    message = json.loads(body.decode('utf-8'))
-                    if observer_id and message.get('observerId', '') == observer_id:
-                        self.notify(message.get('notification', {}))
-                    elif not observer_id:
-                        self.notify(message)
-                except Exception as e:
-                    traceback.print_exc()
-                    logging.error(e)
-
-            channel.basic_consume(queue=queue_name, on_message_callback=callback, auto_ack=True)
+            self._executor = ThreadPoolExecutor(max_workers=self._config['workers'],
+                                                thread_name_prefix='hkobserver-rabbitmq')
+            self._stopping = False
+            self._consumer_ids = []
+            trackers = []
+            for channel in channels:
+                # the broker only sends a channel prefetchCount messages that are not acknowledged
+                channel.basic_qos(prefetch_count=self._config['prefetchCount'])
+                tracker = _AckTracker(channel, self._config['ackBatchSize'], self._config['prefetchCount'],
+                                      self._config['requeueOnFailure'])
+                trackers.append(tracker)
+                self._consumer_ids.append(channel.basic_consume(queue=queue_name,
+                                                                on_message_callback=self._on_message(connection,
+                                                                                                     tracker)))
 
             def consumer():
-                logging.info(f" [*] Waiting for messages in {queue_name}. To exit press CTRL+C")
+                logging.info(f" [*] Waiting for messages in {queue_name}.")
                 try:
-                    channel.start_consuming()
-                except:
+                    while not self._stopping:
+                        connection.process_data_events(time_limit=0.25)
+                        for tracker in trackers:
+                            tracker.flush_idle()
+                except Exception:
                     logging.info('stopping AMQP consumer')
 
-            self._consumer_id = channel.basic_consume(queue=queue_name, on_message_callback=callback, auto_ack=True)
-            self._channel = channel
+            self._channels = channels
+            self._trackers = trackers
             self._queue_name = queue_name
             self._connection = connection
             self._config['exchangeName'] = exchange_name
@@ -118,39 +191,115 @@ class RabbitMQObserverClient(ConfigurableObserverClient):
             traceback.print_exc()
             logging.error(e)
 
+    def enable_dispatcher(self, *args, **kwargs):
+        """
+        Not supported: a message queued by a dispatcher would be acknowledged before it is handled, or dropped once
+        acknowledged; the 'workers' and 'prefetchCount' options bound concurrency and buffering instead
+        """
+        raise ValueError('RabbitMQ observer clients acknowledge messages once handled and cannot use a dispatcher, '
+                         'use the workers option instead')
+
+    def enable_coalescing(self, *args, **kwargs):
+        """
+        Not supported: a gathered message would be acknowledged before its handlers are called, even if they fail
+        """
+        raise ValueError('RabbitMQ observer clients acknowledge messages once handled and cannot coalesce them')
+
+    def _on_message(self, connection, tracker):
+        observer_id = self._observer_id
+
+        def handle(body):
+            message = json.loads(body.decode('utf-8'))
+            # handlers are called here, so that a message is only acknowledged once it is handled
+            if observer_id and message.get('observerId', '') == observer_id:
+                self.notify(message.get('notification', {}))
+            elif not observer_id:
+                self.notify(message)
+
+        def callback(ch, method, properties, body):
+            delivery_tag = method.delivery_tag
+            tracker.received(delivery_tag)
+
+            def done(future):
+                error = future.exception()
+                if error is not None:
+                    logging.error(f'Could not handle notification: {error}')
+                # channels may only be used from the thread of their connection
+                connection.add_callback_threadsafe(lambda: tracker.settle(delivery_tag, error is None))
+
+            self._executor.submit(handle, body).add_done_callback(done)
+
+        return callback
+
+    def _in_consumer_thread(self, function):
+        done = Event()
+
+        def call():
+            try:
+                function()
+            finally:
+                done.set()
+
+        self._connection.add_callback_threadsafe(call)
+        # the consumer may stop on its own, when the connection is lost
+        while not done.wait(0.1) and self._consumer_thread.is_alive():
+            pass
+
     def deinit(self):
         logging.info("Deiniting observer")
-        if self._channel is None:
+        if not self._channels:
             logging.info("Observer already deinited")
             return
-        try:
-            self._channel.basic_cancel(self._consumer_id)
-        except pika.exceptions.StreamLostError as e:
-            logging.warning(e)
-        logging.info('canceled AMQP consumer')
+
+        # no more messages are delivered, the ones being handled are still acknowledged
+        def cancel():
+            for channel, consumer_id in zip(self._channels, self._consumer_ids):
+                try:
+                    channel.basic_cancel(consumer_id)
+                except pika.exceptions.AMQPError as e:
+                    logging.warning(e)
+
+        if self._consumer_thread.is_alive():
+            self._in_consumer_thread(cancel)
+            logging.info('canceled AMQP consumer')
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._stop_dispatcher()
+
+        def stop():
+            for tracker in self._trackers:
+                tracker.flush()
+            self._stopping = True
+
+        if self._consumer_thread.is_alive():
+            self._in_consumer_thread(stop)
+        self._stopping = True
+        self._consumer_thread.join()
+        self._consumer_thread = None
+
         if self._observer_id is not None:
             self.unregister_observer()
         try:
-            self._channel.queue_delete(self._queue_name)
-        except pika.exceptions.ChannelWrongStateError as e:
+            self._channels[0].queue_delete(self._queue_name)
+        except pika.exceptions.AMQPError as e:
             logging.warning(e)
         logging.info(f"removed queue {self._queue_name}")
         self._queue_name = None
         self._config['exchangeName'] = self._config['defaultExchangeName']
-        self._consumer_id = None
+        self._consumer_ids = []
 
-        try:
-            self._channel.close()
-        except pika.exceptions.ChannelWrongStateError as e:
-            logging.warning(e)
-        self._channel = None
+        for channel in self._channels:
+            try:
+                channel.close()
+            except pika.exceptions.AMQPError as e:
+                logging.warning(e)
+        self._channels = []
+        self._trackers = []
         try:
             self._connection.close()
-        except pika.exceptions.ConnectionWrongStateError as e:
+        except pika.exceptions.AMQPError as e:
             logging.warning(e)
         self._connection = None
-        self._consumer_thread.join()
-        self._consumer_thread = None
 
     def _parse_config(self):
         url_with_protocol = self._config['broker'].replace('amqp://', '')
@@ -161,10 +310,9 @@ class RabbitMQObserverClient(ConfigurableObserverClient):
         else:
             port = None
 
-        ping_result = os.system("ping -c 1 " + host)
-        if ping_result != 0 and self._config.get('brokerExternal', False):
+        # the default broker is only probed when there is an alternative to it
+        if self._config.get('brokerExternal', False) and os.system("ping -c 1 " + host) != 0:
             url_with_protocol = self._config['brokerExternal'].replace('amqp://', '')
             url_components = url_with_protocol.split(':')
             host = url_components[0]
         return host, port
-
@@ -10,6 +10,7 @@ import requests
 from flask import jsonify, request
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.serving import make_server
 from threading import Thread
 import logging
 import socket
@@ -37,6 +38,13 @@ class RESTObserverClient(ConfigurableObserverClient):
         observer_options: (Dict) observer initialization options
         observer_options['port']: (int) port te be used when instantiating flask app for receiving callback requests
         observer_options['address']: (str) address use when instantiating flask app for receiving callback requests
+        observer_options['dispatch']: (str) 'sync' to call the handlers within the callback requests (default),
+        'threads' to acknowledge the requests at once and call the handlers from a pool of threads, or 'asyncio' to
+        call them from tasks of observer_options['loop']
+        observer_options['workers']: (int) number of notifications delivered concurrently when dispatching
+        observer_options['queueSize']: (int) maximum number of notifications waiting to be delivered
+        observer_options['overflow']: (str) policy when the queue is full: 'block', 'drop_newest' or 'drop_oldest'
+        observer_options['loop']: (asyncio.AbstractEventLoop) running event loop for the 'asyncio' dispatch
         hkbase_options: (Dict) options to be used when communicating with hkbase
         observer_service_params: (Dict) observer service parameters (if using specialized observer)
         flask_app: (Flask) flask application to be used for registering notification callback endpoints
@@ -51,6 +59,16 @@ class RESTObserverClient(ConfigurableObserverClient):
         self._address = observer_options.get('address', 'localhost')
         self._flask_app = flask_app
         self._listening_path = None
+        self._server = None
+
+        dispatch = observer_options.get('dispatch', 'sync')
+        if dispatch not in ('sync', 'threads', 'asyncio'):
+            raise ValueError(f'Unknown dispatch mode: {dispatch}')
+        if dispatch != 'sync':
+            self.enable_dispatcher(max_queue_size=observer_options.get('queueSize', 10000),
+                                   workers=observer_options.get('workers', 4),
+                                   overflow=observer_options.get('overflow', 'drop_oldest'),
+                                   loop=observer_options.get('loop') if dispatch == 'asyncio' else None)
 
         if self._port == 0:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -65,16 +83,20 @@ class RESTObserverClient(ConfigurableObserverClient):
     def init(self):
         logging.info("initializing REST observer client")
         try:
+            self._start_dispatcher()
             if self._use_internal_flask_app:
                 self._flask_app = Flask(__name__)
                 CORS(self._flask_app)
-                thread = Thread(target=self._flask_app.run, kwargs=dict(host=self._address, port=self._port))
+            self.setup_endpoints()
+            if self._use_internal_flask_app:
+                # a threaded werkzeug server, unlike app.run, can be shut down
+                self._server = make_server(self._address, self._port, self._flask_app, threaded=True)
+                thread = Thread(target=self._server.serve_forever)
                 thread.start()
                 logging.info(f"Flask Server initialized at port {self._port} for receiving callback requests of "
                              f"HKBase notifications")
             listening_path = f"http://{self._address}:{self._port}"
             self._listening_path = listening_path
-            self.setup_endpoints()
             if self.uses_specialized_observer():
                 self._observer_configuration['callbackEndpoint'] = listening_path
                 self.register_observer()
@@ -104,10 +126,12 @@ class RESTObserverClient(ConfigurableObserverClient):
             encoded_listening_path = urllib.parse.quote_plus(self._listening_path)
             response = requests.delete(f'{self._hkbase.url}/observer/{encoded_listening_path}', headers=headers)
             response.raise_for_status()
-        if self._use_internal_flask_app and self._flask_app is not None:
-            response = requests.post(f'{self._listening_path}/shutdown')
-            response.raise_for_status()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
             logging.info(f'Flask Server at port {self._port} was stopped')
+        self._stop_dispatcher()
         self._listening_path = None
         self._flask_app = None
         self._use_internal_flask_app = False
@@ -124,7 +148,7 @@ class RESTObserverClient(ConfigurableObserverClient):
         /repository/<repoName>/entity`: Entites were removed from repository `repoName`.
         """
 
-        notification_callback = self.notify
+        notification_callback = self.dispatch
 
         def repository_callback(action, repo_name):
             notification = {
@@ -165,16 +189,8 @@ class RESTObserverClient(ConfigurableObserverClient):
             entities_callback('delete', repo_name, entities)
             return jsonify(None), 200
 
-        def shutdown_callback():
-            shutdown_function = request.environ.get('werkzeug.server.shutdown')
-            if shutdown_function is None:
-                raise RuntimeError('Not running with the Werkzeug Server')
-            shutdown_function()
-            return jsonify(None), 200
-
         self._flask_app.route(f'/repository/<repo_name>', methods=['POST'])(created_repository_callback)
         self._flask_app.route(f'/repository/<repo_name>', methods=['DELETE'])(deleted_repository_callback)
         self._flask_app.route(f'/repository/<repo_name>/entity', methods=['POST'])(added_entities_callback)
         self._flask_app.route(f'/repository/<repo_name>/entity', methods=['PUT'])(changed_entities_callback)
         self._flask_app.route(f'/repository/<repo_name>/entity', methods=['DELETE'])(removed_entities_callback)
-        self._flask_app.route(f'/shutdown', methods=['POST'])(shutdown_callback)
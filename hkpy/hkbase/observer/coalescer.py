@@ -0,0 +1,168 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Callable, Dict
+from collections import OrderedDict, namedtuple
+
+import logging
+import threading
+
+from .notification import NotificationActions, NotificationObjects
+
+__all__ = ['NotificationCoalescer', 'CoalescerStats']
+
+CoalescerStats = namedtuple('CoalescerStats', ['received', 'delivered', 'cancelled', 'failed', 'pending'])
+
+_CREATE = NotificationActions.CREATE.value
+_UPDATE = NotificationActions.UPDATE.value
+_DELETE = NotificationActions.DELETE.value
+
+# (pending action, new action) -> net action of an entity, None when the two cancel out
+_MERGED_ACTIONS = {
+    (_CREATE, _CREATE): _CREATE,
+    (_CREATE, _UPDATE): _CREATE,
+    (_CREATE, _DELETE): None,
+    (_UPDATE, _CREATE): _UPDATE,
+    (_UPDATE, _UPDATE): _UPDATE,
+    (_UPDATE, _DELETE): _DELETE,
+    (_DELETE, _CREATE): _UPDATE,
+    (_DELETE, _UPDATE): _UPDATE,
+    (_DELETE, _DELETE): _DELETE,
+}
+
+class NotificationCoalescer(object):
+    """ Gathers entity notifications over a time or count window and delivers them merged, one notification per
+    repository and action.
+
+    Within a window, each entity keeps its net action: an entity created then updated is delivered as created, and
+    an entity created then deleted is not delivered at all. Repository notifications, and notifications in any other
+    format, are delivered as received, after the entity notifications gathered before them.
+
+    Notifications are delivered after add returns, often by another thread, and a delivery that fails is logged and
+    counted in the statistics rather than raised: the caller of add cannot tell whether the handlers succeeded.
+    """
+
+    def __init__(self,
+                 deliver: Callable[[Dict], None],
+                 max_batch_size: int = 1000,
+                 max_delay: float = 0.1):
+        """ Initialize an instance of NotificationCoalescer class.
+
+        Parameters
+        ----------
+        deliver: (Callable[[Dict], None]) function that delivers a notification to the handlers
+        max_batch_size: (int) number of entities gathered before they are delivered
+        max_delay: (float) seconds an entity notification waits for others before it is delivered
+        """
+
+        self.deliver = deliver
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        # repository -> entity id -> net action
+        self._pending = OrderedDict()
+        self._size = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        # flushes deliver one at a time, so that notifications are delivered in the order they were received
+        self._flush_lock = threading.RLock()
+        self._received = 0
+        self._delivered = 0
+        self._cancelled = 0
+        self._failed = 0
+
+    def add(self, notification: Dict) -> None:
+        """ Gather a notification, delivering the ones gathered if the batch is full. Safe to call from any thread.
+
+        Parameters
+        ----------
+        notification: (Dict) notification received from HKBase or HKBase Observer Service
+        """
+
+        args = notification.get('args') or {}
+        action = notification.get('action')
+        entities = args.get('entities')
+        if notification.get('object') != NotificationObjects.ENTITIES.value or entities is None or \
+                action not in (_CREATE, _UPDATE, _DELETE):
+            with self._flush_lock:
+                self.flush()
+                with self._lock:
+                    self._received += 1
+                    self._delivered += 1
+                self._deliver(notification)
+            return
+
+        with self._lock:
+            self._received += 1
+            merged = self._pending.setdefault(args.get('repository'), OrderedDict())
+            for id_ in entities:
+                self._merge(merged, id_, action)
+            full = self._size >= self.max_batch_size
+            if not full and self._size and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Deliver the notifications gathered.
+        """
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending, self._size = self._pending, OrderedDict(), 0
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            for repository, merged in pending.items():
+                entities_by_action = OrderedDict()
+                for id_, action in merged.items():
+                    entities_by_action.setdefault(action, []).append(id_)
+                for action, entities in entities_by_action.items():
+                    with self._lock:
+                        self._delivered += 1
+                    self._deliver({
+                        'action': action,
+                        'object': NotificationObjects.ENTITIES.value,
+                        'args': {'repository': repository, 'entities': entities}
+                    })
+
+    def stats(self) -> CoalescerStats:
+        """ Report the coalescer statistics.
+
+        Returns
+        -------
+        (CoalescerStats) notifications received and delivered, entity notifications that cancelled out, deliveries
+            that failed, and entities waiting to be delivered
+        """
+
+        with self._lock:
+            return CoalescerStats(self._received, self._delivered, self._cancelled, self._failed, self._size)
+
+    def _merge(self, merged, id_, action):
+        current = merged.pop(id_, None)
+        if current is None:
+            merged[id_] = action
+            self._size += 1
+            return
+
+        net = _MERGED_ACTIONS[(current, action)]
+        if net is None:
+            self._size -= 1
+            self._cancelled += 1
+        else:
+            # the entity moves to the end, as its last notification is the one that counts
+            merged[id_] = net
+
+    def _deliver(self, notification):
+        try:
+            self.deliver(notification)
+        except Exception:
+            logging.exception('Notification handler failed')
+            with self._lock:
+                self._failed += 1
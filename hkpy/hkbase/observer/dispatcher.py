@@ -0,0 +1,311 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Callable, Dict, Optional
+from collections import deque, namedtuple
+
+import time
+import asyncio
+import inspect
+import logging
+import threading
+
+__all__ = ['NotificationDispatcher', 'DispatcherStats']
+
+DispatcherStats = namedtuple('DispatcherStats', ['received', 'delivered', 'dropped', 'failed', 'queued',
+                                                 'max_queue_size', 'latency_avg', 'latency_max'])
+
+def _running_loop():
+    # asyncio.get_running_loop is only available from Python 3.7
+    get_running_loop = getattr(asyncio, 'get_running_loop', None)
+    if get_running_loop is None:
+        return asyncio._get_running_loop()
+    try:
+        return get_running_loop()
+    except RuntimeError:
+        return None
+
+class NotificationDispatcher(object):
+    """ Delivers notifications from a bounded queue, so that receiving a notification never waits for its handlers.
+
+    Notifications are delivered by a pool of threads or by tasks of an asyncio event loop, where coroutine handlers
+    are awaited. When the queue is full, the overflow policy decides what happens to a new notification:
+    'block' waits for room, up to block_timeout, 'drop_newest' discards it and 'drop_oldest' discards the oldest one
+    queued instead.
+    """
+
+    OVERFLOW_POLICIES = ('block', 'drop_newest', 'drop_oldest')
+
+    def __init__(self,
+                 deliver: Callable[[Dict], None],
+                 max_queue_size: int = 10000,
+                 workers: int = 4,
+                 overflow: str = 'drop_oldest',
+                 block_timeout: Optional[float] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        """ Initialize an instance of NotificationDispatcher class.
+
+        Parameters
+        ----------
+        deliver: (Callable[[Dict], None]) function that delivers a notification to the handlers, which may return an
+            awaitable when an event loop is given
+        max_queue_size: (int) maximum number of notifications waiting to be delivered
+        workers: (int) number of notifications delivered concurrently
+        overflow: (str) 'block', 'drop_newest' or 'drop_oldest'
+        block_timeout: (Optional[float]) seconds a notification waits for room with the 'block' policy before it is
+            dropped, None to wait indefinitely
+        loop: (Optional[asyncio.AbstractEventLoop]) running event loop where notifications are delivered by asyncio
+            tasks; if None, they are delivered by threads
+        """
+
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f'overflow must be one of {self.OVERFLOW_POLICIES}')
+
+        self.deliver = deliver
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.loop = loop
+
+        # notifications waiting to be delivered, None while the dispatcher is not running
+        self._queue = None
+        self._workers = []
+        self._stopping = False
+        # wake-ups of the workers and of the notifications waiting for room: conditions of _mutex for threads,
+        # events of the loop for asyncio
+        self._mutex = threading.Lock()
+        self._not_empty = None
+        self._not_full = None
+        self._lock = threading.Lock()
+        self._received = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._failed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        """ Start the workers. Safe to call from any thread, including the event loop's.
+        """
+
+        if self._queue is not None:
+            return
+
+        self._stopping = False
+        if self.loop is None:
+            self._not_empty = threading.Condition(self._mutex)
+            self._not_full = threading.Condition(self._mutex)
+            self._queue = deque()
+            self._workers = [threading.Thread(target=self._run, name=f'hkobserver-{i}', daemon=True)
+                             for i in range(self.workers)]
+            for worker in self._workers:
+                worker.start()
+        else:
+            def start():
+                # the events are created in the loop, which they belong to
+                self._not_empty = asyncio.Event()
+                self._not_full = asyncio.Event()
+                self._queue = deque()
+                self._workers = [self.loop.create_task(self._run_async()) for _ in range(self.workers)]
+            self._call_in_loop(start)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """ Stop the workers once the notifications queued are delivered.
+
+        Called from the event loop's thread, the workers are stopped without waiting for them, since they only run
+        once the caller returns to the loop.
+
+        Parameters
+        ----------
+        timeout: (Optional[float]) seconds to wait for the workers, None to wait indefinitely
+        """
+
+        if self._queue is None:
+            return
+
+        if self.loop is None:
+            # the workers are woken up, and return once the queue is empty
+            with self._mutex:
+                self._stopping = True
+                self._not_empty.notify_all()
+            for worker in self._workers:
+                worker.join(timeout)
+        elif _running_loop() is self.loop:
+            self._stopping = True
+            self._not_empty.set()
+        else:
+            async def stop():
+                self._stopping = True
+                self._not_empty.set()
+                await asyncio.wait(self._workers, timeout=timeout)
+            asyncio.run_coroutine_threadsafe(stop(), self.loop).result()
+
+        self._workers = []
+        self._queue = None
+
+    def submit(self, notification: Dict) -> bool:
+        """ Queue a notification to be delivered. Safe to call from any thread.
+
+        From the event loop's thread, a notification waiting for room with the 'block' policy is queued by a task,
+        since the loop cannot run while the caller waits, and is reported as accepted.
+
+        Parameters
+        ----------
+        notification: (Dict) notification received from HKBase or HKBase Observer Service
+
+        Returns
+        -------
+        (bool) whether the notification was queued, rather than dropped
+        """
+
+        with self._lock:
+            self._received += 1
+
+        if self._queue is None:
+            raise RuntimeError('The dispatcher is not running.')
+
+        if self.loop is None:
+            return self._put(notification)
+
+        if _running_loop() is self.loop:
+            if self.overflow == 'block':
+                self.loop.create_task(self._put_async(notification))
+                return True
+            return self._put_nowait(notification)
+
+        if self.overflow == 'block':
+            return asyncio.run_coroutine_threadsafe(self._put_async(notification), self.loop).result()
+
+        # queue operations are not thread-safe, they run in the loop without waiting for it
+        self.loop.call_soon_threadsafe(self._put_nowait, notification)
+        return True
+
+    def stats(self) -> DispatcherStats:
+        """ Report the dispatcher statistics.
+
+        Returns
+        -------
+        (DispatcherStats) notifications received, delivered, dropped, whose delivery failed, and queued, the queue
+            bound, and the average and maximum delivery time in seconds
+        """
+
+        with self._lock:
+            delivered = self._delivered + self._failed
+            return DispatcherStats(self._received, self._delivered, self._dropped, self._failed,
+                                   len(self._queue) if self._queue is not None else 0, self.max_queue_size,
+                                   self._latency_total / delivered if delivered else 0.0, self._latency_max)
+
+    def _full(self):
+        return 0 < self.max_queue_size <= len(self._queue)
+
+    def _call_in_loop(self, fn):
+        # waiting for the loop from its own thread would never return
+        if _running_loop() is self.loop:
+            return fn()
+
+        async def call():
+            return fn()
+        return asyncio.run_coroutine_threadsafe(call(), self.loop).result()
+
+    def _put(self, notification):
+        with self._mutex:
+            if self.overflow == 'block':
+                if not self._not_full.wait_for(lambda: not self._full(), self.block_timeout):
+                    self._drop()
+                    return False
+            elif self._full():
+                self._drop()
+                if self.overflow == 'drop_newest':
+                    return False
+                self._queue.popleft()
+            self._queue.append(notification)
+            self._not_empty.notify()
+            return True
+
+    def _put_nowait(self, notification):
+        if self._full():
+            self._drop()
+            if self.overflow == 'drop_newest':
+                return False
+            self._queue.popleft()
+        self._queue.append(notification)
+        self._not_empty.set()
+        return True
+
+    async def _put_async(self, notification):
+        deadline = self.loop.time() + self.block_timeout if self.block_timeout is not None else None
+        while self._full():
+            self._not_full.clear()
+            remaining = deadline - self.loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                self._drop()
+                return False
+            try:
+                await asyncio.wait_for(self._not_full.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        # nothing is awaited between the check for room and the append
+        self._queue.append(notification)
+        self._not_empty.set()
+        return True
+
+    def _drop(self):
+        with self._lock:
+            self._dropped += 1
+
+    def _record(self, start, failed):
+        latency = time.perf_counter() - start
+        with self._lock:
+            if failed:
+                self._failed += 1
+            else:
+                self._delivered += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    def _run(self):
+        queue = self._queue
+        while True:
+            with self._mutex:
+                while not queue and not self._stopping:
+                    self._not_empty.wait()
+                if not queue:
+                    return
+                notification = queue.popleft()
+                self._not_full.notify()
+
+            start = time.perf_counter()
+            try:
+                self.deliver(notification)
+                self._record(start, False)
+            except Exception:
+                logging.exception('Notification handler failed')
+                self._record(start, True)
+
+    async def _run_async(self):
+        queue = self._queue
+        while True:
+            while not queue:
+                if self._stopping:
+                    return
+                self._not_empty.clear()
+                await self._not_empty.wait()
+            notification = queue.popleft()
+            self._not_full.set()
+
+            start = time.perf_counter()
+            try:
+                result = self.deliver(notification)
+                if inspect.isawaitable(result):
+                    await result
+                self._record(start, False)
+            except Exception:
+                logging.exception('Notification handler failed')
+                self._record(start, True)
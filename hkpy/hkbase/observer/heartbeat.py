@@ -0,0 +1,188 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Dict, Hashable, Optional
+
+import time
+import heapq
+import random
+import logging
+import threading
+
+import requests
+
+from ..session import HKSession
+
+__all__ = ['HeartbeatScheduler', 'get_heartbeat_scheduler']
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+class _Heartbeat(object):
+
+    __slots__ = ('url', 'interval', 'headers', 'failures', 'sequence')
+
+    def __init__(self, url, interval, headers):
+        self.url = url
+        self.interval = interval
+        self.headers = headers
+        self.failures = 0
+        self.sequence = None
+
+class HeartbeatScheduler(object):
+    """ Sends the heartbeats of any number of observers from a single background thread, through a pooled session.
+
+    Heartbeats are spread by a random jitter, so that observers registered together do not beat together. A failed
+    heartbeat is retried after retry_delay seconds, doubled on each consecutive failure and never longer than the
+    observer's interval.
+    """
+
+    def __init__(self,
+                 session: Optional[requests.Session] = None,
+                 jitter: float = 0.1,
+                 retry_delay: float = 1.0,
+                 timeout: float = 10.0):
+        """ Initialize an instance of HeartbeatScheduler class.
+
+        Parameters
+        ----------
+        session: (Optional[requests.Session]) session used to send the heartbeats, a HKSession if None
+        jitter: (float) maximum fraction of the interval by which each heartbeat is randomly advanced
+        retry_delay: (float) seconds before the first retry of a failed heartbeat
+        timeout: (float) maximum seconds to wait for a heartbeat response, never longer than the observer's interval
+        """
+
+        self.session = session if session is not None else HKSession()
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+
+        # heap of (due time, sequence, key); an entry that is not the latest of its heartbeat is skipped
+        self._queue = []
+        self._heartbeats = {}
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._heartbeats)
+
+    def schedule(self, key: Hashable, url: str, interval: float, headers: Optional[Dict] = None) -> None:
+        """ Start sending heartbeats, replacing the ones scheduled with the same key.
+
+        Parameters
+        ----------
+        key: (Hashable) identifies the heartbeat, e.g. the observer id
+        url: (str) url where heartbeats are posted
+        interval: (float) seconds between heartbeats
+        headers: (Optional[Dict]) headers of the heartbeat requests
+        """
+
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+
+        with self._condition:
+            heartbeat = _Heartbeat(url, interval, dict(headers or {}))
+            self._heartbeats[key] = heartbeat
+            self._push(key, heartbeat, self._next(heartbeat.interval))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='hkobserver-heartbeat', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self, key: Hashable) -> None:
+        """ Stop sending the heartbeats of a key.
+
+        Parameters
+        ----------
+        key: (Hashable) identifies the heartbeat
+        """
+
+        with self._condition:
+            if self._heartbeats.pop(key, None) is not None:
+                self._condition.notify()
+
+    def failures(self, key: Hashable) -> int:
+        """ Number of consecutive heartbeats of a key that failed.
+
+        Parameters
+        ----------
+        key: (Hashable) identifies the heartbeat
+
+        Returns
+        -------
+        (int) number of failures since the last heartbeat that succeeded, 0 if the key is not scheduled
+        """
+
+        with self._condition:
+            heartbeat = self._heartbeats.get(key)
+            return heartbeat.failures if heartbeat is not None else 0
+
+    def _next(self, delay):
+        # heartbeats are only advanced, the observer service drops observers whose heartbeat is late
+        return time.monotonic() + delay * (1 - random.uniform(0, self.jitter))
+
+    def _push(self, key, heartbeat, due):
+        self._sequence += 1
+        heartbeat.sequence = self._sequence
+        heapq.heappush(self._queue, (due, self._sequence, key))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._heartbeats:
+                        # the thread ends when there is nothing to send, and is started again by schedule
+                        self._queue = []
+                        self._thread = None
+                        return
+                    due, sequence, key = self._queue[0]
+                    heartbeat = self._heartbeats.get(key)
+                    if heartbeat is None or heartbeat.sequence != sequence:
+                        heapq.heappop(self._queue)
+                        continue
+                    delay = due - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        break
+                    self._condition.wait(delay)
+
+            ok = self._send(heartbeat)
+
+            with self._condition:
+                # the heartbeat is only rescheduled if it was not canceled or replaced while it was sent
+                if self._heartbeats.get(key) is heartbeat:
+                    if ok:
+                        heartbeat.failures = 0
+                        self._push(key, heartbeat, self._next(heartbeat.interval))
+                    else:
+                        heartbeat.failures += 1
+                        retry = min(heartbeat.interval, self.retry_delay * 2 ** (heartbeat.failures - 1))
+                        self._push(key, heartbeat, self._next(retry))
+
+    def _send(self, heartbeat):
+        try:
+            response = self.session.post(heartbeat.url, headers=heartbeat.headers,
+                                         timeout=min(self.timeout, heartbeat.interval))
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logging.error(f'Heartbeat to {heartbeat.url} failed: {e}')
+            return False
+
+def get_heartbeat_scheduler() -> HeartbeatScheduler:
+    """ Retrieve the scheduler shared by the observer clients of the process, creating it on first use.
+
+    Returns
+    -------
+    (HeartbeatScheduler) the shared scheduler
+    """
+
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = HeartbeatScheduler()
+        return _default_scheduler
@@ -0,0 +1,121 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Callable, Iterator, List, Optional
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from ..hklib import HKEntity
+from ..oops import HKpyError
+
+__all__ = ['HKPager']
+
+class HKPager(object):
+    """ Iterates over a long listing of entities one page at a time, fetching the next page while the current
+    one is consumed.
+    """
+
+    def __init__(self,
+                 fetch: Callable[[int, int], List[HKEntity]],
+                 page_size: int = 1000,
+                 offset: int = 0,
+                 prefetch: bool = True,
+                 total: Optional[int] = None):
+        """ Initialize an instance of HKPager class.
+
+        Parameters
+        ----------
+        fetch: (Callable[[int, int], List[HKEntity]]) function that retrieves the page at an offset with a limit
+        page_size: (int) maximum number of entities per page
+        offset: (int) position of the first entity to be retrieved
+        prefetch: (bool) fetch the next page in background while the current one is consumed
+        total: (Optional[int]) size of the listing, if known; otherwise the scan ends at the first short page
+        """
+
+        if page_size <= 0:
+            raise ValueError('page_size must be positive.')
+
+        self.page_size = page_size
+        self.offset = offset
+        self.prefetch = prefetch
+        self.total = total
+        self._fetch = fetch
+        self._executor = None
+
+    def __iter__(self) -> Iterator[HKEntity]:
+        for page in self.pages():
+            yield from page
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def pages(self) -> Iterator[List[HKEntity]]:
+        """ Iterate over the pages, starting at the current offset.
+
+        Afterwards, offset is the position right after the last page yielded, so that an interrupted scan can be
+        resumed by a new pager.
+
+        Raises HKpyError when the size of the listing is unknown and a page repeats the previous one, as from a
+        server that ignores the offset: the rest of the listing cannot be reached.
+
+        Returns
+        -------
+        (Iterator[List[HKEntity]]) the pages, of page_size entities at most unless the server ignores paging
+        """
+
+        pending = self._submit(self.offset) if self.total is None or self.offset < self.total else None
+        previous_ids = None
+
+        try:
+            while pending is not None:
+                page = pending.result() if isinstance(pending, Future) else pending()
+                pending = None
+
+                if self.total is not None:
+                    # the size of the listing is known, so the scan advances by positions requested
+                    advance = min(self.page_size, self.total - self.offset)
+                    more = self.offset + advance < self.total
+                else:
+                    if not page:
+                        return
+                    # a server that ignores the offset answers every request with the same entities
+                    ids = [entity.id_ for entity in page]
+                    if ids == previous_ids:
+                        raise HKpyError(message=f'The server ignored the offset {self.offset}, the listing cannot '
+                                                f'be paged; retrieve it without a limit instead.')
+                    previous_ids = ids
+                    advance = len(page)
+                    # a short page is the last one and a longer one means the server returned everything at once
+                    more = len(page) == self.page_size
+
+                if more:
+                    pending = self._submit(self.offset + advance)
+
+                self.offset += advance
+                if page:
+                    yield page
+        finally:
+            if isinstance(pending, Future):
+                pending.cancel()
+            self.close()
+
+    def close(self) -> None:
+        """ Stop the background fetching.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _submit(self, offset):
+        if not self.prefetch:
+            return partial(self._fetch, offset, self.page_size)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hkpager')
+        return self._executor.submit(self._fetch, offset, self.page_size)
@@ -0,0 +1,112 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import re
+import json
+
+from .repositorycache import HKRepositoryCache
+
+__all__ = ['HKQueryCache']
+
+# string literals are kept as they are, any other run of whitespace is collapsed; line breaks are kept, since
+# they end the comments of some query languages
+_QUERY_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|\s+')
+
+def _normalize_token(match):
+    token = match.group()
+    if token[0] in '"\'':
+        return token
+    return '\n' if '\n' in token or '\r' in token else ' '
+
+class HKQueryCache(HKRepositoryCache):
+    """ A client-side cache of the results of the queries run on a repository, dropped whenever the repository
+    changes through local writes or the notifications of an observer client.
+
+    Results are cached as the JSON received from hkbase, so that each hit builds a new result set and so that the
+    cache can be bounded by bytes. Any entity may be part of any result, so every change to the repository drops
+    every result.
+    """
+
+    def __init__(self,
+                 repository: str,
+                 maxsize: Optional[int] = 256,
+                 maxbytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """ Initialize an instance of HKQueryCache class.
+
+        Parameters
+        ----------
+        repository: (str) name of the repository whose query results are cached
+        maxsize: (Optional[int]) maximum number of cached results, None for unbounded
+        maxbytes: (Optional[int]) maximum total size of the cached results, in bytes of JSON
+        ttl: (Optional[float]) seconds after which a cached result expires
+        """
+
+        super().__init__(repository, maxsize=maxsize, maxbytes=maxbytes, ttl=ttl)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """ Normalize the text of a query so that queries differing only in whitespace share their results.
+
+        Parameters
+        ----------
+        query: (str) the query
+
+        Returns
+        -------
+        (str) the query with every run of whitespace outside string literals replaced by a single space, or by a
+            single line break if it spans lines
+        """
+
+        return _QUERY_TOKENS.sub(_normalize_token, query).strip()
+
+    def key(self, kind: str, query: str, params: Optional[Dict] = None) -> Tuple:
+        """ Build the key of the results of a query.
+
+        Parameters
+        ----------
+        kind: (str) the kind of query, e.g. 'hyql', 'sparql' or 'stored'
+        query: (str) the query, or the stored query id
+        params: (Optional[Dict]) the parameters the query is run with
+
+        Returns
+        -------
+        (Tuple) the key
+        """
+
+        return (self.repository, kind, self.normalize(query), json.dumps(params or {}, sort_keys=True))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Retrieve the results of a query.
+
+        Parameters
+        ----------
+        key: (Hashable) the query's key
+        default: (Any) value returned if the results are not cached
+
+        Returns
+        -------
+        (Any) a new copy of the data received from hkbase, or default
+        """
+
+        data = self._data.get(key)
+        return json.loads(data) if data is not None else default
+
+    def put(self, key: Hashable, data: Any, generation: Optional[int] = None) -> None:
+        """ Cache the results of a query.
+
+        Parameters
+        ----------
+        key: (Hashable) the query's key
+        data: (Any) the data received from hkbase
+        generation: (Optional[int]) the generation read before the query was run; if the cache was cleared since
+            then, the results may be stale and are not cached
+        """
+
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._data.put(key, json.dumps(data).encode())
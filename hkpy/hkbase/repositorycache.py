@@ -0,0 +1,98 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Dict, Optional
+
+import threading
+
+from ..utils import LRUCache, CacheInfo
+
+__all__ = ['HKRepositoryCache']
+
+class HKRepositoryCache(object):
+    """ Base of the client-side caches of a repository, which drop their data whenever the repository changes
+    through local writes or the notifications of an observer client.
+
+    Data is cached serialized as UTF-8 encoded JSON, so that each hit builds new objects and so that the cache can be
+    bounded by bytes.
+    """
+
+    def __init__(self,
+                 repository: str,
+                 maxsize: Optional[int] = None,
+                 maxbytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """ Initialize an instance of HKRepositoryCache class.
+
+        Parameters
+        ----------
+        repository: (str) name of the repository whose data is cached
+        maxsize: (Optional[int]) maximum number of cached items, None for unbounded
+        maxbytes: (Optional[int]) maximum total size of the serialized items, in bytes
+        ttl: (Optional[float]) seconds after which a cached item expires
+        """
+
+        self.repository = repository
+        # items are bytes, so their length is their size
+        self._data = LRUCache(maxsize=maxsize, maxbytes=maxbytes, ttl=ttl, sizeof=len)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._observers = []
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def generation(self) -> int:
+        """ Counter incremented whenever cached data is dropped, used to discard responses requested before it.
+        """
+
+        return self._generation
+
+    def clear(self) -> None:
+        """ Remove everything from the cache.
+        """
+
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def info(self) -> CacheInfo:
+        """ Report the cache statistics.
+
+        Returns
+        -------
+        (CacheInfo) hits, misses, evictions, current and maximum size and bytes
+        """
+
+        return self._data.info()
+
+    def attach(self, observer) -> None:
+        """ Keep the cache coherent with the notifications received by an observer client.
+
+        Parameters
+        ----------
+        observer: (ObserverClient) an initialized observer client of the repository's hkbase
+        """
+
+        if observer not in self._observers:
+            observer.add_handler(self.handle_notification)
+            self._observers.append(observer)
+
+    def handle_notification(self, notification: Dict) -> None:
+        """ Drop the cached data affected by a notification that concerns the repository.
+
+        Parameters
+        ----------
+        notification: (Dict) notification received from HKBase or HKBase Observer Service
+        """
+
+        args = notification.get('args') or {}
+        if args.get('repository') == self.repository:
+            self._invalidate(notification, args)
+
+    def _invalidate(self, notification: Dict, args: Dict) -> None:
+        # by default any change to the repository drops everything
+        self.clear()
@@ -0,0 +1,53 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Optional, Union, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+__all__ = ['HKSession']
+
+class HKSession(requests.Session):
+    """ A requests session that keeps a pool of keep-alive connections to hkbase.
+    """
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 max_retries: int = 0,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 keep_alive: bool = True):
+        """ Initialize an instance of HKSession class.
+
+        Parameters
+        ----------
+        pool_connections: (int) number of per-host connection pools to keep
+        pool_maxsize: (int) maximum number of connections kept alive for each host
+        pool_block: (bool) block when every connection of a host is in use instead of opening a new one
+        max_retries: (int) number of retries on failed connections
+        timeout: (Optional[Union[float, Tuple[float, float]]]) default (connect, read) timeout in seconds
+        keep_alive: (bool) reuse connections across requests
+        """
+
+        super().__init__()
+
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=max_retries, pool_block=pool_block)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        return super().request(method, url, **kwargs)
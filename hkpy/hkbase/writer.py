@@ -0,0 +1,382 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Dict, List, Optional, TypeVar, Union
+from collections import OrderedDict
+
+import json
+import time
+import weakref
+import logging
+import threading
+
+from ..hklib import HKEntity
+from ..oops import HKpyError
+
+__all__ = ['HKWriteBuffer', 'BufferedRepositoryWriter']
+
+HKRepository = TypeVar('HKRepository')
+
+_PUT = 'put'
+_DATA_PUT = 'data'
+_DELETE = 'delete'
+
+class HKWriteBuffer(object):
+    """ Pending writes to a repository, where only the last write to each entity is kept.
+    """
+
+    def __init__(self):
+        # id -> (kind, payload), in the order of the last write to each entity; entities are serialized when
+        # buffered, so later changes to them are not sent, except for the data entities that have to go through
+        # add_entities and are kept as dicts
+        self._writes = OrderedDict()
+        self._bytes = 0
+        self.created = None
+
+    def __len__(self):
+        return len(self._writes)
+
+    @property
+    def nbytes(self) -> int:
+        """ Approximate size of the requests needed to send the writes.
+        """
+
+        return self._bytes
+
+    def put(self, entity: Union[HKEntity, Dict]) -> None:
+        """ Buffer the addition or update of an entity, replacing any earlier write to it.
+
+        Parameters
+        ----------
+        entity: (Union[HKEntity, Dict]) the entity
+        """
+
+        if isinstance(entity, HKEntity):
+            entity = entity.to_dict()
+        elif not isinstance(entity, dict):
+            raise ValueError
+
+        if 'raw_data' in entity:
+            self._write(entity['id'], _DATA_PUT, entity)
+        else:
+            self._write(entity['id'], _PUT, json.dumps(entity))
+
+    def delete(self, id_: Union[str, HKEntity]) -> None:
+        """ Buffer the deletion of an entity, replacing any earlier write to it.
+
+        Parameters
+        ----------
+        id_: (Union[str, HKEntity]) the entity or its id
+        """
+
+        if isinstance(id_, HKEntity):
+            id_ = id_.id_
+
+        self._write(id_, _DELETE, None)
+
+    def extend(self, newer: 'HKWriteBuffer') -> None:
+        """ Apply the writes of a newer buffer on top of this one.
+
+        Parameters
+        ----------
+        newer: (HKWriteBuffer) buffer with writes made after the ones in this buffer
+        """
+
+        for id_, (kind, payload) in newer._writes.items():
+            self._write(id_, kind, payload)
+
+    def clear(self) -> None:
+        """ Discard every pending write.
+        """
+
+        self._writes.clear()
+        self._bytes = 0
+        self.created = None
+
+    def send(self, repository: HKRepository, headers: Optional[Dict] = None, force_add: Optional[bool] = False) -> None:
+        """ Send the pending writes in the order they were made, with one request per run of writes of the same kind.
+
+        The writes of a run are removed from the buffer once its request succeeded, so that sending the buffer again
+        after a failure only sends the writes that are still pending.
+
+        Parameters
+        ----------
+        repository: (HKRepository) the repository written to
+        headers: (Optional[Dict]) additional headers of the requests, e.g. a transaction id
+        force_add: (Optional[bool]) flag to bypass verification of preexisting entities and add all assuming they
+            are new
+        """
+
+        while self._writes:
+            kind = None
+            run = []
+            for id_, (write_kind, payload) in self._writes.items():
+                if kind is not None and write_kind != kind:
+                    break
+                kind = write_kind
+                run.append((id_, payload))
+
+            ids = [id_ for id_, _ in run]
+            if kind == _DELETE:
+                repository._delete_entities(ids, headers=headers)
+            elif kind == _DATA_PUT:
+                repository._put_data_entities([entity for _, entity in run], headers=headers)
+            else:
+                payload = '[' + ','.join(payload for _, payload in run) + ']'
+                repository._put_entities(payload, ids, force_add=force_add, headers=headers)
+
+            for id_ in ids:
+                self._discard(id_)
+
+        self.clear()
+
+    def _write(self, id_, kind, payload):
+        # a write replaces the earlier one and moves the entity to the end of the order
+        self._discard(id_)
+        self._writes[id_] = (kind, payload)
+        self._bytes += self._size(id_, kind, payload)
+        if self.created is None:
+            self.created = time.monotonic()
+
+    def _discard(self, id_):
+        write = self._writes.pop(id_, None)
+        if write is not None:
+            self._bytes -= self._size(id_, *write)
+
+    @staticmethod
+    def _size(id_, kind, payload):
+        if kind == _PUT:
+            return len(payload) + 1
+        if kind == _DELETE:
+            return len(id_) + 3
+        return 0
+
+class _WriterState(object):
+    """ The pending writes of a BufferedRepositoryWriter and what is needed to send them.
+
+    Its background thread and finalizer only refer to the state, so that an unclosed writer can still be collected,
+    and its pending writes are sent when it is.
+    """
+
+    def __init__(self, repository, max_operations, max_bytes, flush_interval, force_add):
+        self.repository = repository
+        self.max_operations = max_operations
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.force_add = force_add
+
+        self.buffer = HKWriteBuffer()
+        self.failed = None
+        self.error = None
+        self.closed = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def __len__(self):
+        return len(self.buffer) + (len(self.failed) if self.failed is not None else 0)
+
+    def due(self):
+        buffer = self.buffer
+        return ((self.max_operations is not None and len(buffer) >= self.max_operations) or
+                (self.max_bytes is not None and buffer.nbytes >= self.max_bytes) or
+                (self.flush_interval is not None and buffer.created is not None and
+                 time.monotonic() - buffer.created >= self.flush_interval))
+
+    def flush(self):
+        with self.lock:
+            batch = self.buffer
+            self.buffer = HKWriteBuffer()
+            self.error = None
+
+        with self.flush_lock:
+            # writes that failed before are older than the ones just taken
+            if self.failed is not None:
+                self.failed.extend(batch)
+                batch, self.failed = self.failed, None
+
+            if not len(batch):
+                return
+
+            try:
+                batch.send(self.repository, force_add=self.force_add)
+            except Exception:
+                self.failed = batch
+                raise
+
+    def stop(self):
+        self.closed = True
+        thread, self.thread = self.thread, None
+        if thread is not None:
+            self.wakeup.set()
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def run(self):
+        while not self.closed:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            if self.closed:
+                return
+            if self.due() or self.failed is not None:
+                try:
+                    self.flush()
+                except Exception as err:
+                    logging.warning(f'Buffered writes could not be flushed ({err}), keeping them for the next flush')
+                    self.error = err
+
+def _state_attribute(name):
+    # attribute of the writer kept in its state, where the background thread and finalizer read it
+    return property(lambda self: getattr(self._state, name), lambda self, value: setattr(self._state, name, value))
+
+class BufferedRepositoryWriter(object):
+    """ Buffers the writes to a repository and sends them in batches.
+
+    Repeated writes to the same entity are coalesced, so that only the last one is sent. A batch is sent when the
+    number of pending writes, their size or their age reaches a threshold, when flush() is called and when the
+    writer is closed, which the context manager guarantees. The writer does not keep itself alive: the writes still
+    pending when an unclosed writer is garbage collected, or at the interpreter exit, are sent then, and logged if
+    they cannot be.
+    """
+
+    def __init__(self,
+                 repository: HKRepository,
+                 max_operations: Optional[int] = 1000,
+                 max_bytes: Optional[int] = 1 << 20,
+                 flush_interval: Optional[float] = 1.0,
+                 background: bool = True,
+                 force_add: Optional[bool] = False):
+        """ Initialize an instance of BufferedRepositoryWriter class.
+
+        Parameters
+        ----------
+        repository: (HKRepository) the repository written to
+        max_operations: (Optional[int]) number of pending writes that triggers a flush
+        max_bytes: (Optional[int]) approximate size of the pending writes that triggers a flush
+        flush_interval: (Optional[float]) maximum age in seconds of a pending write
+        background: (bool) flush from a background thread, so that writes do not wait for requests unless the
+            thread falls behind; otherwise, writes flush when a threshold is reached
+        force_add: (Optional[bool]) flag to bypass verification of preexisting entities and add all assuming they
+            are new
+        """
+
+        self._state = _WriterState(repository, max_operations, max_bytes, flush_interval, force_add)
+        if background:
+            self._state.thread = threading.Thread(target=self._state.run, name='hkwriter', daemon=True)
+            self._state.thread.start()
+
+        self._finalizer = weakref.finalize(self, _finalize_writer, self._state)
+
+    repository = _state_attribute('repository')
+    max_operations = _state_attribute('max_operations')
+    max_bytes = _state_attribute('max_bytes')
+    flush_interval = _state_attribute('flush_interval')
+    force_add = _state_attribute('force_add')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._state)
+
+    def add_entities(self, entities: Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) -> None:
+        """ Buffer the addition of entities.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) entity or list of entities
+        """
+
+        if not isinstance(entities, (list, tuple)):
+            entities = [entities]
+
+        state = self._state
+        with state.lock:
+            self._check()
+            for entity in entities:
+                state.buffer.put(entity)
+
+        self._after_write()
+
+    def update_entities(self, entities: Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) -> None:
+        """ Buffer the update of entities.
+
+        Parameters
+        ----------
+        entities : (Union[HKEntity, Dict, List[Union[HKEntity, Dict]]]) entity or list of entities
+        """
+
+        self.add_entities(entities)
+
+    def delete_entities(self, ids: Union[str, HKEntity, List[Union[str, HKEntity]]]) -> None:
+        """ Buffer the deletion of entities.
+
+        Parameters
+        ----------
+        ids : (Union[str, HKEntity, List[Union[str, HKEntity]]]) entities or their ids
+        """
+
+        if not isinstance(ids, (list, tuple)):
+            ids = [ids]
+
+        state = self._state
+        with state.lock:
+            self._check()
+            for id_ in ids:
+                state.buffer.delete(id_)
+
+        self._after_write()
+
+    def flush(self) -> None:
+        """ Send every pending write, including the ones of a failed background flush.
+        """
+
+        self._state.flush()
+
+    def close(self) -> None:
+        """ Stop the background thread and send every pending write.
+        """
+
+        if self._state.closed:
+            return
+
+        self._finalizer.detach()
+        self._state.stop()
+        self._state.flush()
+
+    def _check(self):
+        state = self._state
+        if state.closed:
+            raise HKpyError(message='The writer is closed.')
+        if state.error is not None:
+            error, state.error = state.error, None
+            raise HKpyError(message='Pending writes could not be flushed.', error=error)
+
+    def _after_write(self):
+        state = self._state
+        if not state.due():
+            return
+
+        if state.thread is None:
+            state.flush()
+            return
+
+        state.wakeup.set()
+        # writes wait for the background thread when it falls behind, or flush themselves while the writes of failed
+        # flushes pile up, which raises the error of each failed attempt to the writer
+        if state.max_operations is not None and len(state) >= 2 * state.max_operations:
+            state.flush()
+
+def _finalize_writer(state):
+    # called when an unclosed writer is collected, or at the interpreter exit while it is alive
+    state.stop()
+    try:
+        state.flush()
+    except Exception as err:
+        logging.error(f'{len(state)} buffered writes to repository {state.repository.name} were lost ({err})')
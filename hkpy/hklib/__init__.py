@@ -3,17 +3,88 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-from typing import Union, Dict
+from typing import Union, Dict, Iterable, List
 
 from ..utils import constants, generate_id
+from ..oops import HKpyError
 
 from .anchor import HKAnchor
 from .entity import HKEntity
 from .connector import HKConnector
 from .link import HKLink
-from .node import HKNode, HKContext, HKReferenceNode, HKTrail, HKAnyNode, HKDataNode
+from .node import HKContext, HKNode, HKReferenceNode, HKTrail, HKAnyNode, HKDataNode
 from .graphbuilder import HKGraphBuilder
 
+def _properties_from_dict(entity: Dict, copy: bool) -> Dict:
+    properties = entity.get('properties')
+    metaproperties = entity.get('metaproperties')
+
+    if metaproperties:
+        # metaproperties under this key are kept as plain properties, as they have always been
+        properties = {**properties, **metaproperties} if properties else dict(metaproperties)
+    elif properties is not None and copy:
+        properties = dict(properties)
+
+    return properties
+
+def _connector_from_dict(entity: Dict, copy: bool) -> HKConnector:
+    return HKConnector(id_=entity['id'], class_name=entity['className'], roles=entity['roles'],
+                       properties=_properties_from_dict(entity, copy))
+
+def _context_from_dict(entity: Dict, copy: bool) -> HKContext:
+    hke = HKContext(id_=entity['id'], parent=entity.get('parent'), properties=_properties_from_dict(entity, copy))
+    if 'interfaces' in entity:
+        hke.interfaces = entity['interfaces']
+    return hke
+
+def _node_from_dict(entity: Dict, copy: bool) -> HKNode:
+    hke = HKNode(id_=entity['id'], parent=entity.get('parent'), properties=_properties_from_dict(entity, copy))
+    if 'interfaces' in entity:
+        hke.interfaces = entity['interfaces']
+    return hke
+
+def _reference_node_from_dict(entity: Dict, copy: bool) -> HKReferenceNode:
+    hke = HKReferenceNode(id_=entity['id'], ref=entity.get('ref'), parent=entity.get('parent'),
+                          properties=_properties_from_dict(entity, copy))
+    if 'interfaces' in entity:
+        hke.interfaces = entity['interfaces']
+    return hke
+
+def _link_from_dict(entity: Dict, copy: bool) -> HKLink:
+    return HKLink(connector=entity['connector'], id_=entity['id'], binds=entity['binds'], parent=entity.get('parent'),
+                  properties=_properties_from_dict(entity, copy))
+
+def _graph_from_dict(entity: Dict, copy: bool) -> 'HKGraph':
+    hke = HKGraph()
+    for entity_type, graph_entities in entity.items():
+        if entity_type != 'type':
+            hke.add_entities(hkfy_many(graph_entities.values(), copy=copy))
+    return hke
+
+# keyed by the raw type strings so that a lookup costs a single dict access instead of BaseEnum comparisons;
+# anchors are not converted, as any other unsupported type
+_HKFY_BUILDERS = {
+    constants.HKType.CONNECTOR.value: _connector_from_dict,
+    constants.HKType.CONTEXT.value: _context_from_dict,
+    constants.HKType.NODE.value: _node_from_dict,
+    constants.HKType.REFERENCENODE.value: _reference_node_from_dict,
+    constants.HKType.LINK.value: _link_from_dict,
+    constants.HKType.GRAPH.value: _graph_from_dict,
+}
+
+def _hkfy(entity: Union[Dict, HKEntity], copy: bool) -> HKEntity:
+    if isinstance(entity, dict):
+        try:
+            builder = _HKFY_BUILDERS[entity['type']]
+        except KeyError:
+            raise HKpyError(message=f'Entity of unknown type: {entity.get("type")}.')
+        return builder(entity, copy)
+
+    if isinstance(entity, HKEntity):
+        return entity
+
+    raise HKpyError(message='Invalid entity format.')
+
 def hkfy(entity: Union[str, Dict]) -> HKEntity:
     """ Convert an entity in string or dict format to a HKEntity object.
 
@@ -26,53 +97,33 @@ def hkfy(entity: Union[str, Dict]) -> HKEntity:
     (HKEntity) The entity's correspondent HKEntity object
     """
 
-    # TODO: check_consistency
-    if isinstance(entity, HKEntity):
-        return entity
-        
-    if isinstance(entity, dict):
-        
-        # _check_consistancy()
-        hke = None
-        if entity['type'] == constants.HKType.CONNECTOR:
-            hke = HKConnector(id_=entity['id'], class_name=entity['className'], roles=entity['roles'])
-        
-        elif entity['type'] in ['context', 'node', 'ref']:
-            if entity['type'] == constants.HKType.CONTEXT:
-                hke = HKContext(id_=entity['id'], parent=entity.get('parent'))
-            elif entity['type'] == constants.HKType.NODE:
-                hke = HKNode(id_=entity['id'], parent=entity.get('parent'))
-            elif entity['type'] == constants.HKType.REFERENCENODE:
-                ref = entity['ref'] if 'ref' in entity else None
-                hke = HKReferenceNode(id_=entity['id'], ref=ref, parent=entity.get('parent'))
-            if 'interfaces' in entity:
-                hke.interfaces = entity['interfaces']
-
-        elif entity['type'] == constants.HKType.LINK:
-            hke = HKLink(connector=entity['connector'], id_=entity['id'], binds=entity['binds'], parent=entity.get('parent'))
-
-        elif entity['type'] == constants.HKType.ANCHOR:
-            raise NotImplementedError
-        elif entity['type'] == constants.HKType.GRAPH:
-            hke = HKGraph()
-            entities = []
-            for entity_type, graph_entity in entity.items():
-                if entity_type != 'type':
-                    for eid, e in graph_entity.items():
-                        entities.append(hkfy(e))
-            hke.add_entities(entities)
-        
-        if 'properties' in entity:
-            hke.add_properties(properties=entity['properties'])
-        if 'metaproperties' in entity:
-            hke.add_properties(properties=entity['metaproperties'])
-
-        return hke
-
-    # TODO: add a hkpyerror exection
-    raise(Exception)
+    return _hkfy(entity, True)
+
+def hkfy_many(entities: Iterable[Union[Dict, HKEntity]], copy: bool = True) -> List[HKEntity]:
+    """ Convert many entities in dict format to HKEntity objects.
+
+    Parameters
+    ----------
+    entities : (Iterable[Union[Dict, HKEntity]]) the entities in dict format
+    copy : (bool) whether the properties dicts are copied; pass False when the dicts are not used afterwards,
+        e.g. freshly decoded responses
+
+    Returns
+    -------
+    (List[HKEntity]) The entities' correspondent HKEntity objects, in the same order
+    """
+
+    builders = _HKFY_BUILDERS
+    hkentities = []
+    append = hkentities.append
+
+    for entity in entities:
+        builder = builders.get(entity.get('type')) if entity.__class__ is dict else None
+        append(builder(entity, copy) if builder is not None else _hkfy(entity, copy))
+
+    return hkentities
 
 
 from .graph import HKGraph
 
-__all__ = ['hkfy']
\ No newline at end of file
+__all__ = ['hkfy', 'hkfy_many']
@@ -12,6 +12,9 @@ from . import constants
 __all__ = ['HKConnector']
 
 class HKConnector(HKEntity):
+
+    __slots__ = ('class_name', 'roles')
+
     def __init__(self,
                  id_: str,
                  class_name: constants.ConnectorType,
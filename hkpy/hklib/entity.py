@@ -16,11 +16,15 @@ class HKEntity(object):
     """
     """
 
+    # entities are held by the million in graphs and result sets, so they carry no per-instance __dict__
+    # and their property dicts are only allocated when first used
+    __slots__ = ('type_', 'id_', '_properties', '_metaproperties')
+
     def __init__(self,
                  type_: Union[constants.HKType, constants.AnchorType],
                  id_: str,
-                 properties: Optional[Dict] = {},
-                 metaproperties: Optional[Dict] = {}) -> None:
+                 properties: Optional[Dict] = None,
+                 metaproperties: Optional[Dict] = None) -> None:
         """ Initialize an instance of HKAnchor class.
     
         Parameters
@@ -33,8 +37,28 @@ class HKEntity(object):
 
         self.type_ = type_
         self.id_ = id_
-        self.properties = {} if properties is None else properties
-        self.metaproperties = {} if metaproperties is None else metaproperties
+        self._properties = properties
+        self._metaproperties = metaproperties
+
+    @property
+    def properties(self) -> Dict:
+        if self._properties is None:
+            self._properties = {}
+        return self._properties
+
+    @properties.setter
+    def properties(self, properties: Dict) -> None:
+        self._properties = properties
+
+    @property
+    def metaproperties(self) -> Dict:
+        if self._metaproperties is None:
+            self._metaproperties = {}
+        return self._metaproperties
+
+    @metaproperties.setter
+    def metaproperties(self, metaproperties: Dict) -> None:
+        self._metaproperties = metaproperties
 
     def __repr__(self):
         return f'{super().__repr__()}: {self.id_}'
@@ -59,10 +83,10 @@ class HKEntity(object):
         self.properties[property] = value
 
     def get_property(self, key):
-        return self.properties.get(key)
+        return self._properties.get(key) if self._properties is not None else None
 
     def has_property(self, key):
-        return key in self.properties
+        return self._properties is not None and key in self._properties
 
     def add_metaproperties(self, **kwargs) -> None:
         """ Add metaproperties in the HKEntity.
@@ -96,14 +120,14 @@ class HKEntity(object):
 
 class HKParentedEntity(HKEntity):
 
+    __slots__ = ('parent',)
+
     def __init__(self,
                  type_: Union[constants.HKType, constants.AnchorType],
                  id_: str,
                  parent: Optional[str]=None,
-                 properties: Optional[Dict] = {},
-                 metaproperties: Optional[Dict] = {}):
-        from hkpy.hklib import HKContext
-
+                 properties: Optional[Dict] = None,
+                 metaproperties: Optional[Dict] = None):
         super().__init__(type_, id_, properties=properties, metaproperties=metaproperties)
         self.parent = parent
 
@@ -6,4 +6,4 @@
 from .fi import FI
 from .fianchor import FIAnchor
 from .fioperator import FIOperator
-from .fiparser import parse_anchor, parse_fi, parse_id
\ No newline at end of file
+from .fiparser import parse_anchor, parse_fi, parse_id, set_fi_cache_size, fi_cache_info, clear_fi_cache
\ No newline at end of file
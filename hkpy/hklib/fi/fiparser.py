@@ -5,38 +5,90 @@
 
 from lark import Lark, Token
 from lark import Transformer
+from lark.exceptions import LarkError
 
 from hkpy.hklib.fi import FI, FIOperator, FIAnchor
 from hkpy.hklib.fi.fi import BasicHKID, ExtendedHKID, IriHKID, HKID
 from hkpy.hklib.fi.grammar import FI_GRAMMAR
+from hkpy.utils.cache import LRUCache, CacheInfo
 import ast as astlib
+import threading
+
+FI_CACHE_SIZE = 4096
+
+# compiled parsers by (start symbol, parser algorithm)
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+_fi_cache = LRUCache(maxsize=FI_CACHE_SIZE)
+
+
+def _demote_literals(terminal):
+    # Earley resolves true/false/null as ids, so the LALR lexer must prefer IDSIMPLE to produce the same trees
+    if terminal.name in ('TRUE', 'FALSE', 'NULL'):
+        terminal.priority = -1
+
+
+def _get_parser(start: str = 'start', parser: str = 'lalr') -> Lark:
+    key = (start, parser)
+    if key not in _parsers:
+        with _parsers_lock:
+            if key not in _parsers:
+                options = {'edit_terminals': _demote_literals} if parser == 'lalr' else {}
+                _parsers[key] = Lark(FI_GRAMMAR, start=start, parser=parser, **options)
+    return _parsers[key]
+
+
+def _parse(text: str, start: str = 'start'):
+    try:
+        return _get_parser(start).parse(text)
+    except LarkError:
+        # the Earley parser accepts a few inputs that the LALR parser rejects
+        return _get_parser(start, 'earley').parse(text)
 
 
 def parse_fi(fi: str) -> FI:
     """
     Parse an FI string and returned the instantiated FI
+
+    Parse trees are kept in a LRU cache keyed by the FI string (see set_fi_cache_size and fi_cache_info); each call
+    builds its own FI from the tree, so callers never share FI objects.
     """
 
-    parser = Lark(FI_GRAMMAR)
-    ast = parser.parse(fi)
-    obj_fi = postProcessTree(ast)
+    ast = _fi_cache.get(fi)
+    if ast is None:
+        ast = _parse(fi)
+        _fi_cache.put(fi, ast)
 
-    return obj_fi
+    return postProcessTree(ast)
 
 def parse_id(id: str) -> HKID:
-    parser = Lark(FI_GRAMMAR, start="id")
-    ast = parser.parse(id)
+    ast = _parse(id, start="id")
     obj_id = processId(ast)
 
     return obj_id
 
 def parse_anchor(anchor: str) -> HKID:
-    parser = Lark(FI_GRAMMAR, start="anchor")
-    ast = parser.parse(anchor)
+    ast = _parse(anchor, start="anchor")
     obj_anchor = processAnchor(ast)
 
     return obj_anchor
 
+def set_fi_cache_size(size: int) -> None:
+    """
+    Set the maximum number of FI parse trees kept in cache (0 disables the cache)
+    """
+    _fi_cache.resize(size)
+
+def fi_cache_info() -> CacheInfo:
+    """
+    Return the hit, miss and size statistics of the parsed FI cache
+    """
+    return _fi_cache.info()
+
+def clear_fi_cache() -> None:
+    _fi_cache.clear()
+
 def postProcessTree(ast):
     return processFijs(ast)
 
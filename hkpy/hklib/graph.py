@@ -33,15 +33,17 @@ class HKGraph(object):
         # self.orphans = {}
         # self.relationless = {}
 
+        # id -> entity of every entity in the graph
+        self._entities = {}
+        # link id -> ids of the entities bound by the link, and its connector, as they were indexed
+        self._link_binds_map = {}
+        self._link_connector_map = {}
+
     def get_entity(self, id_):
         """
         """
 
-        for set_ in [self.nodes, self.contexts, self.links, self.connectors, self.references]:
-            if id_ in set_:
-                return set_[id_]
-
-        return None
+        return self._entities.get(id_)
 
     def add_entities(self, entities: Union[Dict, List[Dict], HKEntity, List[HKEntity]]) -> List[HKEntity]:
         """ Add an entity to the Hyperknowledge graph.
@@ -74,17 +76,23 @@ class HKGraph(object):
                 if entity.id_ == None:
                     entity.id_ = generate_id(entity=entity)
 
+                # a link added again replaces the previous one, which may have another connector or binds
+                if entity.id_ in self.links:
+                    self._unindex_link(entity.id_)
+
                 self.links[entity.id_] = entity
                 
                 if entity.connector not in self._connector_links_map:
                     self._connector_links_map[entity.connector] = {}
                 self._connector_links_map[entity.connector][entity.id_] = entity
+                self._link_connector_map[entity.id_] = entity.connector
 
+                bound = self._link_binds_map.setdefault(entity.id_, set())
                 for binds in entity.binds.values():
                     for bind in binds.keys():
+                        bound.add(bind)
                         if bind in self.binds:
-                            if entity.id_ not in self.binds[bind]:
-                                self.binds[bind][entity.id_] = entity
+                            self.binds[bind][entity.id_] = entity
                         else:
                             self.binds[bind] = {entity.id_: entity}
 
@@ -105,6 +113,7 @@ class HKGraph(object):
             else:
                 raise HKpyError(message='Invalid entity type.')
 
+            self._entities[entity.id_] = entity
             added_entities.append(entity)
             
             # set context
@@ -122,19 +131,19 @@ class HKGraph(object):
         """
         """
 
+        def _unset_context(entity):
+            parent = getattr(entity, 'parent', None)
+            if parent is not None and parent in self._context_entities_map:
+                self._context_entities_map[parent].pop(entity.id_, None)
+
         def _remove_links(ids):
             for id_ in ids:
-                del self.links[id_]
-
-            for bind, lks in self.binds.items():
-                for id_ in ids:
-                    if id_ in lks:
-                        del self.binds[bind][id_]
-
-            for cnt, lks in self._connector_links_map.items():
-                for id_ in ids:
-                    if id_ in lks:
-                        del self._connector_links_map[cnt][id_]
+                link = self.links.pop(id_, None)
+                if link is None:
+                    continue
+                del self._entities[id_]
+                self._unindex_link(id_)
+                _unset_context(link)
 
         if not isinstance(ids, (tuple, list)):
             ids = [ids]
@@ -152,24 +161,23 @@ class HKGraph(object):
 
                 # remove links
                 if entity.id_ in self.binds:
-                    to_delete = []
-                    for lk in self.binds[entity.id_].keys():
-                        to_delete.append(lk)
-
-                    _remove_links(ids=to_delete)
+                    _remove_links(ids=list(self.binds[entity.id_].keys()))
 
                 # remove node
                 if entity.type_ == constants.HKType.NODE:
                     del self.nodes[entity.id_]
                 elif entity.type_ == constants.HKType.CONTEXT:
-                    for e in self._context_entities_map[entity.id_].keys():
+                    for e in list(self._context_entities_map.get(entity.id_, {}).keys()):
                         self.remove_entities(e)
                     del self.contexts[entity.id_]
-                    del self._context_entities_map[entity.id_]
+                    self._context_entities_map.pop(entity.id_, None)
                 else:
                     del self.references[entity.id_]
                     del self.reference_entity_map[entity.id_]
 
+                del self._entities[entity.id_]
+                _unset_context(entity)
+
             elif entity.type_ == constants.HKType.LINK:
                 
                 # remove links
@@ -178,15 +186,28 @@ class HKGraph(object):
             elif entity.type_ == constants.HKType.CONNECTOR:
                 
                 # remove links
-                to_delete = self._connector_links_map[entity.id_].keys()
-                del self._connector_links_map[entity.id_]
+                to_delete = list(self._connector_links_map.pop(entity.id_, {}).keys())
                 _remove_links(ids=to_delete)
 
                 del self.connectors[entity.id_]
+                del self._entities[entity.id_]
 
             else:
                 raise HKpyError(message='Entity of unkwown type.')
 
+    def _unindex_link(self, id_):
+        # by the binds and connector recorded when the link was indexed, which may have changed since
+        for bind in self._link_binds_map.pop(id_, ()):
+            lks = self.binds.get(bind)
+            if lks is not None:
+                lks.pop(id_, None)
+                if not lks:
+                    del self.binds[bind]
+
+        lks = self._connector_links_map.get(self._link_connector_map.pop(id_, None))
+        if lks is not None:
+            lks.pop(id_, None)
+
     def to_graph(self, data: Union[Dict, List[HKEntity]]) -> None:
         """ Convert a set of entities to a HKGraph instance.
 
@@ -19,7 +19,9 @@ HKContext = TypeVar('HKContext')
 class HKLink(HKParentedEntity):
     """
     """
-    
+
+    __slots__ = ('connector', 'binds')
+
     def __init__(self,
                  connector: Union[str, HKConnector],
                  id_: Optional[str]=None,
@@ -3,10 +3,11 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-from typing import Optional, Union, List, Dict
+from typing import Optional, Union, List, Dict, BinaryIO
 from io import TextIOWrapper, BufferedReader, BufferedIOBase, BytesIO
 
 import os
+import pathlib
 import datetime
 import mimetypes
 
@@ -16,14 +17,29 @@ from . import constants
 from . import HKConnector
 from . import HKLink
 from . import HKAnchor
+from ..oops import HKpyError
+from ..utils import UploadStream, FileSource
 
 __all__ = ['HKContext', 'HKNode', 'HKReferenceNode', 'HKTrail', 'HKAnyNode', 'HKDataNode']
 
 class HKAnyNode(HKParentedEntity):
+
+    __slots__ = ('_interfaces',)
+
     def __init__(self, type_, id_, parent, properties, metaproperties):
         super().__init__(type_, id_, properties=properties, metaproperties=metaproperties)
         self.parent = parent.id_ if isinstance(parent, HKContext) else parent
-        self.interfaces = {}
+        self._interfaces = None
+
+    @property
+    def interfaces(self) -> Dict:
+        if self._interfaces is None:
+            self._interfaces = {}
+        return self._interfaces
+
+    @interfaces.setter
+    def interfaces(self, interfaces: Dict) -> None:
+        self._interfaces = interfaces
 
     def add_anchors(self, anchors: Union[HKAnchor, List[HKAnchor]]) -> None:
         """ Add anchors to the node.
@@ -66,6 +82,8 @@ class HKContext(HKAnyNode):
     """
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  id_: str,
                  parent: Optional[Union[str, HKEntity]]=None,
@@ -87,6 +105,8 @@ class HKNode(HKAnyNode):
     """
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  id_: str,
                  parent: Optional[Union[str, HKContext]]=None,
@@ -108,6 +128,8 @@ class HKReferenceNode(HKAnyNode):
     """
     """
 
+    __slots__ = ('ref',)
+
     def __init__(self,
                  ref: Optional[Union[str, HKEntity]]=None,
                  id_: Optional[str]=None,
@@ -146,15 +168,22 @@ class HKReferenceNode(HKAnyNode):
 class HKDataNode(HKAnyNode):  
     """
     A HKDataNode is a HKNode that carries media information, together with it mimetype. It is akin to a general Content Node.
+
+    Data given as a path or a file is not read when the node is created: the file is opened and streamed when the node
+    is uploaded, or read once raw_data is accessed.
     """
 
+    __slots__ = ('_raw_data', '_source')
+
     def __init__(self, raw_data: any, mimeType: Optional[str]=None, id_: Optional[str]=None, parent: Optional[Union[str, HKContext]]=None, 
                  properties: Optional[Dict]=None, metaproperties: Optional[Dict]=None):
         """ Initialize an instance of HKDataNode class.
     
         Parameters
         ----------
-        raw_data: (Optional[Union[str, HKEntity]]) The data which this entities represents
+        raw_data: (Union[str, bytes, bytearray, memoryview, mmap.mmap, os.PathLike, BinaryIO]) the data which this
+            entity represents: the path of a file, a binary or text file, read from its current position, or the data
+            itself; a string is taken for a path if it names an existing file
         mimeType: Optional[str]: String specifying the data type.
         id_: (Optional[str]) the reference node's unique id
         parent: (Optional[Union[str, HKContext]]) the context in which the reference node is setted
@@ -162,18 +191,23 @@ class HKDataNode(HKAnyNode):
         metaproperties: (Optional[Dict]) the type of any property
         """  
 
+        filename = None
+        source = None
         if isinstance(raw_data, (TextIOWrapper, BufferedReader, BufferedIOBase)):
-            filename = os.path.basename(raw_data.name)
-            raw_data = raw_data.buffer.read()
-        elif isinstance(raw_data, str) and os.path.isfile(raw_data):
-            filename = os.path.basename(raw_data)
-            raw_data = open(filename,'rb').read()
-        elif isinstance(raw_data, bytes): 
-            if not id_:
-                raise HKpyError(message='You should provide a node id.')
-            filename = id_
+            name = getattr(raw_data, 'name', None)
+            filename = os.path.basename(name) if isinstance(name, str) else None
+            # the file is read from the position it has now, on every read or upload of the data
+            source = FileSource(raw_data.buffer if isinstance(raw_data, TextIOWrapper) else raw_data)
+            raw_data = None
+        elif isinstance(raw_data, os.PathLike) or (isinstance(raw_data, str) and os.path.isfile(raw_data)):
+            # the path is kept as a pathlib.Path, so that uploads never have to guess whether a string is a path
+            source = pathlib.Path(raw_data)
+            filename = source.name
+            raw_data = None
 
         if not id_:
+            if not filename:
+                raise HKpyError(message='You should provide a node id.')
             id_ = filename
 
         if not properties:
@@ -185,14 +219,84 @@ class HKDataNode(HKAnyNode):
             if 'mimeType' in properties:
                 mimeType = properties['mimeType']
             else:
-                mimeType = mimetypes.guess_type(filename)[0]
+                mimeType = mimetypes.guess_type(filename or id_)[0]
                 properties['mimeType'] = mimeType
 
         super().__init__(type_=constants.HKType.NODE, id_=id_, parent=parent, properties=properties, metaproperties=metaproperties)
-        self.raw_data = raw_data
+        self._raw_data = raw_data
+        self._source = source
+
+    @property
+    def raw_data(self) -> any:
+        """ The data, read from its file when first accessed.
+        """
+
+        if isinstance(self._source, os.PathLike):
+            with open(self._source, 'rb') as file:
+                self._raw_data = file.read()
+            self._source = None
+        elif self._source is not None:
+            self._raw_data = self._source.open().read()
+            self._source = None
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, raw_data: any) -> None:
+        self._raw_data = raw_data
+        self._source = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """ Whether the data is held in memory, rather than in a file not read yet.
+        """
+
+        return self._source is None
+
+    def open_raw_data(self) -> BinaryIO:
+        """ Open the data for reading, without loading it in memory if it is in a file.
+
+        A file given to the node is returned as it is, positioned where it was when given; a file that is not
+        seekable can only be read once, by this method, raw_data or an upload.
+
+        Returns
+        -------
+        (BinaryIO) a binary file with the data
+        """
+
+        if isinstance(self._source, os.PathLike):
+            return open(self._source, 'rb')
+        elif self._source is not None:
+            return self._source.open()
+        elif isinstance(self._raw_data, str):
+            return BytesIO(self._raw_data.encode())
+        else:
+            return BytesIO(self._raw_data)
+
+    @property
+    def digest(self) -> Optional[str]:
+        """ The digest of the data, if computed, as in an HTTP Digest header.
+        """
+
+        return self.properties.get(constants.CONTENT_DIGEST)
+
+    def compute_digest(self) -> str:
+        """ Compute the SHA-256 digest of the data, without loading it in memory, and keep it in the contentDigest
+        property.
+
+        Returns
+        -------
+        (str) the digest, e.g. sha-256=base64
+        """
+
+        digest = UploadStream(self._source if self._source is not None else self._raw_data, use_mmap=True).digest()
+        self.properties[constants.CONTENT_DIGEST] = digest
+        return digest
 
     def to_dict(self) -> Dict:
         """ Convert a HKDataNode to a dict.
+
+        Data not loaded yet is represented by its path, as a pathlib.Path, or by its file, as a FileSource, which are
+        streamed from the start of the data whenever the dict is uploaded.
         
         Returns
         -------
@@ -200,13 +304,15 @@ class HKDataNode(HKAnyNode):
         """
         jobj = super().to_dict()
         
-        jobj['raw_data'] = self.raw_data
+        jobj['raw_data'] = self._source if self._source is not None else self._raw_data
         return jobj
 
 class HKTrail(HKAnyNode):
     """
     """
 
+    __slots__ = ('steps',)
+
     def __init__(self,
                  id_: Optional[str]=None,
                  parent: Optional[Union[str, HKContext]]=None,
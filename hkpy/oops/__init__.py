@@ -3,6 +3,6 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-from .oops import HKBError, HKpyError
+from .oops import HKBError, HKpyError, HKBulkLoadError
 
-__all__ = ['HKBError', 'HKpyError']
\ No newline at end of file
+__all__ = ['HKBError', 'HKpyError', 'HKBulkLoadError']
\ No newline at end of file
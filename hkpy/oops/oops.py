@@ -3,7 +3,7 @@
 # Licensed under The MIT License [see LICENSE for details]
 ###
 
-__all__ = ['HKBError', 'HKpyError']
+__all__ = ['HKBError', 'HKpyError', 'HKBulkLoadError']
 
 class HKBError(Exception):
     """
@@ -31,4 +31,22 @@ class HKpyError(Exception):
         elif kwargs:
             super().__init__(kwargs)
         else:
-            super().__init__()
\ No newline at end of file
+            super().__init__()
+class HKBulkLoadError(HKpyError):
+    """ Raised when a bulk load is aborted after some of its chunks were added.
+
+    Chunks are identified by (offset, count), where offset is the position of the chunk's first entity in the
+    entities given; succeeded lists the chunks that were added and failed the ones that were not, in offset order.
+    Entities past the last chunk in either list were never sent.
+    """
+
+    def __init__(self, message, error=None, succeeded=(), failed=()):
+        super().__init__(message=message, error=error)
+        self.message = message
+        self.error = error
+        self.succeeded = sorted(succeeded)
+        self.failed = sorted(failed)
+
+    @property
+    def entities_sent(self):
+        return sum(count for _, count in self.succeeded)
@@ -4,4 +4,7 @@
 ###
 
 from .constants import *
-from .misc import *
\ No newline at end of file
+from .misc import *
+from .cache import *
+from .jsonstream import *
+from .objectio import *
@@ -0,0 +1,170 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Any, Callable, Hashable, Optional
+from collections import OrderedDict, namedtuple
+
+import threading
+import time
+
+__all__ = ['LRUCache', 'CacheInfo']
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'size', 'maxsize', 'bytes', 'maxbytes'])
+
+_MISSING = object()
+
+class LRUCache(object):
+    """ A thread-safe least-recently-used cache bounded by number of entries and, optionally, by bytes and age.
+    """
+
+    def __init__(self,
+                 maxsize: Optional[int] = 128,
+                 maxbytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        """ Initialize an instance of LRUCache class.
+
+        Parameters
+        ----------
+        maxsize: (Optional[int]) maximum number of entries, None for unbounded and 0 to disable the cache
+        maxbytes: (Optional[int]) maximum total size of the entries, as measured by sizeof
+        ttl: (Optional[float]) seconds after which an entry expires
+        sizeof: (Optional[Callable[[Any], int]]) function that measures the size of a value in bytes
+        """
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """ Retrieve a value and mark it as the most recently used.
+
+        Parameters
+        ----------
+        key: (Hashable) the entry's key
+        default: (Any) value returned if the key is not cached
+        count: (bool) whether the lookup is accounted in the hit and miss counters
+
+        Returns
+        -------
+        (Any) the cached value or default
+        """
+
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                entry = _MISSING
+
+            if entry is _MISSING:
+                if count:
+                    self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """ Cache a value, evicting the least recently used entries when a bound is exceeded.
+
+        Parameters
+        ----------
+        key: (Hashable) the entry's key
+        value: (Any) the value to be cached
+        """
+
+        if self.maxsize == 0:
+            return
+
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires)
+            self._bytes += size
+
+            while self._data and ((self.maxsize is not None and len(self._data) > self.maxsize) or
+                                  (self.maxbytes is not None and self._bytes > self.maxbytes)):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """ Remove an entry from the cache.
+
+        Parameters
+        ----------
+        key: (Hashable) the entry's key
+        default: (Any) value returned if the key is not cached
+
+        Returns
+        -------
+        (Any) the removed value or default
+        """
+
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)
+
+    def clear(self) -> None:
+        """ Remove every entry from the cache.
+        """
+
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def resize(self, maxsize: Optional[int]) -> None:
+        """ Change the maximum number of entries, evicting entries if needed.
+
+        Parameters
+        ----------
+        maxsize: (Optional[int]) maximum number of entries, None for unbounded and 0 to disable the cache
+        """
+
+        with self._lock:
+            self.maxsize = maxsize
+            while self._data and maxsize is not None and len(self._data) > maxsize:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        """ Report the cache statistics.
+
+        Returns
+        -------
+        (CacheInfo) hits, misses, evictions, current and maximum size and bytes
+        """
+
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._data), self.maxsize,
+                             self._bytes, self.maxbytes)
+
+    def _remove(self, key):
+        value, size, _ = self._data.pop(key)
+        self._bytes -= size
+        return value
@@ -6,7 +6,7 @@
 import requests
 from enum import Enum, unique
 
-__all__ = ['DEBUG_MODE', 'SSL_VERIFY', 'LAMBDA', 'HKType', 'ConnectorType', 'RoleType', 'AnchorType', 'ContentType']
+__all__ = ['DEBUG_MODE', 'SSL_VERIFY', 'LAMBDA', 'CONTENT_DIGEST', 'HKType', 'ConnectorType', 'RoleType', 'AnchorType', 'ContentType']
 
 DEBUG_MODE = False
 
@@ -18,6 +18,9 @@ AUTH_TOKEN = None
 
 LAMBDA = 'λ'
 
+# property of data nodes holding the digest of their raw data
+CONTENT_DIGEST = 'contentDigest'
+
 class BaseEnum(Enum):
     def __str__(self):
         return self.value
@@ -0,0 +1,137 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
+
+import re
+import json
+import codecs
+
+from ..oops import HKBError
+
+__all__ = ['iter_json_members']
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITER = re.compile(r'[ \t\n\r,:\]}]')
+
+class _StreamScanner(object):
+    """ Holds the not yet consumed text of a JSON document that arrives in chunks.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], encoding: str):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = 1) -> bool:
+        """ Read chunks until at least size characters are pending, returning whether any text was added.
+        """
+
+        added = False
+        while not self.eof and len(self.buffer) - self.pos < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._text_decoder.decode(b'', final=True)
+            elif isinstance(chunk, str):
+                text = chunk
+            else:
+                text = self._text_decoder.decode(chunk)
+
+            if text:
+                # drop what was already consumed so the buffer only holds the pending value
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                added = True
+
+        return added
+
+    def peek(self) -> str:
+        """ Skip whitespace and return the next character, or an empty string at the end of the document.
+        """
+
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(len(self.buffer) - self.pos + 1):
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise HKBError(message=f'Expecting one of {chars!r} but found {char or "the end of the document"!r}.')
+        self.pos += 1
+        return char
+
+    def _continues(self, pos: int) -> bool:
+        """ Whether the text from pos may be continued by the next chunk, i.e. no delimiter follows it yet.
+        """
+
+        return not _DELIMITER.search(self.buffer, pos)
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # the value is only incomplete if the error is in its last token or in a string not closed yet;
+                # otherwise the document is malformed and reading further would not help
+                if e.msg.startswith('Unterminated string') or self._continues(e.pos):
+                    # read at least as much again, so that a large value is decoded a logarithmic number of times
+                    # instead of once per chunk
+                    if self._fill(2 * (len(self.buffer) - self.pos)):
+                        continue
+                raise HKBError(message=f'Invalid JSON document: {e}', error=e)
+
+            # a number or literal that is not followed by a delimiter may still continue in the next chunk
+            if not self._continues(end) or not self._fill(len(self.buffer) - self.pos + 1):
+                self.pos = end
+                return value
+
+def iter_json_members(chunks: Iterable[Union[bytes, str]], encoding: str = 'utf-8') -> Iterator[Tuple[Optional[str], Any]]:
+    """ Incrementally decode a JSON object or array, yielding its members as soon as they are complete.
+
+    Only the member being decoded is held in memory, so the memory use does not grow with the size of the
+    document. A malformed document raises HKBError as soon as the error is read.
+
+    Parameters
+    ----------
+    chunks: (Iterable[Union[bytes, str]]) the document split in chunks of any size, e.g. response.iter_content()
+    encoding: (str) the encoding of the bytes chunks
+
+    Returns
+    -------
+    (Iterator[Tuple[Optional[str], Any]]) the key and value of each member of an object, or None and the value
+        of each item of an array
+    """
+
+    scanner = _StreamScanner(chunks, encoding)
+
+    opening = scanner.expect('{[')
+    closing = '}' if opening == '{' else ']'
+
+    if scanner.peek() == closing:
+        scanner.pos += 1
+    else:
+        while True:
+            key = None
+            if opening == '{':
+                key = scanner.value()
+                if not isinstance(key, str):
+                    raise HKBError(message='Expecting a property name enclosed in double quotes.')
+                scanner.expect(':')
+
+            yield key, scanner.value()
+
+            if scanner.expect(',' + closing) == closing:
+                break
+
+    if scanner.peek():
+        raise HKBError(message='Extra data after the end of the document.')
@@ -10,7 +10,7 @@ from requests import Response
 from ..oops import HKBError
 from .constants import DEBUG_MODE
 
-__all__ = ['response_validator', 'generate_id']
+__all__ = ['response_validator', 'async_response_validator', 'generate_id']
 
 def generate_id(entity):
     return str(hex(int(time.time() * id(entity))))
@@ -45,6 +45,32 @@ def response_validator(response : Response, whitelist=None, content='json'):
                 res_content = response.text
         raise HKBError(code=res_code, message=res_content, url=res_url)
 
+async def async_response_validator(response, whitelist=None, content='json'):
+    """ Asynchronous counterpart of response_validator for aiohttp responses.
+    """
+
+    res_code = response.status
+    res_url = str(response.url)
+    try:
+        if content == 'json':
+            res_content = json.loads(await response.text())
+        elif content == 'text':
+            res_content = await response.text()
+        else:
+            res_content = await response.read()
+    except:
+        res_content = None
+
+    if res_code in whitelist if whitelist else 200 <= res_code < 300:
+        return res_code, res_content
+    else:
+        if res_content is None:
+            try:
+                res_content = await response.text()
+            except:
+                res_content = None
+        raise HKBError(code=res_code, message=res_content, url=res_url)
+
 def log_curl_command(response):
     """
     logs the curl command that corresponds to the request
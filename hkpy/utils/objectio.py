@@ -0,0 +1,456 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, TextIO, Tuple, Union
+from io import TextIOBase
+
+import os
+import re
+import mmap
+import uuid
+import base64
+import hashlib
+import threading
+
+from ..oops import HKpyError
+
+__all__ = ['OBJECT_CHUNK_SIZE', 'ByteSink', 'FileSource', 'UploadStream', 'MultipartStream', 'parse_content_range']
+
+OBJECT_CHUNK_SIZE = 1 << 20
+
+_CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+def parse_content_range(value: Optional[str]) -> Optional[Tuple[int, int, Optional[int]]]:
+    """ Parse the Content-Range header of a partial response.
+
+    Parameters
+    ----------
+    value: (Optional[str]) the header's value
+
+    Returns
+    -------
+    (Optional[Tuple[int, int, Optional[int]]]) the first and last positions sent and the total size, if known, or
+        None if the header is missing or malformed
+    """
+
+    match = _CONTENT_RANGE.match(value or '')
+    if match is None:
+        return None
+
+    total = match.group(3)
+    return int(match.group(1)), int(match.group(2)), int(total) if total != '*' else None
+
+class ByteSink(object):
+    """ Writes the body of responses at given positions of a file or of a writable buffer.
+
+    Responses are read with readinto, straight into the buffer when the destination is one, so that the content is
+    not copied into intermediate bytes objects. Positions can be written concurrently.
+    """
+
+    def __init__(self, dest: Union[str, BinaryIO, bytearray, memoryview]):
+        """ Initialize an instance of ByteSink class.
+
+        Parameters
+        ----------
+        dest: (Union[str, BinaryIO, bytearray, memoryview]) path of the file to be written, a binary file open for
+            writing, with position 0 at its current position, or a writable buffer
+        """
+
+        self._file = None
+        self._view = None
+        self._owned = False
+        self._origin = 0
+        self._lock = threading.Lock()
+
+        if isinstance(dest, str):
+            self._file = open(dest, 'wb')
+            self._owned = True
+        elif isinstance(dest, (bytearray, memoryview)):
+            self._view = memoryview(dest).cast('B')
+            if self._view.readonly:
+                raise HKpyError(message='The destination buffer is read-only.')
+        elif hasattr(dest, 'write'):
+            self._file = dest
+            self._origin = dest.tell() if getattr(dest, 'seekable', lambda: False)() else None
+        else:
+            raise HKpyError(message='Destination not valid.')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def capacity(self) -> Optional[int]:
+        """ Number of bytes that fit in the destination, None if unbounded.
+        """
+
+        return len(self._view) if self._view is not None else None
+
+    @property
+    def seekable(self) -> bool:
+        """ Whether positions can be written out of order.
+        """
+
+        return self._file is None or self._origin is not None
+
+    def readinto(self, source: BinaryIO, pos: int = 0, length: Optional[int] = None,
+                 chunk_size: int = OBJECT_CHUNK_SIZE) -> int:
+        """ Read from a source until its end, or length bytes, and write them from a position on.
+
+        Parameters
+        ----------
+        source: (BinaryIO) the source, e.g. a raw response, which must implement readinto
+        pos: (int) position of the first byte
+        length: (Optional[int]) number of bytes expected, None to read until the end of the source
+        chunk_size: (int) maximum number of bytes read at once
+
+        Returns
+        -------
+        (int) the number of bytes written
+        """
+
+        buffer = memoryview(bytearray(chunk_size)) if self._view is None else None
+        written = 0
+
+        while length is None or written < length:
+            size = chunk_size if length is None else min(chunk_size, length - written)
+            if self._view is not None:
+                size = min(size, len(self._view) - pos - written)
+                if size <= 0:
+                    # a full destination is only an error if there is more to read
+                    if (length is not None and written < length) or source.read(1):
+                        raise HKpyError(message='The destination buffer is too small.')
+                    break
+                target = self._view[pos + written:pos + written + size]
+            else:
+                target = buffer[:size]
+
+            count = source.readinto(target)
+            if not count:
+                break
+            if self._view is None:
+                self._write(pos + written, target[:count])
+            written += count
+
+        if length is not None and written < length:
+            raise HKpyError(message=f'Expected {length} bytes but received {written}.')
+
+        return written
+
+    def truncate(self, size: int) -> None:
+        """ Resize the destination file, if it was opened by the sink.
+
+        Parameters
+        ----------
+        size: (int) the new size
+        """
+
+        if self._owned:
+            with self._lock:
+                self._file.truncate(size)
+
+    def close(self) -> None:
+        """ Close the destination file, if it was opened by the sink, and release the buffer.
+        """
+
+        if self._owned and self._file is not None:
+            self._file.close()
+        self._file = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+    def _write(self, pos, data):
+        with self._lock:
+            if self._origin is not None:
+                self._file.seek(self._origin + pos)
+            self._file.write(data)
+
+class FileSource(object):
+    """ A file whose content starts at the position it had when given, so that it can be read again, e.g. when an
+    upload is retried, as long as the file is seekable.
+    """
+
+    def __init__(self, file: Union[BinaryIO, TextIO]):
+        """ Initialize an instance of FileSource class.
+
+        Parameters
+        ----------
+        file: (Union[BinaryIO, TextIO]) the file, read from its current position
+        """
+
+        self.file = file
+        self.start = file.tell() if UploadStream._seekable(file) else None
+        self._read = False
+
+    def open(self) -> Union[BinaryIO, TextIO]:
+        """ Position the file at the start of the content for a new read.
+
+        Returns
+        -------
+        (Union[BinaryIO, TextIO]) the file
+        """
+
+        if self.start is not None:
+            self.file.seek(self.start)
+        elif self._read:
+            raise HKpyError(message='The content of a non-seekable file can only be read once.')
+        self._read = True
+        return self.file
+
+class UploadStream(object):
+    """ The body of an upload request, read in chunks from bytes, a file or a memory-mapped file.
+
+    The stream is iterable and has a length, so that the transport sends its chunks as they are read, with a
+    Content-Length whenever the size is known. Memory-mapped files are sent as slices of the map, without copies.
+    """
+
+    def __init__(self,
+                 source: Union[str, bytes, bytearray, memoryview, os.PathLike, FileSource, BinaryIO, TextIO],
+                 chunk_size: int = OBJECT_CHUNK_SIZE,
+                 use_mmap: bool = False,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None):
+        """ Initialize an instance of UploadStream class.
+
+        Parameters
+        ----------
+        source: (Union[str, bytes, bytearray, memoryview, os.PathLike, FileSource, BinaryIO, TextIO]) content, the
+            path of a file as an os.PathLike, e.g. pathlib.Path, or a file read from its current position or from the
+            start of a FileSource; strings are always content, sent encoded in UTF-8
+        chunk_size: (int) maximum number of bytes read at once
+        use_mmap: (bool) map files in memory instead of reading them, if they support it
+        progress: (Optional[Callable[[int, Optional[int]], None]]) function called after each chunk with the number
+            of bytes sent so far and the total, None if unknown
+        """
+
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.progress = progress
+        self.sent = 0
+
+        self._path = None
+        self._data = None
+        self._file = None
+        self._start = 0
+        self.size = None
+
+        if isinstance(source, FileSource):
+            source = source.open()
+
+        if isinstance(source, os.PathLike):
+            self._path = os.fspath(source)
+            self.size = os.path.getsize(self._path)
+        elif isinstance(source, str):
+            self._data = memoryview(source.encode())
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._data = memoryview(source).cast('B')
+        elif hasattr(source, 'read'):
+            self._file = source
+            if isinstance(source, TextIOBase):
+                # text is read as it is, its encoded size is not known in advance
+                self.use_mmap = False
+            elif self._seekable(source):
+                self._start = source.tell()
+                self.size = os.fstat(source.fileno()).st_size - self._start if self._has_fileno(source) else \
+                    source.seek(0, os.SEEK_END) - self._start
+                source.seek(self._start)
+        else:
+            raise HKpyError(message='Object not valid.')
+
+        if self._data is not None:
+            self.size = len(self._data)
+
+    def __len__(self):
+        # zero makes the transport fall back to a chunked request
+        return self.size or 0
+
+    def __bool__(self):
+        # an unknown size must not make the body look empty
+        return True
+
+    def __iter__(self) -> Iterator[Union[bytes, str, memoryview]]:
+        if self._data is not None:
+            yield from self._report(self._slices(self._data))
+        elif self._path is not None:
+            with open(self._path, 'rb') as file:
+                yield from self._report(self._iter_file(file))
+        else:
+            yield from self._report(self._iter_file(self._file))
+
+    def digest(self) -> str:
+        """ Compute the SHA-256 digest of the content, leaving the stream ready to be sent.
+
+        Returns
+        -------
+        (str) the digest, as in an HTTP Digest header, e.g. sha-256=base64
+        """
+
+        sha = hashlib.sha256()
+        if self._data is not None:
+            sha.update(self._data)
+        elif self._path is not None:
+            with open(self._path, 'rb') as file:
+                self._hash_file(sha, file)
+        elif self._file is not None and self.size is not None:
+            self._hash_file(sha, self._file)
+            self._file.seek(self._start)
+        else:
+            raise HKpyError(message='The digest of a non-seekable stream cannot be computed in advance.')
+
+        return 'sha-256=' + base64.b64encode(sha.digest()).decode()
+
+    def _hash_file(self, sha, file):
+        with self._map(file) as view:
+            if view is not None:
+                sha.update(view)
+                return
+        for chunk in self._iter_file(file):
+            sha.update(chunk)
+
+    def _iter_file(self, file):
+        with self._map(file) as view:
+            if view is not None:
+                yield from self._slices(view)
+                file.seek(self._start + self.size)
+                return
+
+        if isinstance(file, TextIOBase):
+            while True:
+                chunk = file.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk.encode()
+            return
+
+        # the chunk is sent before the next one is read, so that a single buffer is reused
+        buffer = memoryview(bytearray(self.chunk_size))
+        readinto = getattr(file, 'readinto', None)
+        while True:
+            if readinto is not None:
+                count = readinto(buffer)
+                chunk = buffer[:count] if count else None
+            else:
+                chunk = file.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def _slices(self, view):
+        for pos in range(0, len(view), self.chunk_size):
+            chunk = view[pos:pos + self.chunk_size]
+            try:
+                yield chunk
+            finally:
+                # the map can only be closed once every view of it is released
+                chunk.release()
+
+    def _report(self, chunks):
+        for chunk in chunks:
+            yield chunk
+            self.sent += len(chunk)
+            if self.progress is not None:
+                self.progress(self.sent, self.size)
+
+    def _map(self, file):
+        return _MappedFile(file, self._start, self.size) if self.use_mmap and self.size and \
+            self._has_fileno(file) else _MappedFile(None, 0, 0)
+
+    @staticmethod
+    def _seekable(file):
+        return getattr(file, 'seekable', lambda: False)()
+
+    @staticmethod
+    def _has_fileno(file):
+        try:
+            file.fileno()
+            return True
+        except (AttributeError, OSError, ValueError):
+            return False
+
+class MultipartStream(object):
+    """ A multipart/form-data body whose files are streamed, one chunk at a time, as the body is sent.
+    """
+
+    def __init__(self,
+                 fields: List[Tuple[str, str]],
+                 files: List[Tuple[str, str, Any, Optional[str]]],
+                 chunk_size: int = OBJECT_CHUNK_SIZE):
+        """ Initialize an instance of MultipartStream class.
+
+        Parameters
+        ----------
+        fields: (List[Tuple[str, str]]) the name and value of each form field, sent before the files
+        files: (List[Tuple[str, str, Any, Optional[str]]]) the name, filename, content and content type of each file,
+            where the content is anything an UploadStream reads
+        chunk_size: (int) maximum number of bytes read at once from each file
+        """
+
+        self.boundary = uuid.uuid4().hex
+        self._parts = []
+
+        for name, value in fields:
+            head = f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+            self._parts.append((head.encode(), UploadStream(value.encode(), chunk_size=chunk_size)))
+
+        for name, filename, content, content_type in files:
+            head = (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"; '
+                    f'filename="{_quote(filename)}"\r\n'
+                    f'Content-Type: {content_type or "application/octet-stream"}\r\n\r\n')
+            self._parts.append((head.encode(), UploadStream(content, chunk_size=chunk_size)))
+
+        self._tail = f'--{self.boundary}--\r\n'.encode()
+
+        sizes = [stream.size for _, stream in self._parts]
+        self.size = None if None in sizes else \
+            sum(len(head) + size + 2 for (head, _), size in zip(self._parts, sizes)) + len(self._tail)
+
+    @property
+    def content_type(self) -> str:
+        """ The value of the Content-Type header of the body.
+        """
+
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return self.size or 0
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        for head, stream in self._parts:
+            yield head
+            yield from stream
+            yield b'\r\n'
+        yield self._tail
+
+def _quote(value: str) -> str:
+    # as browsers escape the names of form fields
+    return value.translate({10: '%0A', 13: '%0D', 34: '%22'})
+
+class _MappedFile(object):
+    """ Read-only memory map of a region of a file, as a memoryview, None if there is no file.
+    """
+
+    def __init__(self, file, start, size):
+        self._file = file
+        self._start = start
+        self._size = size
+        self._map = None
+        self._view = None
+
+    def __enter__(self):
+        if self._file is None:
+            return None
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)[self._start:self._start + self._size]
+        return self._view
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
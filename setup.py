@@ -41,6 +41,9 @@ REQUIRED = [
     'certifi',
     'lark'
 ]
+EXTRAS = {
+    'async': ['aiohttp']
+}
 
 try:
     import pypandoc
@@ -63,6 +66,7 @@ setup(
     packages=setuptools.find_packages(),
     include_package_data=True,
     install_requires=REQUIRED,
+    extras_require=EXTRAS,
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
 
@@ -0,0 +1,54 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """ Base of the request handlers that stand in for a hkbase in the tests """
+
+    protocol_version = 'HTTP/1.1'
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+
+    def reply(self, payload=None, status=200, headers=None):
+        headers = dict(headers or {})
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode()
+            headers.setdefault('Content-Type', 'application/json')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """ Start stub servers on free local ports, returning their base url; they are shut down after the test """
+
+    servers = []
+
+    def start(handler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,121 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+
+from hkpy.hkbase import AsyncHKBase
+from hkpy.hklib import HKNode, HKDataNode
+from hkpy.oops import HKBError, HKpyError
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.read_body()
+        if self.path.startswith('/repository/test/query'):
+            payload = [[{'id': body.decode(), 'type': 'node', 'properties': {}}]]
+        else:
+            payload = {'a': {'id': 'a', 'type': 'node', 'properties': {'x': 1}}}
+        self.reply(payload)
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+def test_async_fan_out(stub_server):
+    url = stub_server(_Handler)
+
+    async def run():
+        async with AsyncHKBase(url=url, pool_maxsize=20) as hkbase:
+            repo = await hkbase.connect_repository('test')
+            results = await asyncio.gather(*[repo.hyql(f'q{i}') for i in range(200)])
+            entities = await repo.filter_entities('[id="a"]')
+            return results, entities
+
+    results, entities = asyncio.run(run())
+
+    assert [list(r)[0][0].id_ for r in results] == [f'q{i}' for i in range(200)]
+    assert isinstance(entities[0], HKNode)
+    assert entities[0].properties == {'x': 1}
+
+
+class _ObjectHandler(StubHandler):
+    disable_nagle_algorithm = True
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def do_POST(self):
+        ids = json.loads(self.read_body())
+        if 'error' in ids:
+            self.reply({'error': 'cannot retrieve'}, 500)
+            return
+        self.reply({id_: {'id': id_, 'type': 'node', 'properties': {'mimeType': 'text/plain'}} for id_ in ids})
+
+    def do_GET(self):
+        if '/storage/object/' not in self.path:
+            self.reply(['test'])
+            return
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.02)
+        with cls.lock:
+            cls.active -= 1
+        if self.path.endswith('/missing'):
+            self.reply({'error': 'not found'}, 404)
+        else:
+            self.reply(self.path.rsplit('/', 1)[-1].encode())
+
+
+def _run_with_repository(url, coroutine):
+    async def run():
+        async with AsyncHKBase(url=url, pool_maxsize=50) as hkbase:
+            return await coroutine(await hkbase.connect_repository('test'))
+
+    return asyncio.run(run())
+
+
+def test_async_errors_propagate(stub_server):
+    url = stub_server(_ObjectHandler)
+
+    with pytest.raises(HKBError):
+        _run_with_repository(url, lambda repo: repo.get_entities(['error']))
+    with pytest.raises(HKpyError):
+        _run_with_repository(url, lambda repo: repo.get_entities(['a', 'missing'], bring_raw_data=True))
+
+    errors = {}
+    entities = _run_with_repository(url, lambda repo: repo.get_entities(['a', 'missing'], bring_raw_data=True,
+                                                                        errors=errors))
+    assert list(errors) == ['missing']
+    assert isinstance(entities[0], HKDataNode) and entities[0].raw_data == b'a'
+    assert not isinstance(entities[1], HKDataNode)
+
+
+@pytest.mark.parametrize('max_concurrency', [4, None])
+def test_async_raw_data_concurrency(stub_server, max_concurrency):
+    url = stub_server(_ObjectHandler)
+    _ObjectHandler.peak = 0
+
+    async def fetch(repo):
+        entities = await repo.get_entities([f'n{i}' for i in range(20)])
+        return await repo.retrieve_raw_data_from_data_entities(entities, max_concurrency=max_concurrency)
+
+    entities = _run_with_repository(url, fetch)
+
+    assert [entity.raw_data for entity in entities] == [f'n{i}'.encode() for i in range(20)]
+    if max_concurrency is not None:
+        assert 1 < _ObjectHandler.peak <= max_concurrency
+    else:
+        assert _ObjectHandler.peak > 4
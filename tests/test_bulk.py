@@ -0,0 +1,111 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+import time
+import threading
+
+import pytest
+
+from hkpy.hkbase import HKBase, hkrepository
+from hkpy.hkbase.hkrepository import _iter_bulk_chunks
+from hkpy.hklib import HKNode
+from hkpy.oops import HKBError, HKBulkLoadError
+
+from conftest import StubHandler
+
+
+def test_chunks_by_count():
+    chunks = list(_iter_bulk_chunks((HKNode(f'n{i}') for i in range(10)), chunk_size=4))
+
+    assert [count for count, _ in chunks] == [4, 4, 2]
+    assert [e['id'] for _, payload in chunks for e in json.loads(payload)] == [f'n{i}' for i in range(10)]
+
+
+def test_chunks_by_bytes():
+    entities = [{'id': f'n{i}', 'type': 'node'} for i in range(100)]
+    chunks = list(_iter_bulk_chunks(entities, chunk_bytes=300))
+
+    assert all(len(payload) <= 300 for _, payload in chunks)
+    assert sum(count for count, _ in chunks) == 100
+
+
+def test_single_chunk_without_bounds():
+    chunks = list(_iter_bulk_chunks([{'id': 'a'}, {'id': 'b'}]))
+
+    assert chunks == [(2, b'[{"id": "a"},{"id": "b"}]')]
+
+
+class _BulkHandler(StubHandler):
+    # first entity id of each chunk received, and of the chunks to fail
+    chunks = []
+    failing = {}
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_PUT(self):
+        first = json.loads(self.read_body())[0]['id']
+        with self.lock:
+            self.chunks.append(first)
+            type(self).active += 1
+            type(self).max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            type(self).active -= 1
+            fail = self.failing.get(first, 0)
+            if fail:
+                self.failing[first] = fail - 1
+        self.reply(None, 500 if fail else 200)
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server, monkeypatch):
+    monkeypatch.setattr(hkrepository, '_BULK_RETRY_DELAY', 0.001)
+    _BulkHandler.chunks = []
+    _BulkHandler.failing = {}
+    _BulkHandler.max_active = 0
+    with HKBase(url=stub_server(_BulkHandler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_in_flight_bound_and_progress(repository):
+    reported = []
+    repository.add_entities_bulk((HKNode(f'n{i}') for i in range(100)), chunk_size=10, max_in_flight=3,
+                                 progress=lambda entities, chunks: reported.append((entities, chunks)))
+
+    assert sorted(_BulkHandler.chunks) == sorted(f'n{i}' for i in range(0, 100, 10))
+    assert 1 < _BulkHandler.max_active <= 3
+    assert reported == [(10 * (i + 1), i + 1) for i in range(10)]
+
+
+def test_retries(repository):
+    _BulkHandler.failing = {'n10': 2}
+    repository.add_entities_bulk([HKNode(f'n{i}') for i in range(30)], chunk_size=10, retries=2)
+
+    assert _BulkHandler.chunks == ['n0', 'n10', 'n10', 'n10', 'n20']
+
+
+def test_abort_reports_chunk_offsets(repository):
+    _BulkHandler.failing = {'n20': 2}
+    with pytest.raises(HKBulkLoadError) as info:
+        repository.add_entities_bulk([HKNode(f'n{i}') for i in range(100)], chunk_size=10, max_in_flight=2,
+                                     retries=1)
+
+    error = info.value
+    assert (20, 10) in error.failed
+    assert (0, 10) in error.succeeded and (10, 10) in error.succeeded
+    assert error.entities_sent == 10 * len(error.succeeded)
+    # no chunk is sent once the failure is known
+    assert len(_BulkHandler.chunks) < 11
+
+
+def test_failure_without_progress_is_raised_as_is(repository):
+    _BulkHandler.failing = {'n0': 1}
+    with pytest.raises(HKBError):
+        repository.add_entities_bulk([HKNode(f'n{i}') for i in range(5)])
@@ -0,0 +1,162 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import io
+import os
+import json
+import pathlib
+from email.parser import BytesParser
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hklib import HKDataNode
+from hkpy.oops import HKpyError
+
+from conftest import StubHandler
+
+_VIDEO = os.urandom(50000)
+
+
+class _Handler(StubHandler):
+
+    # (name, filename, content) of the parts of the forms received
+    parts = []
+    # entities received by id
+    stored = {}
+
+    def do_PUT(self):
+        body = self.read_body()
+        message = BytesParser().parsebytes(b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + body)
+        for part in message.get_payload():
+            name, filename = part.get_param('name', header='content-disposition'), part.get_filename()
+            self.parts.append((name, filename, part.get_payload(decode=True)))
+            if filename is None:
+                self.stored[name] = json.loads(part.get_payload(decode=True))
+        self.reply(None)
+
+    def do_POST(self):
+        ids = json.loads(self.read_body())
+        self.reply({id_: self.stored[id_] for id_ in ids if id_ in self.stored})
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.parts = []
+    _Handler.stored = {}
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(_VIDEO)
+    return str(path)
+
+
+def test_data_node_reads_files_lazily(path):
+    node = HKDataNode(path)
+
+    assert node.id_ == 'clip.mp4' and node.properties['mimeType'] == 'video/mp4'
+    assert not node.is_loaded
+    assert node.to_dict()['raw_data'] == pathlib.Path(path)
+    with node.open_raw_data() as file:
+        assert file.read() == _VIDEO
+
+    assert node.raw_data == _VIDEO and node.is_loaded
+
+    with open(path, 'rb') as file:
+        node = HKDataNode(file)
+        assert node.id_ == 'clip.mp4' and not node.is_loaded
+        assert node.raw_data == _VIDEO
+
+    assert HKDataNode('text', id_='t', mimeType='text/plain').open_raw_data().read() == b'text'
+    with pytest.raises(HKpyError):
+        HKDataNode(b'data')
+
+
+def test_add_data_entities_streams_files(repository, path):
+    with open(path, 'rb') as file:
+        repository.add_data_entities([HKDataNode(path, id_='a'),
+                                      HKDataNode(file, id_='b'),
+                                      HKDataNode(b'bytes', id_='c', mimeType='application/octet-stream')])
+
+    fields = {name: json.loads(content) for name, filename, content in _Handler.parts if filename is None}
+    files = {name: content for name, filename, content in _Handler.parts if filename is not None}
+
+    assert fields['a']['properties']['mimeType'] == 'video/mp4' and 'raw_data' not in fields['a']
+    assert files == {'a': _VIDEO, 'b': _VIDEO, 'c': b'bytes'}
+
+
+def test_files_can_be_read_after_an_upload(repository, path):
+    with open(path, 'rb') as file:
+        file.seek(100)
+        node = HKDataNode(file, id_='a')
+        repository.add_data_entities(node)
+        repository.add_data_entities(node)
+
+        assert not node.is_loaded
+        assert node.raw_data == _VIDEO[100:] and node.is_loaded
+
+    files = [content for _, filename, content in _Handler.parts if filename is not None]
+    assert files == [_VIDEO[100:]] * 2
+
+
+def test_non_seekable_files_are_read_once():
+    read, write = os.pipe()
+    os.write(write, b'data')
+    os.close(write)
+
+    with open(read, 'rb') as file:
+        node = HKDataNode(file, id_='a', mimeType='application/octet-stream')
+        assert node.open_raw_data().read() == b'data'
+        with pytest.raises(HKpyError):
+            node.raw_data
+
+
+def test_add_data_entities_skips_unchanged(repository, path, tmp_path):
+    other = tmp_path / 'other.txt'
+    other.write_bytes(b'other')
+
+    repository.add_data_entities([HKDataNode(path), HKDataNode(str(other))], skip_unchanged=True)
+    assert len(_Handler.parts) == 4
+
+    node = HKDataNode(path)
+    repository.add_data_entities([node, HKDataNode(str(other))], skip_unchanged=True)
+    assert len(_Handler.parts) == 4
+    assert node.digest.startswith('sha-256=') and node.is_loaded is False
+
+    other.write_bytes(b'changed')
+    repository.add_data_entities([HKDataNode(path), HKDataNode(str(other))], skip_unchanged=True)
+    assert [filename for _, filename, _ in _Handler.parts[4:]] == [None, 'other.txt']
+
+
+def test_add_data_entities_skips_unchanged_dicts(repository, path):
+    entity = HKDataNode(path).to_dict()
+    repository.add_data_entities([entity], skip_unchanged=True)
+    assert 'contentDigest' not in entity['properties'] and len(_Handler.parts) == 2
+
+    # properties added on the server side do not make the entity look changed
+    _Handler.stored['clip.mp4']['properties']['indexedBy'] = 'other'
+    repository.add_data_entities([entity], skip_unchanged=True)
+    assert len(_Handler.parts) == 2
+
+    entity['properties']['label'] = 'clip'
+    repository.add_data_entities([entity], skip_unchanged=True)
+    assert len(_Handler.parts) == 4
+
+
+def test_add_data_entities_manifest(repository, path):
+    manifest = {}
+    repository.add_data_entities(HKDataNode(path), skip_unchanged=True, manifest=manifest)
+    repository.add_data_entities(HKDataNode(path), skip_unchanged=True, manifest=manifest)
+    assert list(manifest) == ['clip.mp4'] and len(_Handler.parts) == 2
+
+    repository.add_data_entities(HKDataNode(path, properties={'label': 'clip'}), skip_unchanged=True, manifest=manifest)
+    assert len(_Handler.parts) == 4
@@ -0,0 +1,106 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import io
+import os
+import re
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.oops import HKpyError
+
+from conftest import StubHandler
+
+_OBJECT = os.urandom(300000)
+
+
+class _Handler(StubHandler):
+
+    # Range headers received, None for whole objects
+    ranges = []
+    honour_ranges = True
+
+    def handle(self):
+        # downloads stop reading the responses they do not need
+        try:
+            super().handle()
+        except ConnectionError:
+            pass
+
+    def do_GET(self):
+        if '/storage/object/' not in self.path:
+            self.reply(b'["test"]')
+            return
+
+        header = self.headers.get('Range')
+        self.ranges.append(header)
+        match = re.match(r'bytes=(\d+)-(\d*)', header or '')
+        if match is None or not self.honour_ranges:
+            self.reply(_OBJECT)
+            return
+
+        start = int(match.group(1))
+        stop = int(match.group(2)) + 1 if match.group(2) else len(_OBJECT)
+        stop = min(stop, len(_OBJECT))
+        self.reply(_OBJECT[start:stop], 206, {'Content-Range': f'bytes {start}-{stop - 1}/{len(_OBJECT)}'})
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.ranges = []
+    _Handler.honour_ranges = True
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_download_object_to_file_and_buffer(repository, tmp_path):
+    path = str(tmp_path / 'object')
+    assert repository.download_object('o', path, chunk_size=4096) == len(_OBJECT)
+    with open(path, 'rb') as f:
+        assert f.read() == _OBJECT
+
+    buffer = bytearray(len(_OBJECT))
+    assert repository.download_object('o', buffer, chunk_size=4096) == len(_OBJECT)
+    assert buffer == _OBJECT
+    assert _Handler.ranges == [None, None]
+
+    with pytest.raises(HKpyError):
+        repository.download_object('o', bytearray(100))
+
+
+def test_download_object_range(repository):
+    file = io.BytesIO()
+    assert repository.download_object('o', file, byte_range=(1000, 1500)) == 500
+    assert file.getvalue() == _OBJECT[1000:1500]
+    assert _Handler.ranges == ['bytes=1000-1499']
+
+    # a server that ignores the range sends the whole object
+    _Handler.honour_ranges = False
+    buffer = bytearray(500)
+    repository.download_object('o', buffer, byte_range=(1000, 1500))
+    assert buffer == _OBJECT[1000:1500]
+
+
+def test_download_object_empty_range(repository, tmp_path):
+    created, truncated = tmp_path / 'created', tmp_path / 'truncated'
+    truncated.write_bytes(b'old contents')
+
+    assert repository.download_object('o', str(created), byte_range=(10, 10)) == 0
+    assert repository.download_object('o', str(truncated), byte_range=(10, 10)) == 0
+    assert created.read_bytes() == b'' and truncated.read_bytes() == b''
+    assert _Handler.ranges == []
+
+
+def test_download_object_parts(repository, tmp_path):
+    path = str(tmp_path / 'object')
+    assert repository.download_object('o', path, chunk_size=8192, parts=4) == len(_OBJECT)
+    with open(path, 'rb') as f:
+        assert f.read() == _OBJECT
+    assert len(_Handler.ranges) == 4
+
+    buffer = memoryview(bytearray(len(_OBJECT) - 5000))
+    repository.download_object('o', buffer, chunk_size=8192, byte_range=(5000, None), parts=3)
+    assert buffer == _OBJECT[5000:]
@@ -0,0 +1,103 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+
+import pytest
+
+from hkpy.hkbase import HKBase, HKEntityCache
+from hkpy.hkbase.observer import LocalObserverClient
+from hkpy.hklib import HKNode
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    # ids requested by each POST /entity
+    requested = []
+
+    def do_POST(self):
+        ids = json.loads(self.read_body())
+        self.requested.append(ids)
+        self.reply({id_: {'id': id_, 'type': 'node', 'properties': {'name': id_}} for id_ in ids})
+
+    def do_DELETE(self):
+        self.read_body()
+        self.reply(None)
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.requested = []
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_read_through(repository):
+    cache = repository.enable_cache()
+
+    assert [e.id_ for e in repository.get_entities(['a', 'b'])] == ['a', 'b']
+    assert [e.id_ for e in repository.get_entities(['b', 'c', 'a'])] == ['b', 'c', 'a']
+    assert _Handler.requested == [['a', 'b'], ['c']]
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.size) == (2, 3, 3)
+
+    # hits are copies
+    repository.get_entities(['a'])[0].properties['name'] = 'changed'
+    assert repository.get_entities(['a'])[0].properties['name'] == 'a'
+
+
+def test_local_writes_evict(repository):
+    cache = repository.enable_cache()
+    repository.get_entities(['a', 'b'])
+
+    repository.delete_entities(['a'])
+
+    assert cache.get('a') is None and cache.get('b') is not None
+    assert cache.invalidations == 1
+
+
+def test_notifications_evict(repository):
+    observer = LocalObserverClient()
+    observer.init()
+    cache = repository.enable_cache(observer=observer)
+    repository.get_entities(['a', 'b', 'c'])
+
+    observer.publish('update', 'entities', 'test', ['a'])
+    observer.publish('dele', 'entities', 'other', ['b'])
+    assert cache.get('a') is None and cache.get('b') is not None
+
+    observer.publish('dele', 'repository', 'test')
+    assert len(cache) == 0
+
+    observer.deinit()
+    repository.get_entities(['a'])
+    observer.publish('dele', 'entities', 'test', ['a'])
+    assert cache.get('a') is not None
+
+
+def test_bounds_and_stale_puts():
+    cache = HKEntityCache('test', maxsize=2)
+    cache.put([HKNode(f'n{i}') for i in range(3)])
+    assert cache.get('n0') is None and cache.info().evictions == 1
+
+    sized = HKEntityCache('test', maxsize=None, maxbytes=200)
+    sized.put([HKNode(f'n{i}') for i in range(10)])
+    assert 0 < sized.info().bytes <= 200
+
+    # sizes are in bytes, whatever the characters
+    node = HKNode('ç', properties={'name': 'Conceição 知識'})
+    sized.clear()
+    sized.put([node])
+    assert sized.info().bytes == len(json.dumps(node.to_dict()).encode())
+
+    generation = cache.generation
+    cache.evict(['n1'])
+    cache.put([HKNode('n1')], generation)
+    assert cache.get('n1') is None
@@ -0,0 +1,60 @@
+###
+# Copyright (c) 2022-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from lark import Lark
+
+from hkpy.hklib.fi import FI, parse_fi, fi_cache_info, set_fi_cache_size, clear_fi_cache
+from hkpy.hklib.fi.fiparser import _get_parser
+from hkpy.hklib.fi.grammar import FI_GRAMMAR
+
+FIS = [
+    'mytext',
+    'mytext.subtext({start: 2, end: 50})',
+    'mytext.subtext*({start: 2, end: 50})',
+    'mypicture.rect({x: 20, y: 20, w: 800, h: 20}).rect({x: 2, y: 4, w: 10, h: 10})',
+    'file.func(["A", "B"])',
+    '``a b``.x(<http://x.org/a#b>)',
+    'a.b([true, false, null])',
+]
+
+
+def test_lalr_parser_matches_earley():
+    earley = Lark(FI_GRAMMAR)
+
+    for fi in FIS:
+        assert _get_parser().parse(fi) == earley.parse(fi)
+
+
+def test_parsers_are_built_once():
+    assert _get_parser('id') is _get_parser('id')
+
+
+def test_fi_cache():
+    clear_fi_cache()
+    before = fi_cache_info()
+
+    first = FI('mytext.subtext({start: 2, end: 50})')
+    second = FI('mytext.subtext({start: 2, end: 50})')
+    info = fi_cache_info()
+
+    assert str(first) == str(second) == 'mytext.subtext({start: 2,end: 50})'
+    assert info.misses == before.misses + 1
+    assert info.hits == before.hits + 1
+
+    set_fi_cache_size(0)
+    try:
+        parse_fi('other')
+        assert fi_cache_info().size == 0
+    finally:
+        set_fi_cache_size(4096)
+
+
+def test_cached_fis_are_not_shared():
+    first = parse_fi('mytext.subtext({start: 2, end: 50})')
+    second = parse_fi('mytext.subtext({start: 2, end: 50})')
+
+    assert first is not second
+    first._artifact = None
+    assert str(second) == 'mytext.subtext({start: 2,end: 50})'
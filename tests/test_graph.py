@@ -0,0 +1,73 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from hkpy.hklib import HKGraph, HKNode, HKLink, HKConnector, HKContext
+
+
+def _build_graph():
+    graph = HKGraph()
+    graph.add_entities([HKContext('ctx'), HKConnector('rel', class_name='f')])
+    graph.add_entities([HKNode(f'n{i}', parent='ctx') for i in range(4)])
+
+    for i in range(3):
+        link = HKLink(connector='rel', id_=f'l{i}', parent='ctx')
+        link.add_bind('subject', f'n{i}')
+        link.add_bind('object', f'n{i + 1}')
+        graph.add_entities(link)
+
+    return graph
+
+
+def test_get_entity():
+    graph = _build_graph()
+
+    assert graph.get_entity('n0') is graph.nodes['n0']
+    assert graph.get_entity('l1') is graph.links['l1']
+    assert graph.get_entity('ctx') is graph.contexts['ctx']
+    assert graph.get_entity('missing') is None
+
+
+def test_remove_node_removes_its_links():
+    graph = _build_graph()
+
+    graph.remove_entities('n1')
+
+    assert graph.get_entity('n1') is None
+    assert set(graph.links) == {'l2'}
+    assert set(graph.binds) == {'n2', 'n3'}
+    assert set(graph._connector_links_map['rel']) == {'l2'}
+    assert 'l0' not in graph._context_entities_map['ctx']
+
+
+def test_remove_connector_and_context():
+    graph = _build_graph()
+
+    graph.remove_entities('rel')
+    assert graph.links == {} and graph.binds == {}
+
+    graph.remove_entities('ctx')
+    assert graph.nodes == {} and graph.contexts == {}
+    assert graph.get_entity('n0') is None
+
+
+def test_link_added_again_with_another_connector():
+    graph = _build_graph()
+    graph.add_entities(HKConnector('other', class_name='f'))
+
+    link = HKLink(connector='other', id_='l0', parent='ctx')
+    link.add_bind('subject', 'n2')
+    link.add_bind('object', 'n3')
+    graph.add_entities(link)
+
+    assert 'l0' not in graph._connector_links_map['rel'] and 'l0' not in graph.binds['n1']
+    assert graph._connector_links_map['other'] == {'l0': link}
+
+    # the previous connector no longer removes the link, and removing it leaves no trace
+    graph.remove_entities('rel')
+    assert set(graph.links) == {'l0'}
+    link.connector = 'rel'
+    graph.remove_entities('l0')
+    assert graph.links == {} and graph.binds == {}
+    assert graph._connector_links_map['other'] == {}
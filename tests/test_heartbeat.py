@@ -0,0 +1,94 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import time
+import threading
+from collections import defaultdict
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hkbase.observer import HeartbeatScheduler, ConfigurableObserverClient
+
+from conftest import StubHandler
+
+HEARTBEATS = defaultdict(list)
+
+
+class _ObserverServiceHandler(StubHandler):
+    observers = 0
+
+    def do_POST(self):
+        self.read_body()
+        parts = self.path.strip('/').split('/')
+        if parts == ['observer']:
+            type(self).observers += 1
+            self.reply({'observerId': f'o{self.observers}'})
+        else:
+            HEARTBEATS[parts[1]].append(time.monotonic())
+            self.reply(b'', 500 if parts[1].startswith('failing') else 200)
+
+    def do_DELETE(self):
+        self.reply(b'')
+
+
+class _SpecializedObserverClient(ConfigurableObserverClient):
+
+    def init(self):
+        self.register_observer()
+
+    def deinit(self):
+        self.unregister_observer()
+
+
+@pytest.fixture
+def url(stub_server):
+    HEARTBEATS.clear()
+    _ObserverServiceHandler.observers = 0
+    return stub_server(_ObserverServiceHandler)
+
+
+def test_observers_share_the_scheduler_outside_the_main_thread(url):
+    scheduler = HeartbeatScheduler(jitter=0.2)
+    clients = [_SpecializedObserverClient(HKBase(url=url),
+                                          observer_service_options={'url': url, 'observerConfiguration': {},
+                                                                    'heartbeatInterval': 50,
+                                                                    'heartbeatScheduler': scheduler})
+               for _ in range(3)]
+    threads = [threading.Thread(target=client.init) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(scheduler) == 3
+
+    time.sleep(0.3)
+    for client in clients:
+        client.deinit()
+    assert len(scheduler) == 0
+    counts = {key: len(beats) for key, beats in HEARTBEATS.items()}
+    time.sleep(0.1)
+    assert {key: len(beats) for key, beats in HEARTBEATS.items()} == counts
+
+    assert sorted(counts) == ['o1', 'o2', 'o3']
+    # with a 20% jitter, heartbeats are between 40 and 50 ms apart
+    assert all(5 <= count <= 8 for count in counts.values())
+
+
+def test_failures_back_off_up_to_the_interval(url):
+    scheduler = HeartbeatScheduler(jitter=0, retry_delay=0.02)
+    scheduler.schedule('failing', f'{url}/observer/failing/heartbeat', 0.1)
+    scheduler.schedule('ok', f'{url}/observer/ok/heartbeat', 0.1)
+    time.sleep(0.55)
+    failures = scheduler.failures('failing')
+    scheduler.cancel('failing')
+    scheduler.cancel('ok')
+
+    beats = HEARTBEATS['failing']
+    gaps = [b - a for a, b in zip(beats, beats[1:])]
+    # the first heartbeat is after the interval, then retries after 20, 40 and 80 ms, and 100 ms from then on
+    assert 4 <= failures <= len(beats)
+    assert all(abs(gap - expected) < 0.03 for gap, expected in zip(gaps, [0.02, 0.04, 0.08, 0.1]))
+    assert scheduler.failures('ok') == 0 and 4 <= len(HEARTBEATS['ok']) <= 5
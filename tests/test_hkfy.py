@@ -0,0 +1,57 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import pytest
+
+from hkpy.hklib import hkfy, hkfy_many, HKNode, HKLink, HKConnector, HKReferenceNode, HKGraph
+from hkpy.oops import HKpyError
+
+ENTITIES = [
+    {'id': 'n', 'type': 'node', 'parent': 'ctx', 'properties': {'a': 1}, 'metaproperties': {'b': 2},
+     'interfaces': {'i': {'type': 'text'}}},
+    {'id': 'r', 'type': 'ref', 'ref': 'n', 'properties': {}},
+    {'id': 'k', 'type': 'connector', 'className': 'f', 'roles': {'s': 's', 'o': 'o'}},
+    {'id': 'l', 'type': 'link', 'connector': 'k', 'binds': {'s': {'n': ['λ']}, 'o': {'r': ['λ']}}},
+]
+
+
+def test_hkfy_many_matches_hkfy():
+    single = [hkfy(entity) for entity in ENTITIES]
+    many = hkfy_many(ENTITIES)
+
+    assert [type(e) for e in many] == [HKNode, HKReferenceNode, HKConnector, HKLink]
+    assert [e.to_dict() for e in many] == [e.to_dict() for e in single]
+    assert many[0].properties == {'a': 1, 'b': 2}
+    assert many[0].interfaces == {'i': {'type': 'text'}}
+    assert many[1].ref == 'n'
+
+
+def test_hkfy_copies_properties():
+    node = hkfy(ENTITIES[1])
+    node.properties['x'] = 1
+    assert ENTITIES[1]['properties'] == {}
+
+    shared = hkfy_many([{'id': 'n', 'type': 'node', 'properties': {}}], copy=False)[0]
+    assert shared.properties == {}
+
+
+def test_hkfy_graph_and_errors():
+    graph = hkfy({'type': 'graph', 'nodes': {'n': ENTITIES[0]}, 'links': {}})
+    assert isinstance(graph, HKGraph)
+    assert set(graph.nodes) == {'n'}
+
+    node = HKNode('x')
+    assert hkfy_many([node])[0] is node
+
+    with pytest.raises(HKpyError):
+        hkfy({'id': 'x', 'type': 'unknown'})
+    with pytest.raises(HKpyError):
+        hkfy('x')
+    with pytest.raises(HKpyError):
+        hkfy_many([ENTITIES[0], {'id': 'x'}])
+    with pytest.raises(HKpyError):
+        hkfy({'id': 'x', 'type': 'anchor'})
+    with pytest.raises(HKpyError):
+        hkfy_many([{'id': 'x', 'type': 'anchor'}])
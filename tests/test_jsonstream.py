@@ -0,0 +1,103 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hklib import HKNode
+from hkpy.oops import HKBError
+from hkpy.utils import iter_json_members
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+
+    def do_POST(self):
+        self.read_body()
+        if self.path.startswith('/repository/test/query'):
+            payload = [[{'id': f'n{i}', 'type': 'node'}, i] for i in range(100)]
+        elif self.path.startswith('/repository/test/entity/filter'):
+            payload = {f'n{i}': {'id': f'n{i}', 'type': 'node', 'properties': {'i': i}} for i in range(1000)}
+        else:
+            self.reply(b'', 500)
+            return
+
+        # send the body in small chunks so that values are split across reads
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i in range(0, len(data), 37):
+            chunk = data[i:i + 37]
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 4096])
+def test_iter_json_members(size):
+    document = {'a': [1, 2.5e3, True, None], 'b': 'ção', 'c': {'d': -7}, 'e': 123456, 'f': 1.5e-3}
+    data = json.dumps(document, ensure_ascii=False).encode()
+
+    members = iter_json_members(data[i:i + size] for i in range(0, len(data), size))
+
+    assert list(members) == list(document.items())
+
+
+def test_iter_json_members_errors():
+    assert list(iter_json_members([b' [ ] '])) == []
+
+    for document in [b'[1,', b'[1 2]', b'{1: 2}', b'[1] 2', b'', b'["a', b'[tru']:
+        with pytest.raises(HKBError):
+            list(iter_json_members([document]))
+
+
+def test_iter_json_members_fails_fast():
+    read = []
+
+    def chunks():
+        yield b'[{"a": 1}, {"a" 2}, '
+        while True:
+            read.append(1)
+            yield b'{"a": 1}, ' * 100
+
+    members = iter_json_members(chunks())
+    assert next(members) == (None, {'a': 1})
+    with pytest.raises(HKBError):
+        next(members)
+    assert not read
+
+
+def test_iter_filter_entities(repository):
+    entities = list(repository.iter_filter_entities('[type="node"]'))
+
+    assert len(entities) == 1000
+    assert all(isinstance(entity, HKNode) for entity in entities)
+    assert entities[999].id_ == 'n999' and entities[999].properties == {'i': 999}
+
+
+def test_iter_hyql(repository):
+    rows = list(repository.iter_hyql('select * from n'))
+
+    assert len(rows) == 100
+    assert rows[42][0].id_ == 'n42' and rows[42][1] == 42
+
+
+def test_iter_error_status(repository):
+    repository.name = 'missing'
+    with pytest.raises(HKBError):
+        list(repository.iter_hyql('select * from n'))
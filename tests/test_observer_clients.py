@@ -0,0 +1,30 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import os
+import sys
+import subprocess
+
+from hkpy.hkbase.observer import clients
+from hkpy.hkbase.observer.clients import get_client_class, register_observer_client, LocalObserverClient
+
+
+def test_import_does_not_load_observer_backends():
+    script = ('import sys, hkpy\n'
+              'assert not {"flask", "flask_cors", "pika", "werkzeug"} & set(sys.modules)\n'
+              'from hkpy.hkbase import RESTObserverClient\n'
+              'assert "flask" in sys.modules and RESTObserverClient.TYPE_KEY == "rest"\n')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', script], cwd=root, check=True)
+
+
+def test_client_registry(monkeypatch):
+    # the registry is global, the test registers its client in a copy
+    monkeypatch.setattr(clients, 'CLIENTS_BY_KEY', dict(clients.CLIENTS_BY_KEY))
+    assert get_client_class('local') is LocalObserverClient
+    assert get_client_class('unknown') is None
+
+    register_observer_client('custom', 'hkpy.hkbase.observer.clients.localobserverclient', 'LocalObserverClient')
+    assert get_client_class('custom') is LocalObserverClient
@@ -0,0 +1,101 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import time
+import threading
+
+from hkpy.hkbase.observer import NotificationCoalescer, LocalObserverClient
+
+
+def _entities(action, repository, *ids):
+    return {'action': action, 'object': 'entities', 'args': {'repository': repository, 'entities': list(ids)}}
+
+
+def test_entities_are_merged_per_repository_and_action():
+    delivered = []
+    coalescer = NotificationCoalescer(delivered.append, max_delay=60)
+
+    coalescer.add(_entities('create', 'a', 'n1', 'n2', 'n3'))
+    coalescer.add(_entities('update', 'a', 'n1', 'n4'))
+    coalescer.add(_entities('dele', 'a', 'n2'))
+    coalescer.add(_entities('create', 'b', 'n1'))
+    coalescer.add(_entities('dele', 'a', 'n5'))
+    coalescer.add(_entities('create', 'a', 'n5'))
+    assert not delivered
+    coalescer.flush()
+
+    assert delivered == [_entities('create', 'a', 'n3', 'n1'),
+                         _entities('update', 'a', 'n4', 'n5'),
+                         _entities('create', 'b', 'n1')]
+    stats = coalescer.stats()
+    assert (stats.received, stats.delivered, stats.cancelled, stats.failed, stats.pending) == (6, 3, 1, 0, 0)
+
+
+def test_other_notifications_keep_their_order():
+    delivered = []
+    coalescer = NotificationCoalescer(delivered.append, max_delay=60)
+    repository_deleted = {'action': 'dele', 'object': 'repository', 'args': {'repository': 'a'}}
+
+    coalescer.add(_entities('create', 'a', 'n1'))
+    coalescer.add(repository_deleted)
+    coalescer.add(_entities('dele', 'b', 'n1'))
+    coalescer.add(_entities('delete', 'b', 'n2'))
+    coalescer.flush()
+
+    # actions that are not entity actions are not merged
+    assert delivered == [_entities('create', 'a', 'n1'), repository_deleted, _entities('dele', 'b', 'n1'),
+                         _entities('delete', 'b', 'n2')]
+
+
+def test_failed_deliveries_are_counted():
+    def deliver(notification):
+        raise ValueError('cannot handle')
+
+    coalescer = NotificationCoalescer(deliver, max_delay=60)
+    coalescer.add(_entities('create', 'a', 'n1'))
+    coalescer.add(_entities('update', 'b', 'n1'))
+    coalescer.flush()
+
+    stats = coalescer.stats()
+    assert (stats.delivered, stats.failed, stats.pending) == (2, 2, 0)
+
+
+def test_count_and_time_windows():
+    delivered = []
+    flushed = threading.Event()
+
+    def deliver(notification):
+        delivered.append(notification)
+        flushed.set()
+
+    coalescer = NotificationCoalescer(deliver, max_batch_size=3, max_delay=0.05)
+    coalescer.add(_entities('create', 'a', 'n1', 'n2'))
+    assert not delivered
+    coalescer.add(_entities('create', 'a', 'n3'))
+    assert delivered == [_entities('create', 'a', 'n1', 'n2', 'n3')]
+
+    flushed.clear()
+    start = time.monotonic()
+    coalescer.add(_entities('update', 'a', 'n1'))
+    assert flushed.wait(2)
+    assert time.monotonic() - start >= 0.04
+    assert delivered[-1] == _entities('update', 'a', 'n1')
+
+
+def test_client_coalesces_until_deinit():
+    calls = []
+    client = LocalObserverClient()
+    client.add_handler(calls.append)
+    client.enable_coalescing(max_batch_size=10000, max_delay=60)
+    client.init()
+
+    for i in range(1000):
+        client.publish('create', 'entities', 'a', [f'n{i}'])
+    client.publish('dele', 'entities', 'a', ['n0'])
+    assert not calls
+    client.deinit()
+
+    assert len(calls) == 1
+    assert calls[0]['args']['entities'] == [f'n{i}' for i in range(1, 1000)]
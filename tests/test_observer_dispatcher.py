@@ -0,0 +1,176 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import time
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from hkpy.hkbase import HKBase
+from hkpy.hkbase.observer import NotificationDispatcher, RESTObserverClient
+
+from conftest import StubHandler
+
+
+def _blocked_dispatcher(overflow):
+    delivered = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def deliver(notification):
+        started.set()
+        release.wait()
+        delivered.append(notification)
+
+    dispatcher = NotificationDispatcher(deliver, max_queue_size=2, workers=1, overflow=overflow)
+    dispatcher.start()
+    dispatcher.submit(0)
+    started.wait()
+    return dispatcher, delivered, release
+
+
+@pytest.mark.parametrize('overflow, expected', [('drop_newest', [0, 1, 2]), ('drop_oldest', [0, 2, 3])])
+def test_overflow_policies(overflow, expected):
+    dispatcher, delivered, release = _blocked_dispatcher(overflow)
+
+    accepted = [dispatcher.submit(n) for n in (1, 2, 3)]
+    assert accepted == [True, True, overflow == 'drop_oldest']
+    assert dispatcher.stats().queued == 2
+
+    release.set()
+    dispatcher.stop()
+
+    assert delivered == expected
+    stats = dispatcher.stats()
+    assert (stats.received, stats.delivered, stats.dropped) == (4, 3, 1)
+
+
+def test_block_policy_times_out():
+    dispatcher, delivered, release = _blocked_dispatcher('block')
+    dispatcher.block_timeout = 0.05
+
+    assert [dispatcher.submit(n) for n in (1, 2, 3)] == [True, True, False]
+
+    release.set()
+    dispatcher.stop()
+    assert delivered == [0, 1, 2]
+
+
+def test_handler_failures_and_latency():
+    def deliver(notification):
+        time.sleep(0.01)
+        if notification % 2:
+            raise ValueError(notification)
+
+    dispatcher = NotificationDispatcher(deliver, workers=4)
+    dispatcher.start()
+    for n in range(8):
+        dispatcher.submit(n)
+    dispatcher.stop()
+
+    stats = dispatcher.stats()
+    assert (stats.delivered, stats.failed) == (4, 4)
+    assert 0.01 <= stats.latency_avg <= stats.latency_max
+
+
+def test_asyncio_workers_await_coroutine_handlers():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    delivered = []
+
+    async def deliver(notification):
+        await asyncio.sleep(0.01)
+        delivered.append(notification)
+
+    dispatcher = NotificationDispatcher(deliver, workers=3, loop=loop)
+    dispatcher.start()
+    for n in range(6):
+        dispatcher.submit(n)
+    dispatcher.stop()
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+    assert sorted(delivered) == list(range(6))
+    assert dispatcher.stats().delivered == 6
+
+
+
+def test_stop_is_not_lost_to_dropped_notifications():
+    dispatcher, delivered, release = _blocked_dispatcher('drop_oldest')
+
+    stopper = threading.Thread(target=dispatcher.stop)
+    stopper.start()
+    # notifications submitted while the dispatcher stops push out the oldest ones queued
+    for n in range(1, 6):
+        dispatcher.submit(n)
+    release.set()
+    stopper.join(5)
+
+    assert not stopper.is_alive()
+    assert delivered == [0, 4, 5]
+
+
+def test_asyncio_dispatcher_used_from_the_loop():
+    loop = asyncio.new_event_loop()
+    delivered = []
+
+    async def deliver(notification):
+        delivered.append(notification)
+
+    dispatcher = NotificationDispatcher(deliver, max_queue_size=1, workers=1, overflow='block', loop=loop)
+
+    async def main():
+        # none of these calls may wait for the loop, which only runs once they return
+        dispatcher.start()
+        accepted = [dispatcher.submit(n) for n in range(3)]
+        await asyncio.sleep(0.05)
+        dispatcher.stop()
+        await asyncio.sleep(0.01)
+        return accepted
+
+    try:
+        assert loop.run_until_complete(asyncio.wait_for(main(), 5)) == [True] * 3
+    finally:
+        loop.close()
+    assert delivered == [0, 1, 2] and not dispatcher.running
+
+class _HKBaseHandler(StubHandler):
+
+    def do_PUT(self):
+        self.reply(b'')
+
+    do_DELETE = do_PUT
+
+
+def test_rest_client_acknowledges_before_handling(stub_server):
+
+    received = []
+    release = threading.Event()
+
+    def handler(notification):
+        release.wait()
+        received.append(notification)
+
+    client = RESTObserverClient(HKBase(url=stub_server(_HKBaseHandler)),
+                                observer_options={'address': '127.0.0.1', 'dispatch': 'threads', 'workers': 2})
+    client.add_handler(handler)
+    client.init()
+    try:
+        url = client._listening_path
+        for i in range(4):
+            response = requests.post(f'{url}/repository/test/entity', json=[f'n{i}'], timeout=2)
+            assert response.status_code == 200
+        assert client.stats().received == 4 and not received
+        release.set()
+    finally:
+        client.deinit()
+
+    assert sorted(n['args']['entities'][0] for n in received) == ['n0', 'n1', 'n2', 'n3']
+    assert client.stats().delivered == 4
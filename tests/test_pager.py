@@ -0,0 +1,84 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import threading
+
+import pytest
+
+from hkpy.hkbase import HKPager
+from hkpy.hklib import HKNode
+from hkpy.oops import HKpyError
+
+NODES = [HKNode(f'n{i}') for i in range(25)]
+
+
+def _paged_fetch(calls):
+    def fetch(offset, limit):
+        calls.append((offset, limit))
+        return NODES[offset:offset + limit]
+    return fetch
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_pages(prefetch):
+    calls = []
+    pager = HKPager(_paged_fetch(calls), page_size=10, prefetch=prefetch)
+
+    assert [len(page) for page in pager.pages()] == [10, 10, 5]
+    assert calls == [(0, 10), (10, 10), (20, 10)]
+    assert pager.offset == 25
+
+
+def test_resume_from_offset():
+    pager = HKPager(_paged_fetch([]), page_size=10)
+    pages = pager.pages()
+    next(pages)
+    pages.close()
+
+    assert [entity.id_ for entity in HKPager(_paged_fetch([]), page_size=10, offset=pager.offset)] == \
+           [f'n{i}' for i in range(10, 25)]
+
+
+def test_next_page_is_prefetched():
+    fetched = threading.Event()
+
+    def fetch(offset, limit):
+        if offset:
+            fetched.set()
+        return NODES[offset:offset + limit]
+
+    pages = HKPager(fetch, page_size=10).pages()
+    next(pages)
+
+    assert fetched.wait(5)
+    pages.close()
+
+
+def test_server_without_paging():
+    calls = []
+
+    # the whole listing at once, whatever the limit
+    assert len(list(HKPager(lambda offset, limit: calls.append(offset) or NODES, page_size=10))) == 25
+    assert calls == [0]
+
+    # the same page over and over, where the rest of the listing would be lost
+    pager = HKPager(lambda offset, limit: NODES[:10], page_size=10)
+    pages = pager.pages()
+    assert len(next(pages)) == 10
+    with pytest.raises(HKpyError):
+        next(pages)
+    assert pager.offset == 10
+
+
+def test_known_total_skips_missing_entities():
+    ids = [f'n{i}' for i in range(25)]
+    missing = {'n3', 'n10', 'n11', 'n12', 'n13', 'n14', 'n15', 'n16', 'n17', 'n18', 'n19'}
+
+    def fetch(offset, limit):
+        return [HKNode(id_) for id_ in ids[offset:offset + limit] if id_ not in missing]
+
+    pager = HKPager(fetch, page_size=10, total=len(ids))
+    assert [len(page) for page in pager.pages()] == [9, 5]
+    assert pager.offset == 25
@@ -0,0 +1,93 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import time
+
+import pytest
+
+from hkpy.hkbase import HKBase, HKQueryCache
+from hkpy.hkbase.observer import LocalObserverClient
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    # paths of the queries received
+    queries = []
+
+    def do_POST(self):
+        self.read_body()
+        self.queries.append(self.path)
+        if '/sparql' in self.path:
+            payload = {'head': {'vars': ['s']}, 'results': {'bindings': [{'s': {'type': 'uri', 'value': 'x'}}]}}
+        else:
+            payload = [[{'id': 'n', 'type': 'node', 'properties': {}}]]
+        self.reply(payload)
+
+    def do_DELETE(self):
+        self.read_body()
+        self.reply(None)
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.queries = []
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_normalize():
+    assert HKQueryCache.normalize('  select  *  \n\tfrom  x  ') == 'select *\nfrom x'
+    assert HKQueryCache.normalize('select ?s {\n # ?s a ?o\n ?s ?p ?o }') != \
+        HKQueryCache.normalize('select ?s { # ?s a ?o ?s ?p ?o }')
+    assert HKQueryCache.normalize('where a = "x  y"') == 'where a = "x  y"'
+
+
+def test_repeated_queries_are_cached(repository):
+    cache = repository.enable_query_cache()
+
+    first = repository.hyql('select * from n')
+    second = repository.hyql('select *   from n\n')
+    repository.hyql('select * from n', transitivity=True)
+    repository.sparql('select ?s {?s ?p ?o}')
+    repository.sparql('select ?s {?s ?p ?o}')
+    repository.sparql('select ?s {?s ?p ?o}', reasoning=True)
+    repository.run_stored_query('q', parameters={'a': 1})
+    repository.run_stored_query('q', parameters={'a': 1})
+    repository.run_stored_query('q', parameters={'a': 1}, transaction_id='t')
+
+    assert len(_Handler.queries) == 6
+    first_node, second_node = next(iter(first))[0], next(iter(second))[0]
+    assert first_node.id_ == second_node.id_ and first_node is not second_node
+    assert cache.info().hits == 3
+
+
+def test_writes_and_notifications_invalidate(repository):
+    observer = LocalObserverClient()
+    observer.init()
+    cache = repository.enable_query_cache(observer=observer)
+
+    repository.hyql('select * from n')
+    repository.delete_entities(['n'])
+    assert len(cache) == 0
+
+    repository.hyql('select * from n')
+    observer.publish('update', 'entities', 'other', ['n'])
+    assert len(cache) == 1
+    observer.publish('update', 'entities', 'test', ['n'])
+    assert len(cache) == 0
+
+
+def test_ttl(repository):
+    repository.enable_query_cache(ttl=0.05)
+
+    repository.hyql('select * from n')
+    time.sleep(0.1)
+    repository.hyql('select * from n')
+
+    assert len(_Handler.queries) == 2
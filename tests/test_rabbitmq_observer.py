@@ -0,0 +1,249 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+import time
+import queue
+import threading
+from types import SimpleNamespace
+from contextlib import contextmanager
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hkbase.observer.clients.rabbitmqobserverclient import RabbitMQObserverClient
+
+
+class _Broker(object):
+    """ In-process stand-in of an AMQP broker with a single queue, enforcing the prefetch window of each channel """
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.acks = []
+        self.nacks = []
+        self.max_unacked = 0
+        self.queue_deleted = False
+        self.closed = False
+        self.connections = []
+
+    def publish(self, body):
+        self.messages.put(json.dumps(body).encode('utf-8'))
+
+    def connect(self, params):
+        self.connections.append(_Connection(self))
+        return self.connections[-1]
+
+
+class _Channel(object):
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.prefetch_count = 0
+        self.callback = None
+        self.next_tag = 1
+        self.unacked = set()
+
+    def queue_declare(self, queue, **kwargs):
+        return SimpleNamespace(method=SimpleNamespace(queue='amq.gen-test'))
+
+    def queue_bind(self, queue, exchange):
+        pass
+
+    def basic_qos(self, prefetch_count):
+        self.prefetch_count = prefetch_count
+
+    def basic_consume(self, queue, on_message_callback, auto_ack=False):
+        assert not auto_ack and self.callback is None
+        self.callback = on_message_callback
+        return f'ctag-{id(self)}'
+
+    def basic_cancel(self, consumer_tag):
+        self.callback = None
+
+    def basic_ack(self, delivery_tag, multiple=False):
+        acked = {t for t in self.unacked if t <= delivery_tag} if multiple else {delivery_tag}
+        assert acked <= self.unacked
+        self.unacked -= acked
+        self.broker.acks.append((delivery_tag, multiple))
+
+    def basic_nack(self, delivery_tag, requeue=True):
+        self.unacked.remove(delivery_tag)
+        self.broker.nacks.append(delivery_tag)
+
+    def queue_delete(self, queue):
+        self.broker.queue_deleted = True
+
+    def close(self):
+        pass
+
+    def deliver(self):
+        if self.callback is None or (self.prefetch_count and len(self.unacked) >= self.prefetch_count):
+            return False
+        try:
+            body = self.broker.messages.get_nowait()
+        except queue.Empty:
+            return False
+        tag, self.next_tag = self.next_tag, self.next_tag + 1
+        self.unacked.add(tag)
+        self.broker.max_unacked = max(self.broker.max_unacked, len(self.unacked))
+        self.callback(self, SimpleNamespace(delivery_tag=tag), None, body)
+        return True
+
+
+class _Connection(object):
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = []
+        self.callbacks = queue.Queue()
+
+    def channel(self):
+        channel = _Channel(self.broker)
+        self.channels.append(channel)
+        return channel
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.put(callback)
+
+    def process_data_events(self, time_limit=0):
+        deadline = time.monotonic() + time_limit
+        while True:
+            while not self.callbacks.empty():
+                self.callbacks.get()()
+            # like pika, returns once some events are processed
+            if any([channel.deliver() for channel in self.channels]) or time.monotonic() >= deadline:
+                return
+            time.sleep(0.001)
+
+    def close(self):
+        self.broker.closed = True
+
+
+@contextmanager
+def _consuming(broker, handler, **options):
+    client = RabbitMQObserverClient(HKBase(url='http://127.0.0.1:1'),
+                                    info={'broker': 'amqp://localhost:5672', 'exchangeName': 'hkbase'},
+                                    observer_options=dict(options, connectionFactory=broker.connect))
+    client.add_handler(handler)
+    client.init()
+    try:
+        yield client
+    finally:
+        client.deinit()
+
+
+def _wait(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_acknowledges_after_handling_and_rejects_failures():
+    broker = _Broker()
+    received = []
+
+    def handler(notification):
+        if notification['n'] == 2:
+            raise ValueError('cannot handle')
+        received.append(notification['n'])
+
+    with _consuming(broker, handler):
+        for n in range(5):
+            broker.publish({'n': n})
+        _wait(lambda: len(broker.acks) + len(broker.nacks) == 5)
+
+    assert received == [0, 1, 3, 4]
+    assert broker.acks == [(1, False), (2, False), (4, False), (5, False)]
+    assert broker.nacks == [3]
+    assert broker.queue_deleted and broker.closed
+
+
+def test_acks_are_batched():
+    broker = _Broker()
+    for n in range(10):
+        broker.publish({'n': n})
+    with _consuming(broker, lambda notification: None, ackBatchSize=4, prefetchCount=8):
+        _wait(lambda: broker.acks and broker.acks[-1][0] == 10)
+
+    # full batches are acknowledged at once, the remainder once no more messages arrive
+    assert broker.acks == [(4, True), (8, True), (10, True)]
+    assert not broker.connections[0].channels[0].unacked
+
+
+def test_prefetch_bounds_messages_in_flight():
+    broker = _Broker()
+    release = threading.Event()
+    received = []
+
+    def handler(notification):
+        release.wait()
+        received.append(notification['n'])
+
+    with _consuming(broker, handler, prefetchCount=3, workers=8):
+        try:
+            for n in range(10):
+                broker.publish({'n': n})
+            time.sleep(0.1)
+            assert broker.max_unacked == 3 and not received
+        finally:
+            release.set()
+        _wait(lambda: len(received) == 10)
+    assert broker.max_unacked == 3
+    assert sorted(received) == list(range(10))
+
+
+def test_channels_feed_parallel_workers():
+    broker = _Broker()
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def handler(notification):
+        with lock:
+            active.append(notification)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(notification)
+
+    with _consuming(broker, handler, channels=2, workers=4, prefetchCount=2):
+        for n in range(16):
+            broker.publish({'n': n})
+        channels = broker.connections[0].channels
+        _wait(lambda: len(peak) == 16 and not any(channel.unacked for channel in channels))
+
+    assert max(peak) == 4
+    assert all(channel.next_tag > 1 for channel in channels)
+
+
+def test_messages_are_acknowledged_once_handled():
+    broker = _Broker()
+    release = threading.Event()
+    received = []
+
+    def handler(notification):
+        release.wait()
+        received.append(notification['n'])
+
+    with _consuming(broker, handler):
+        try:
+            broker.publish({'n': 0})
+            _wait(lambda: broker.max_unacked == 1)
+            time.sleep(0.05)
+            assert not broker.acks and not received
+        finally:
+            release.set()
+        _wait(lambda: broker.acks)
+    assert received == [0] and broker.acks == [(1, False)]
+
+
+def test_dispatcher_and_coalescing_are_refused():
+    client = RabbitMQObserverClient(HKBase(url='http://127.0.0.1:1'), info={'broker': 'amqp://localhost:5672'})
+    with pytest.raises(ValueError):
+        client.enable_dispatcher()
+    with pytest.raises(ValueError):
+        client.enable_coalescing()
+    assert client.dispatcher is None and client.coalescer is None
@@ -0,0 +1,53 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hklib import HKDataNode
+from hkpy.oops import HKpyError
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+
+    def do_POST(self):
+        ids = json.loads(self.read_body())
+        self.reply({id_: {'id': id_, 'type': 'node', 'properties': {'mimeType': 'text/plain'}} for id_ in ids})
+
+    def do_GET(self):
+        if '/storage/object/' not in self.path:
+            self.reply(['test'])
+        elif self.path.endswith('/missing'):
+            self.reply({'error': 'not found'}, 404)
+        else:
+            self.reply(self.path.rsplit('/', 1)[-1].encode())
+
+
+@pytest.fixture
+def repository(stub_server):
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_raw_data_is_fetched(repository):
+    entities = repository.get_entities(['a', 'b'], bring_raw_data=True)
+
+    assert all(isinstance(entity, HKDataNode) for entity in entities)
+    assert [entity.raw_data for entity in entities] == [b'a', b'b']
+
+
+def test_raw_data_failures_raise_unless_reported(repository):
+    with pytest.raises(HKpyError) as info:
+        repository.get_entities(['a', 'missing'], bring_raw_data=True)
+    assert 'missing' in str(info.value)
+
+    errors = {}
+    entities = repository.get_entities(['a', 'missing'], bring_raw_data=True, errors=errors)
+    assert list(errors) == ['missing']
+    assert isinstance(entities[0], HKDataNode) and not isinstance(entities[1], HKDataNode)
@@ -0,0 +1,94 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import time
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hkbase.observer import LocalObserverClient, NotificationActions
+from hkpy.oops import HKpyError
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    repositories = []
+    listings = 0
+
+    def do_GET(self):
+        type(self).listings += 1
+        self.reply(self.repositories)
+
+    def do_PUT(self):
+        self.repositories.append(self.path.strip('/').split('/')[-1])
+        self.reply(None)
+
+    def do_DELETE(self):
+        self.repositories.remove(self.path.strip('/').split('/')[-1])
+        self.reply(None)
+
+
+@pytest.fixture
+def url(stub_server):
+    _Handler.repositories = [f'repo{i}' for i in range(100)]
+    _Handler.listings = 0
+    return stub_server(_Handler)
+
+
+def test_single_listing(url):
+    with HKBase(url=url) as hkbase:
+        assert len(hkbase.get_repositories()) == 100
+        for i in range(100):
+            hkbase.connect_repository(f'repo{i}')
+
+    assert _Handler.listings == 1
+
+
+def test_missing_repository_refreshes_once(url):
+    with HKBase(url=url) as hkbase:
+        hkbase.connect_repository('repo0')
+        _Handler.repositories.append('new')
+
+        assert hkbase.connect_repository('new').name == 'new'
+        with pytest.raises(HKpyError):
+            hkbase.connect_repository('missing')
+
+    assert _Handler.listings == 3
+
+
+def test_local_changes_and_notifications(url):
+    observer = LocalObserverClient()
+    observer.init()
+
+    with HKBase(url=url) as hkbase:
+        hkbase.observe_repositories(observer)
+        hkbase.connect_repository('repo0')
+
+        hkbase.create_repository('created')
+        hkbase.connect_repository('created')
+
+        hkbase.delete_repository('repo1')
+        observer.publish('create', 'repository', 'notified')
+        hkbase.connect_repository('notified')
+
+        assert 'repo1' not in hkbase._view_repositories()
+        observer.publish(NotificationActions.DELETE.value, 'repository', 'notified')
+        assert 'notified' not in hkbase._view_repositories()
+        # the REST observer client spells deletions 'delete'
+        observer.publish('create', 'repository', 'notified')
+        assert 'notified' in hkbase._view_repositories()
+        observer.publish('delete', 'repository', 'notified')
+        assert 'notified' not in hkbase._view_repositories()
+        assert _Handler.listings == 1
+
+
+def test_ttl(url):
+    with HKBase(url=url, repositories_ttl=0.05) as hkbase:
+        hkbase.connect_repository('repo0')
+        time.sleep(0.1)
+        hkbase.connect_repository('repo0')
+
+    assert _Handler.listings == 2
@@ -0,0 +1,84 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+from urllib.parse import unquote
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.oops import HKBError
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    # FIs received
+    resolved = []
+
+    def do_GET(self):
+        if '/fi/' not in self.path:
+            self.reply(['test'])
+            return
+
+        fi = unquote(self.path.rsplit('/', 1)[-1])
+        self.resolved.append(fi)
+        if fi.startswith('<missing'):
+            self.reply({'message': 'not found'}, 404)
+        else:
+            self.reply({'id': fi, 'type': 'node', 'properties': {}}, headers={'Content-Type': 'hyperknowledge/node'})
+
+    def do_DELETE(self):
+        self.read_body()
+        self.reply(None)
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.resolved = []
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_resolve_fis_deduplicates_and_keeps_order(repository):
+    fis = [f'<n{i % 5}>' for i in range(20)]
+
+    results = repository.resolve_fis(fis, max_concurrency=4)
+
+    assert [entity.id_ for entity in results] == fis
+    assert sorted(_Handler.resolved) == sorted(set(fis))
+
+
+def test_resolve_fis_memoizes_until_the_repository_changes(repository):
+    first = repository.resolve_fis(['<a>', '<b>'], memoize=True)
+    second = repository.resolve_fis(['<b>', '<a>', '<c>'], memoize=True)
+
+    assert [entity.id_ for entity in second] == ['<b>', '<a>', '<c>']
+    assert sorted(_Handler.resolved) == ['<a>', '<b>', '<c>']
+    assert second[1] is not first[0]
+    assert repository.fi_cache.info().hits == 2
+
+    repository.delete_entities('a')
+    repository.resolve_fis(['<a>'], memoize=True)
+
+    assert _Handler.resolved.count('<a>') == 2
+
+
+def test_resolve_fis_cache_size(repository):
+    repository.resolve_fis(['<a>', '<b>', '<c>'], memoize=True, cache_size=2)
+    assert len(repository.fi_cache) == 2 and repository.fi_cache.maxsize == 2
+
+    repository.resolve_fis(['<a>'], memoize=True, cache_size=1)
+    assert len(repository.fi_cache) == 1 and repository.fi_cache.maxsize == 1
+
+
+def test_resolve_fis_errors(repository):
+    with pytest.raises(HKBError):
+        repository.resolve_fis(['<a>', '<missing>'])
+
+    errors = {}
+    results = repository.resolve_fis(['<a>', '<missing>'], errors=errors)
+
+    assert results[0].id_ == '<a>' and results[1] is None
+    assert list(errors) == ['<missing>']
@@ -0,0 +1,92 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import json
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.hklib import HKNode
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    # (method, path, transaction id, body) of the requests received
+    requests = []
+    fail_puts = False
+
+    def _record(self):
+        body = self.read_body()
+        self.requests.append((self.command, self.path, self.headers.get('transactionId'),
+                              json.loads(body) if body else None))
+        self.reply(None, 500 if self.fail_puts and self.command == 'PUT' else 200)
+
+    do_PUT = do_POST = do_DELETE = _record
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.requests = []
+    _Handler.fail_puts = False
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_commit_sends_batched_writes(repository):
+    transaction = repository.create_transaction('t1')
+
+    for i in range(50):
+        repository.add_entities(HKNode(f'n{i}'), transaction=transaction)
+    repository.update_entities(HKNode('n0', properties={'a': 1}), transaction=transaction)
+    repository.delete_entities(['n1', 'x'], transaction=transaction)
+    assert _Handler.requests == []
+
+    transaction.commit()
+
+    (put, delete, commit) = _Handler.requests
+    assert put[:3] == ('PUT', '/repository/test/entity/', 't1') and len(put[3]) == 49
+    assert delete[:3] == ('DELETE', '/repository/test/entity/', 't1') and delete[3] == ['n1', 'x']
+    assert {e['id']: e for e in put[3]}['n0']['properties'] == {'a': 1}
+    assert commit[:2] == ('POST', '/repository/test/transaction/commit/t1')
+
+
+def test_commit_keeps_the_order_of_the_writes(repository):
+    with repository.create_transaction('t3') as transaction:
+        repository.delete_entities('old', transaction=transaction)
+        repository.add_entities([HKNode('a'), HKNode('b')], transaction=transaction)
+        repository.delete_entities('a', transaction=transaction)
+        repository.add_entities(HKNode('ctx'), transaction=transaction)
+
+    assert [(method, body if method == 'DELETE' else [e['id'] for e in body])
+            for method, _, _, body in _Handler.requests[:-1]] == \
+        [('DELETE', ['old']), ('PUT', ['b']), ('DELETE', ['a']), ('PUT', ['ctx'])]
+
+
+def test_rollback_discards(repository):
+    with pytest.raises(RuntimeError):
+        with repository.create_transaction() as transaction:
+            repository.add_entities(HKNode('a'), transaction=transaction)
+            raise RuntimeError
+
+    assert len(transaction) == 0
+    assert _Handler.requests == []
+
+
+def test_failed_commit_rolls_back(repository):
+    transaction = repository.create_transaction('t2')
+    repository.delete_entities('a', transaction=transaction)
+    repository.add_entities(HKNode('b'), transaction=transaction)
+
+    _Handler.fail_puts = True
+    with pytest.raises(Exception):
+        transaction.commit()
+
+    assert [(method, path) for method, path, _, _ in _Handler.requests][-1] == \
+           ('POST', '/repository/test/transaction/rollback/t2')
+    assert len(transaction) == 2
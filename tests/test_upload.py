@@ -0,0 +1,103 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import io
+import os
+import base64
+import hashlib
+
+import pytest
+
+from hkpy.hkbase import HKBase
+from hkpy.oops import HKpyError
+from hkpy.utils import UploadStream
+
+from conftest import StubHandler
+
+_OBJECT = os.urandom(100000)
+
+
+class _Handler(StubHandler):
+    # (headers, body) of the uploads received
+    uploads = []
+
+    def do_PUT(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            body = self.read_body()
+        self.uploads.append((self.headers, bytes(body)))
+        self.reply({'objectId': 'o'})
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.uploads = []
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'object'
+    path.write_bytes(_OBJECT)
+    return path
+
+
+def test_add_object_streams_files(repository, path):
+    progress = []
+    assert repository.add_object(path, 'application/octet-stream', chunk_size=30000,
+                                 progress=lambda sent, total: progress.append((sent, total))) == 'o'
+    assert progress == [(30000, 100000), (60000, 100000), (90000, 100000), (100000, 100000)]
+
+    with open(path, 'rb') as file:
+        file.seek(1000)
+        repository.add_object(file, 'application/octet-stream', use_mmap=True)
+        assert file.tell() == len(_OBJECT)
+
+    repository.add_object(io.BytesIO(_OBJECT), 'application/octet-stream')
+
+    headers, body = _Handler.uploads[0]
+    assert headers['Content-Length'] == str(len(_OBJECT)) and body == _OBJECT
+    assert _Handler.uploads[1][1] == _OBJECT[1000:]
+    assert _Handler.uploads[2][1] == _OBJECT
+
+
+def test_add_object_text_and_bytes(repository, path):
+    repository.add_object('café', 'text/plain')
+    repository.add_object(io.StringIO('café'), 'text/plain')
+    repository.add_object(_OBJECT, 'application/octet-stream')
+    # as for data nodes, a string that names a file is its path
+    repository.add_object(str(path), 'text/plain')
+    repository.add_object(str(path) + '.missing', 'text/plain')
+
+    assert [body for _, body in _Handler.uploads] == \
+        ['café'.encode()] * 2 + [_OBJECT, path.read_bytes(), (str(path) + '.missing').encode()]
+    # the size of text files is not known in advance
+    assert _Handler.uploads[1][0]['Transfer-Encoding'] == 'chunked'
+
+
+def test_add_object_checksum(repository, path):
+    digest = 'sha-256=' + base64.b64encode(hashlib.sha256(_OBJECT).digest()).decode()
+
+    repository.add_object(path, 'application/octet-stream', checksum=True, use_mmap=True)
+    with open(path, 'rb') as file:
+        repository.add_object(file, 'application/octet-stream', checksum=True)
+
+    for headers, body in _Handler.uploads:
+        assert headers['Digest'] == digest and body == _OBJECT
+
+    with pytest.raises(HKpyError):
+        UploadStream(iter([b'chunk'])).digest()
@@ -0,0 +1,164 @@
+###
+# Copyright (c) 2019-present, IBM Research
+# Licensed under The MIT License [see LICENSE for details]
+###
+
+import gc
+import json
+import time
+import weakref
+
+import pytest
+
+from hkpy.hkbase import HKBase, BufferedRepositoryWriter
+from hkpy.hklib import HKNode
+from hkpy.oops import HKpyError
+
+from conftest import StubHandler
+
+
+class _Handler(StubHandler):
+    # (method, body) of the entity requests received
+    requests = []
+    fail = False
+
+    def _entity(self):
+        body = json.loads(self.read_body())
+        if self.fail:
+            self.reply(None, status=500)
+            return
+        self.requests.append((self.command, body))
+        self.reply(None)
+
+    do_PUT = do_DELETE = _entity
+
+    def do_GET(self):
+        self.reply(['test'])
+
+
+@pytest.fixture
+def repository(stub_server):
+    _Handler.requests = []
+    _Handler.fail = False
+    with HKBase(url=stub_server(_Handler)) as hkbase:
+        yield hkbase.connect_repository('test')
+
+
+def test_coalesce_and_flush_on_exit(repository):
+    with BufferedRepositoryWriter(repository, background=False) as writer:
+        for i in range(10):
+            writer.add_entities(HKNode('a', properties={'version': i}))
+        writer.add_entities([HKNode('b'), HKNode('c')])
+        writer.delete_entities('b')
+        writer.delete_entities('d')
+        assert _Handler.requests == []
+
+    (put_method, put), (delete_method, deleted) = _Handler.requests
+    assert put_method == 'PUT' and [(e['id'], e['properties']) for e in put] == [('a', {'version': 9}), ('c', {})]
+    assert delete_method == 'DELETE' and deleted == ['b', 'd']
+
+
+def test_writes_keep_their_order(repository):
+    with BufferedRepositoryWriter(repository, background=False) as writer:
+        writer.add_entities([HKNode('a'), HKNode('b')])
+        writer.delete_entities(['c', 'd'])
+        writer.add_entities(HKNode('c'))
+        writer.delete_entities('a')
+
+    assert [(method, [e if isinstance(e, str) else e['id'] for e in body]) for method, body in _Handler.requests] == \
+        [('PUT', ['b']), ('DELETE', ['d']), ('PUT', ['c']), ('DELETE', ['a'])]
+
+
+def test_size_threshold(repository):
+    writer = BufferedRepositoryWriter(repository, max_operations=10, background=False)
+    writer.add_entities([HKNode(f'n{i}') for i in range(25)])
+    writer.add_entities(HKNode('last'))
+
+    assert [len(body) for _, body in _Handler.requests] == [25]
+    writer.close()
+    assert [len(body) for _, body in _Handler.requests] == [25, 1]
+
+
+def test_background_interval(repository):
+    with BufferedRepositoryWriter(repository, flush_interval=0.05) as writer:
+        writer.add_entities(HKNode('a'))
+        deadline = time.monotonic() + 5
+        while not _Handler.requests and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(writer) == 0
+
+    assert len(_Handler.requests) == 1
+
+
+def test_failed_writes_are_kept(repository):
+    writer = BufferedRepositoryWriter(repository, background=False)
+    writer.add_entities(HKNode('a', properties={'version': 1}))
+
+    _Handler.fail = True
+    with pytest.raises(Exception):
+        writer.flush()
+    assert len(writer) == 1
+
+    _Handler.fail = False
+    writer.add_entities(HKNode('a', properties={'version': 2}))
+    writer.close()
+
+    assert [[e['properties'] for e in body] for _, body in _Handler.requests] == [[{'version': 2}]]
+
+
+def test_failed_writes_apply_backpressure(repository):
+    _Handler.fail = True
+    writer = BufferedRepositoryWriter(repository, max_operations=2, flush_interval=None)
+    writer.add_entities([HKNode('a'), HKNode('b')])
+    deadline = time.monotonic() + 5
+    while writer._state.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(HKpyError):
+        writer.add_entities(HKNode('c'))
+
+    # the writes of the failed flush count towards the bound, so the writer flushes them itself
+    with pytest.raises(Exception):
+        writer.add_entities([HKNode('c'), HKNode('d')])
+
+    _Handler.fail = False
+    writer.close()
+    assert [e['id'] for _, body in _Handler.requests for e in body] == ['a', 'b', 'c', 'd']
+
+
+def test_unused_writers_are_collected(repository):
+    writer = BufferedRepositoryWriter(repository)
+    writer_ref = weakref.ref(writer)
+    thread = writer._state.thread
+
+    del writer
+    gc.collect()
+    assert writer_ref() is None
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+@pytest.mark.parametrize('background', [True, False])
+def test_unclosed_writers_flush_when_collected(repository, background):
+    def write():
+        writer = BufferedRepositoryWriter(repository, background=background)
+        writer.add_entities([HKNode('a'), HKNode('b')])
+        writer.delete_entities('c')
+        return weakref.ref(writer)
+
+    writer_ref = write()
+    gc.collect()
+
+    assert writer_ref() is None
+    assert [(method, [e if isinstance(e, str) else e['id'] for e in body]) for method, body in _Handler.requests] == \
+        [('PUT', ['a', 'b']), ('DELETE', ['c'])]
+
+
+def test_writes_lost_at_collection_are_logged(repository, caplog):
+    writer = BufferedRepositoryWriter(repository, background=False)
+    writer.add_entities(HKNode('a'))
+
+    _Handler.fail = True
+    del writer
+    gc.collect()
+
+    assert '1 buffered writes to repository test were lost' in caplog.text